@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
@@ -13,13 +13,21 @@ import {
 } from 'lucide-react';
 import Link from 'next/link';
 import { toast } from 'sonner';
+import { isOrderFinished } from '@/lib/orderProgress';
+
+// Stages after which the server stops following an order (lib/orderEvents)
+const ENDED_STAGES = ['unpaid', 'failed'];
 
 export default function LecturaPage({ params }) {
   const [orderData, setOrderData] = useState(null);
   const [reading, setReading] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [watching, setWatching] = useState(false);
   const [telegramChatId, setTelegramChatId] = useState('');
   const [sendingTelegram, setSendingTelegram] = useState(false);
+  const [endedStage, setEndedStage] = useState(null);
+  const telegramStatus = useRef(null);
+  const ended = useRef(false);
   const orderId = params.order_id;
 
   useEffect(() => {
@@ -28,6 +36,38 @@ export default function LecturaPage({ params }) {
     }
   }, [orderId]);
 
+  // Payment, the reading, its PDF and Telegram delivery happen on the server
+  // (job worker); it pushes every change over /api/orders/{id}/events, and each
+  // one reloads the order. The stream ends once nothing else will change, or
+  // when the order went unpaid or its reading failed; then the page stops too.
+  useEffect(() => {
+    if (!watching) {
+      return;
+    }
+    const events = new EventSource(`/api/orders/${orderId}/events`);
+
+    events.addEventListener('status', (event) => {
+      const state = JSON.parse(event.data);
+      if (telegramStatus.current === 'queued' && state.telegram_status === 'sent') {
+        toast.success('Lectura enviada a Telegram');
+      } else if (telegramStatus.current === 'queued' && state.telegram_status === 'failed') {
+        toast.error('No se pudo enviar la lectura a Telegram');
+      }
+      telegramStatus.current = state.telegram_status;
+      if (ENDED_STAGES.includes(state.stage)) {
+        ended.current = true;
+        setEndedStage(state.stage);
+      }
+      fetchOrderAndReading();
+    });
+    events.addEventListener('done', () => {
+      events.close();
+      setWatching(false);
+    });
+
+    return () => events.close();
+  }, [watching]);
+
   const fetchOrderAndReading = async () => {
     try {
       const response = await fetch(`/api/orders/${orderId}`);
@@ -36,10 +76,9 @@ export default function LecturaPage({ params }) {
       if (data.order) {
         setOrderData(data.order);
         setReading(data.reading);
-        
-        // If order is paid but no reading exists, try to generate it
-        if (data.order.status === 'paid' && !data.reading) {
-          await generateReading();
+        telegramStatus.current = data.reading?.telegram_status || null;
+        if (!isOrderFinished(data.order, data.reading) && !ended.current) {
+          setWatching(true);
         }
       } else {
         toast.error('Orden no encontrada');
@@ -52,25 +91,11 @@ export default function LecturaPage({ params }) {
     }
   };
 
-  const generateReading = async () => {
-    try {
-      const response = await fetch('/api/readings/generate', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ order_id: orderId }),
-      });
-
-      const data = await response.json();
-
-      if (data.success) {
-        setReading(data.reading);
-        toast.success('Lectura generada exitosamente');
-      }
-    } catch (error) {
-      console.error('Error generating reading:', error);
-    }
+  // Check again, following the order anew if it had been given up on
+  const refresh = () => {
+    ended.current = false;
+    setEndedStage(null);
+    fetchOrderAndReading();
   };
 
   const sendToTelegram = async () => {
@@ -96,7 +121,9 @@ export default function LecturaPage({ params }) {
       const data = await response.json();
 
       if (data.success) {
-        toast.success('Lectura enviada a Telegram exitosamente');
+        toast.success('Tu lectura se está enviando a Telegram');
+        telegramStatus.current = 'queued';
+        setWatching(true);
       } else {
         toast.error(data.error || 'Error enviando a Telegram');
       }
@@ -435,14 +462,30 @@ export default function LecturaPage({ params }) {
       ) : (
         <Card>
           <CardContent className="p-8 text-center">
-            <Clock className="w-12 h-12 mx-auto mb-4 text-slate-400" />
-            <h3 className="text-lg font-semibold text-slate-800 mb-2">
-              Preparando tu lectura...
-            </h3>
-            <p className="text-slate-600 mb-4">
-              Tu consulta está siendo procesada. Esto puede tomar unos momentos.
-            </p>
-            <Button onClick={fetchOrderAndReading} variant="outline">
+            {endedStage ? (
+              <>
+                <AlertCircle className="w-12 h-12 mx-auto mb-4 text-amber-600" />
+                <h3 className="text-lg font-semibold text-slate-800 mb-2">
+                  {endedStage === 'unpaid' ? 'Pago no recibido' : 'No pudimos preparar tu lectura'}
+                </h3>
+                <p className="text-slate-600 mb-4">
+                  {endedStage === 'unpaid'
+                    ? 'No hemos recibido el pago de esta orden. Si ya pagaste, actualiza en unos minutos.'
+                    : 'Escríbenos indicando tu número de orden y la revisaremos.'}
+                </p>
+              </>
+            ) : (
+              <>
+                <Clock className="w-12 h-12 mx-auto mb-4 text-slate-400" />
+                <h3 className="text-lg font-semibold text-slate-800 mb-2">
+                  Preparando tu lectura...
+                </h3>
+                <p className="text-slate-600 mb-4">
+                  Tu consulta está siendo procesada. Esto puede tomar unos momentos.
+                </p>
+              </>
+            )}
+            <Button onClick={refresh} variant="outline">
               Actualizar
             </Button>
           </CardContent>
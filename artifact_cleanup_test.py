@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Artifact Cleanup Test
+Runs the API (lib/api, under node) in one process and the job worker's artifact
+cleanup (lib/artifacts.js) in another, against a local MongoDB and a temporary
+artifact directory, and checks that the API stops serving an expired PDF even
+though it had the finished reading in its lookup cache:
+
+  - a cached reading whose artifact was cleaned up answers 410 right away
+  - GET /api/orders/{id} drops the stale pdf_url once READING_CACHE_TTL_MS passes
+
+Requires node and a MongoDB at MONGO_URL.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+LIB_DIR = f"file://{os.path.join(REPO_ROOT, 'lib')}/"
+MONGO_URL = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.getenv('DB_NAME', 'pleyazul_oraculos_test')
+CACHE_TTL_MS = 1000
+
+# Finished orders whose reading has a rendered PDF in the artifact store
+SEED_DRIVER = """
+const lib = (name) => import(new URL(name, process.env.LIB_DIR));
+const { getCollection, connectToDatabase } = await lib('mongodb.js');
+const { saveReadingPdf } = await lib('artifacts.js');
+for (const orderId of JSON.parse(process.env.ORDER_IDS)) {
+  const { key, sha256, size } = await saveReadingPdf(orderId, Buffer.from(`%PDF-1.4 ${orderId}`));
+  await (await getCollection('orders')).insertOne({
+    order_id: orderId, email: 'cleanup@pleyazul.com', spread_id: 'test', status: 'completed',
+    amount: 19.99, created_at: new Date(), completed_at: new Date(), test_mode: true
+  });
+  await (await getCollection('readings')).insertOne({
+    order_id: orderId, result_json: {}, created_at: new Date(),
+    pdf_url: `/api/readings/${orderId}/pdf?v=${sha256.slice(0, 16)}`,
+    pdf_artifact: { key, sha256, size }
+  });
+}
+(await connectToDatabase()).client.close();
+"""
+
+# The job worker's sweep, with the seeded artifacts already past expiry
+CLEANUP_DRIVER = """
+const lib = (name) => import(new URL(name, process.env.LIB_DIR));
+const { getCollection, connectToDatabase } = await lib('mongodb.js');
+const { cleanupExpiredArtifacts } = await lib('artifacts.js');
+await (await getCollection('artifacts')).updateMany(
+  { order_id: { $in: JSON.parse(process.env.ORDER_IDS) } },
+  { $set: { expires_at: new Date(0) } }
+);
+console.log(await cleanupExpiredArtifacts());
+(await connectToDatabase()).client.close();
+"""
+
+# A long-lived API process: one request path per stdin line, one result per stdout line
+API_DRIVER = """
+import readline from 'readline';
+const lib = (name) => import(new URL(name, process.env.LIB_DIR));
+const { handleApiRequest } = await lib('api/router.js');
+const { connectToDatabase } = await lib('mongodb.js');
+for await (const path of readline.createInterface({ input: process.stdin })) {
+  const response = await handleApiRequest(new Request(`http://localhost/api/${path}`), path.split('?')[0].split('/'));
+  const isJson = (response.headers.get('content-type') || '').includes('json');
+  const body = isJson ? await response.json() : (await response.arrayBuffer()).byteLength;
+  console.log('RESULT ' + JSON.stringify({ status: response.status, body }));
+}
+(await connectToDatabase()).client.close();
+"""
+
+
+async def run_node(driver, env):
+    process = await asyncio.create_subprocess_exec(
+        'node', '--input-type=module', '-e', driver,
+        cwd=REPO_ROOT, env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"node failed\n{stderr.decode()}")
+    return stdout.decode()
+
+
+class ApiProcess:
+    """The API in its own node process, keeping its lookup cache between requests"""
+
+    def __init__(self, env):
+        self.env = env
+        self.process = None
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            'node', '--input-type=module', '-e', API_DRIVER,
+            cwd=REPO_ROOT, env=self.env, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+        )
+
+    async def get(self, path):
+        self.process.stdin.write(f"{path}\n".encode())
+        await self.process.stdin.drain()
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                raise RuntimeError(f"API process exited while handling {path}")
+            if line.startswith(b'RESULT '):
+                return json.loads(line[len('RESULT '):])
+
+    async def stop(self):
+        self.process.stdin.close()
+        await self.process.wait()
+
+
+async def main():
+    print("🔮 Testing Artifact Cleanup Across Processes")
+    print("=" * 50)
+
+    artifact_dir = tempfile.mkdtemp(prefix='pleyazul-artifacts-')
+    pdf_order, listed_order = f"cleanup-pdf-{uuid.uuid4()}", f"cleanup-order-{uuid.uuid4()}"
+    env = dict(os.environ)
+    env.update({
+        'MONGO_URL': MONGO_URL,
+        'DB_NAME': DB_NAME,
+        'ARTIFACT_STORE': 'local',
+        'ARTIFACT_DIR': artifact_dir,
+        'READING_CACHE_TTL_MS': str(CACHE_TTL_MS),
+        'LIB_DIR': LIB_DIR,
+        'ORDER_IDS': json.dumps([pdf_order, listed_order])
+    })
+
+    api = ApiProcess(env)
+    try:
+        await run_node(SEED_DRIVER, env)
+        await api.start()
+
+        # Both orders are finished, so viewing them puts them in the API's cache
+        listed = await api.get(f"orders/{listed_order}")
+        await api.get(f"orders/{pdf_order}")
+        served = await api.get(f"readings/{pdf_order}/pdf")
+
+        removed = int((await run_node(CLEANUP_DRIVER, env)).strip().splitlines()[-1])
+
+        expired_pdf = await api.get(f"readings/{pdf_order}/pdf")
+        await asyncio.sleep(CACHE_TTL_MS / 1000 + 0.5)
+        relisted = await api.get(f"orders/{listed_order}")
+    finally:
+        if api.process:
+            await api.stop()
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+
+    results = [
+        ("PDF served before cleanup", served['status'] == 200 and served['body'] > 0),
+        ("Order lists its pdf_url before cleanup", listed['status'] == 200
+         and bool(listed['body']['reading'].get('pdf_url'))),
+        ("Cleanup in another process removed both artifacts", removed >= 2),
+        ("Cached reading with a cleaned-up PDF answers 410", expired_pdf['status'] == 410),
+        ("Order drops the expired pdf_url after the cache TTL", relisted['status'] == 200
+         and relisted['body']['reading'].get('pdf_url') is None
+         and relisted['body']['reading'].get('pdf_expired_at') is not None),
+    ]
+    for name, ok in results:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    passed = sum(ok for _, ok in results)
+    print(f"\n{passed}/{len(results)} checks passed")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
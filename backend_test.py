@@ -2,22 +2,34 @@
 """
 Pleyazul Oráculos PWA Backend Testing Suite
 Tests all backend API endpoints and functionality
+
+Run with --load to replay the same scenarios concurrently and report
+throughput and latency percentiles per endpoint (requires aiohttp).
 """
 
-import requests
+import argparse
+import asyncio
 import json
+import random
 import time
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from perf_metrics import EndpointMetrics, LatencyHistogram, TimedSession, RESULTS_DIR, timed_request
+
 # Get base URL from environment
 BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://divine-insight-1.preview.emergentagent.com')
 API_BASE = f"{BASE_URL}/api"
 
+CONTENT_TYPES = ['tarot', 'iching', 'rueda', 'spreads', 'presets', 'meditaciones']
+
 class PleyazulBackendTester:
     def __init__(self):
         self.test_results = []
-        self.session = requests.Session()
+        self.metrics = EndpointMetrics()
+        self.session = TimedSession(self.metrics)
         self.session.headers.update({
             'Content-Type': 'application/json',
             'User-Agent': 'PleyazulTester/1.0'
@@ -30,7 +42,8 @@ class PleyazulBackendTester:
             'success': success,
             'message': message,
             'timestamp': datetime.now().isoformat(),
-            'details': details
+            'details': details,
+            'requests': self.metrics.drain_recent()
         }
         self.test_results.append(result)
         status = "✅ PASS" if success else "❌ FAIL"
@@ -47,13 +60,17 @@ class PleyazulBackendTester:
                 data = response.json()
                 
                 # Check required fields
-                required_fields = ['status', 'service', 'timestamp', 'integrations']
+                required_fields = ['status', 'service', 'timestamp', 'database', 'integrations']
                 missing_fields = [field for field in required_fields if field not in data]
                 
                 if missing_fields:
                     self.log_test("API Status", False, f"Missing fields: {missing_fields}", data)
                     return False
                 
+                if data['database'] != 'ok':
+                    self.log_test("API Status", False, f"Database: {data['database']}", data)
+                    return False
+                
                 # Check integrations
                 integrations = data.get('integrations', {})
                 expected_integrations = ['paypal', 'telegram', 'testMode']
@@ -75,10 +92,9 @@ class PleyazulBackendTester:
     
     def test_content_endpoints(self):
         """Test all content loading endpoints"""
-        content_types = ['tarot', 'iching', 'rueda', 'spreads', 'presets', 'meditaciones']
         all_passed = True
         
-        for content_type in content_types:
+        for content_type in CONTENT_TYPES:
             try:
                 response = self.session.get(f"{API_BASE}/content/{content_type}")
                 
@@ -113,6 +129,19 @@ class PleyazulBackendTester:
                                 all_passed = False
                         else:
                             self.log_test(f"Content {content_type}", True, f"Content loaded successfully")
+                    
+                    # Revalidating with the ETag must not resend the content
+                    etag = response.headers.get('ETag')
+                    if not etag:
+                        self.log_test(f"Content {content_type} Revalidation", False, "Response has no ETag")
+                        all_passed = False
+                    else:
+                        revalidation = self.session.get(f"{API_BASE}/content/{content_type}", headers={'If-None-Match': etag})
+                        if revalidation.status_code == 304:
+                            self.log_test(f"Content {content_type} Revalidation", True, f"304 Not Modified for {etag}")
+                        else:
+                            self.log_test(f"Content {content_type} Revalidation", False, f"Expected 304, got {revalidation.status_code}")
+                            all_passed = False
                 else:
                     self.log_test(f"Content {content_type}", False, f"HTTP {response.status_code}", response.text)
                     all_passed = False
@@ -123,6 +152,38 @@ class PleyazulBackendTester:
         
         return all_passed
     
+    def test_content_bundle(self):
+        """Test the bundled content endpoint and its delta form"""
+        try:
+            response = self.session.get(f"{API_BASE}/content/bundle")
+            if response.status_code != 200:
+                self.log_test("Content Bundle", False, f"HTTP {response.status_code}", response.text)
+                return False
+            
+            bundle = response.json()
+            versions = bundle.get('versions', {})
+            missing = [content_type for content_type in CONTENT_TYPES if content_type not in bundle.get('content', {})]
+            if missing or set(versions) != set(CONTENT_TYPES):
+                self.log_test("Content Bundle", False, f"Missing content types: {missing}", versions)
+                return False
+            self.log_test("Content Bundle", True, f"Bundle {bundle.get('version')} with {len(versions)} content types")
+            
+            # Claim an outdated tarot only: the delta must contain tarot and nothing else
+            since = ','.join(f"{content_type}:{'0' if content_type == 'tarot' else version}"
+                             for content_type, version in versions.items())
+            delta = self.session.get(f"{API_BASE}/content/bundle", params={'since': since}).json()
+            if list(delta.get('content', {}).keys()) == ['tarot'] and len(delta.get('unchanged', [])) == len(CONTENT_TYPES) - 1:
+                self.log_test("Content Bundle Delta", True, "Delta returned only the changed content type")
+                return True
+            
+            self.log_test("Content Bundle Delta", False, "Unexpected delta contents",
+                          {'content': list(delta.get('content', {}).keys()), 'unchanged': delta.get('unchanged')})
+            return False
+            
+        except Exception as e:
+            self.log_test("Content Bundle", False, f"Error: {str(e)}")
+            return False
+    
     def test_checkout_flow(self):
         """Test order creation and checkout flow"""
         try:
@@ -410,6 +471,207 @@ class PleyazulBackendTester:
             self.log_test("Reading Generation", False, f"Error: {str(e)}")
             return False
     
+    def test_pdf_rendering(self, order_id, timeout=60):
+        """Wait for the background PDF render to set pdf_url and check the file is a PDF"""
+        try:
+            deadline = time.time() + timeout
+            pdf_url = None
+            while time.time() < deadline:
+                reading = self.session.get(f"{API_BASE}/readings/{order_id}").json()
+                pdf_url = reading.get('pdf_url')
+                if pdf_url:
+                    break
+                time.sleep(1)
+            
+            if not pdf_url:
+                self.log_test("PDF Rendering", False, f"pdf_url not set after {timeout}s")
+                return False
+            
+            pdf_response = self.session.get(f"{BASE_URL}{pdf_url}")
+            if pdf_response.status_code != 200 or not pdf_response.content.startswith(b'%PDF'):
+                self.log_test("PDF Rendering", False, f"{pdf_url} is not a PDF (HTTP {pdf_response.status_code})")
+                return False
+            
+            ranged = self.session.get(f"{BASE_URL}{pdf_url}", headers={'Range': 'bytes=0-3'})
+            if ranged.status_code != 206 or ranged.content != b'%PDF':
+                self.log_test("PDF Rendering", False, f"Range request answered HTTP {ranged.status_code}")
+                return False
+
+            document = self.session.get(f"{API_BASE}/readings/{order_id}/document")
+            if document.status_code != 200 or 'Pleyazul Oráculos' not in document.text:
+                self.log_test("PDF Rendering", False, f"Reading document answered HTTP {document.status_code}")
+                return False
+
+            self.log_test("PDF Rendering", True, f"{pdf_url} rendered ({len(pdf_response.content)} bytes, ranges supported)")
+            return True
+            
+        except Exception as e:
+            self.log_test("PDF Rendering", False, f"Error: {str(e)}")
+            return False
+    
+    def test_order_events(self, order_id, timeout=30):
+        """The events stream reports a finished order's state, then `done`, and 404s for unknown orders"""
+        try:
+            missing = self.session.get(f"{API_BASE}/orders/no-such-order/events", timeout=timeout)
+            if missing.status_code != 404:
+                self.log_test("Order Events", False, f"Unknown order should be 404, got {missing.status_code}")
+                return False
+
+            events = []
+            event = {}
+            with self.session.get(f"{API_BASE}/orders/{order_id}/events", stream=True, timeout=timeout) as response:
+                if response.status_code != 200 or not response.headers.get('content-type', '').startswith('text/event-stream'):
+                    self.log_test("Order Events", False, f"HTTP {response.status_code} {response.headers.get('content-type')}")
+                    return False
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith('event: '):
+                        event['event'] = line[len('event: '):]
+                    elif line.startswith('data: '):
+                        event['data'] = json.loads(line[len('data: '):])
+                    elif not line and event:
+                        events.append(event)
+                        event = {}
+                        if events[-1].get('event') == 'done':
+                            break
+
+            statuses = [e['data'] for e in events if e.get('event') == 'status']
+            if not statuses or statuses[-1].get('stage') != 'pdf_ready' or not statuses[-1].get('finished') \
+                    or events[-1].get('event') != 'done':
+                self.log_test("Order Events", False, f"Unexpected events: {events}")
+                return False
+
+            self.log_test("Order Events", True, f"Stream reported {statuses[-1]['stage']} and closed")
+            return True
+
+        except Exception as e:
+            self.log_test("Order Events", False, f"Error: {str(e)}")
+            return False
+
+    def _create_unpaid_order(self):
+        """Create an order through checkout without paying it, so no job generates its reading"""
+        spreads = self.session.get(f"{API_BASE}/content/spreads").json()
+        order_data = {"email": "race@pleyazul.com", "spread_id": list(spreads.keys())[0]}
+        response = self.session.post(f"{API_BASE}/checkout", json=order_data)
+        return response.json().get('order_id') if response.status_code == 200 else None
+
+    def test_concurrent_reading_generation(self, parallel=10):
+        """Fire parallel readings/generate calls for one order and expect a single reading"""
+        try:
+            order_id = self._create_unpaid_order()
+            if not order_id:
+                self.log_test("Concurrent Reading Generation", False, "Cannot create test order")
+                return False
+
+            # requests.Session is not thread-safe, so each call gets its own,
+            # recording into the suite's metrics like every other request
+            def generate(_):
+                with TimedSession(self.metrics) as session:
+                    session.headers.update(self.session.headers)
+                    return session.post(f"{API_BASE}/readings/generate", json={"order_id": order_id}, timeout=60)
+
+            with ThreadPoolExecutor(max_workers=parallel) as pool:
+                responses = list(pool.map(generate, range(parallel)))
+
+            failed = [r.status_code for r in responses if r.status_code != 200]
+            if failed:
+                self.log_test("Concurrent Reading Generation", False, f"Non-200 responses: {failed}")
+                return False
+
+            reading_ids = {r.json()['reading']['_id'] for r in responses}
+            stored = self.session.get(f"{API_BASE}/readings/{order_id}").json()
+            if len(reading_ids) != 1 or stored.get('_id') not in reading_ids:
+                self.log_test("Concurrent Reading Generation", False,
+                              f"{parallel} calls produced readings {sorted(reading_ids)}, stored {stored.get('_id')}")
+                return False
+
+            self.log_test("Concurrent Reading Generation", True, f"{parallel} parallel calls returned one reading")
+            return True
+
+        except Exception as e:
+            self.log_test("Concurrent Reading Generation", False, f"Error: {str(e)}")
+            return False
+
+    def test_checkout_idempotency(self):
+        """A repeated Idempotency-Key returns the first order; a different body is rejected"""
+        try:
+            spreads = self.session.get(f"{API_BASE}/content/spreads").json()
+            spread_id = list(spreads.keys())[0]
+            order_data = {"email": "idempotent@pleyazul.com", "spread_id": spread_id}
+            headers = {'Idempotency-Key': str(uuid.uuid4())}
+
+            first = self.session.post(f"{API_BASE}/checkout", json=order_data, headers=headers)
+            retry = self.session.post(f"{API_BASE}/checkout", json=order_data, headers=headers)
+            if first.status_code != 200 or retry.status_code != 200:
+                self.log_test("Checkout Idempotency", False, f"HTTP {first.status_code} / {retry.status_code}", retry.text)
+                return False
+
+            if first.json().get('order_id') != retry.json().get('order_id'):
+                self.log_test("Checkout Idempotency", False, "Retry created a second order")
+                return False
+
+            mismatch = self.session.post(f"{API_BASE}/checkout", json={**order_data, "email": "other@pleyazul.com"},
+                                         headers=headers)
+            if mismatch.status_code != 422:
+                self.log_test("Checkout Idempotency", False, f"Reused key with another body should be 422, got {mismatch.status_code}")
+                return False
+
+            self.log_test("Checkout Idempotency", True, f"Retry replayed order {first.json()['order_id']}")
+            return True
+
+        except Exception as e:
+            self.log_test("Checkout Idempotency", False, f"Error: {str(e)}")
+            return False
+
+    def test_orders_pagination(self):
+        """Walk two pages of GET /api/orders and check cursors, projection and filters"""
+        try:
+            first = self.session.get(f"{API_BASE}/orders", params={'limit': 2, 'fields': 'status,spread_id'})
+            if first.status_code != 200:
+                self.log_test("Orders Pagination", False, f"HTTP {first.status_code}", first.text)
+                return False
+
+            page = first.json()
+            allowed = {'order_id', 'created_at', 'status', 'spread_id'}
+            extra = [key for order in page['orders'] for key in order if key not in allowed]
+            if extra:
+                self.log_test("Orders Pagination", False, f"Projection leaked fields: {sorted(set(extra))}")
+                return False
+
+            # Without fields= only public columns are listed, never the checkout internals
+            default = self.session.get(f"{API_BASE}/orders", params={'limit': 50}).json()
+            internal = {'idempotency_key', 'idempotency_fingerprint', 'checkout_response'}
+            leaked = [key for order in default['orders'] for key in order if key in internal]
+            if leaked:
+                self.log_test("Orders Pagination", False, f"Default listing leaked fields: {sorted(set(leaked))}")
+                return False
+
+            if page['next_cursor']:
+                second = self.session.get(f"{API_BASE}/orders", params={
+                    'limit': 2, 'fields': 'status', 'cursor': page['next_cursor']
+                }).json()
+                first_ids = {order['order_id'] for order in page['orders']}
+                overlap = [order['order_id'] for order in second['orders'] if order['order_id'] in first_ids]
+                if overlap:
+                    self.log_test("Orders Pagination", False, f"Pages overlap: {overlap}")
+                    return False
+
+            completed = self.session.get(f"{API_BASE}/orders", params={'status': 'completed', 'fields': 'status'}).json()
+            if any(order['status'] != 'completed' for order in completed['orders']):
+                self.log_test("Orders Pagination", False, "Status filter returned other statuses")
+                return False
+
+            bad = self.session.get(f"{API_BASE}/orders", params={'cursor': 'not-a-cursor'})
+            if bad.status_code != 400:
+                self.log_test("Orders Pagination", False, f"Malformed cursor should be 400, got {bad.status_code}")
+                return False
+
+            self.log_test("Orders Pagination", True, "Keyset pages, projection, status filter and cursor validation work")
+            return True
+
+        except Exception as e:
+            self.log_test("Orders Pagination", False, f"Error: {str(e)}")
+            return False
+
     def test_database_operations(self, order_id=None):
         """Test database operations - orders and readings"""
         try:
@@ -417,10 +679,12 @@ class PleyazulBackendTester:
             response = self.session.get(f"{API_BASE}/orders")
             
             if response.status_code == 200:
-                orders = response.json()
+                page = response.json()
+                orders = page.get('orders') if isinstance(page, dict) else None
                 
-                if isinstance(orders, list):
+                if isinstance(orders, list) and 'next_cursor' in page:
                     self.log_test("Database Orders", True, f"Retrieved {len(orders)} orders from database")
+                    self.test_orders_pagination()
                     
                     # If we have an order_id, test specific order retrieval
                     if order_id:
@@ -435,6 +699,13 @@ class PleyazulBackendTester:
                                 # Test reading retrieval
                                 if 'reading' in order_data and order_data['reading']:
                                     self.log_test("Database Reading", True, "Reading found in database")
+                                    
+                                    # Repeat views of a finished reading must return the same document
+                                    repeat_data = self.session.get(f"{API_BASE}/orders/{order_id}").json()
+                                    if repeat_data.get('reading') != order_data['reading']:
+                                        self.log_test("Database Repeat View", False, "Repeat view returned a different reading")
+                                        return False
+                                    self.log_test("Database Repeat View", True, "Repeat view returned the same reading")
                                     return True
                                 else:
                                     # Try direct reading endpoint
@@ -455,7 +726,7 @@ class PleyazulBackendTester:
                     else:
                         return True
                 else:
-                    self.log_test("Database Orders", False, "Orders response is not an array", orders)
+                    self.log_test("Database Orders", False, "Orders response is not a page of orders", page)
                     return False
             else:
                 self.log_test("Database Orders", False, f"HTTP {response.status_code}", response.text)
@@ -514,6 +785,51 @@ class PleyazulBackendTester:
             self.log_test("Error Handling - Missing Fields", False, f"Error: {str(e)}")
             all_passed = False
         
+        # Test malformed bodies are rejected before reaching the database
+        try:
+            malformed = self.session.post(f"{API_BASE}/checkout", data="{not json")
+            invalid_email = self.session.post(f"{API_BASE}/checkout", json={"email": "not-an-email", "spread_id": "tarot_3_ppf"})
+            
+            if malformed.status_code == 400 and invalid_email.status_code == 400 and 'details' in invalid_email.json():
+                self.log_test("Error Handling - Malformed Body", True, "Rejected invalid JSON and invalid email with 400")
+            else:
+                self.log_test("Error Handling - Malformed Body", False,
+                              f"Expected 400/400, got {malformed.status_code}/{invalid_email.status_code}")
+                all_passed = False
+                
+        except Exception as e:
+            self.log_test("Error Handling - Malformed Body", False, f"Error: {str(e)}")
+            all_passed = False
+
+        # Test every JSON endpoint validates its body (null, wrong types) with a 400
+        # (mock payment answers 403 outside TEST_MODE, like the rest of the suite assumes)
+        invalid_bodies = [
+            ("readings/generate-batch", None),
+            ("readings/generate-batch", {"order_ids": [1, 2]}),
+            ("readings/generate-batch", {"order_ids": ["order"] * 501}),
+            ("telegram/send-reading", None),
+            ("telegram/send-reading", {"order_id": "order", "chat_id": {"id": 1}}),
+            ("paypal/mock-payment", None),
+            ("paypal/mock-payment", {}),
+        ]
+        try:
+            statuses = [
+                (path, self.session.post(f"{API_BASE}/{path}", json=body).status_code)
+                for path, body in invalid_bodies
+            ]
+            rejected = [status for _, status in statuses if status == 400]
+
+            if len(rejected) == len(statuses):
+                self.log_test("Error Handling - Body Schemas", True, f"Rejected {len(statuses)} invalid bodies with 400")
+            else:
+                self.log_test("Error Handling - Body Schemas", False,
+                              ", ".join(f"{path}: {status}" for path, status in statuses if status != 400))
+                all_passed = False
+
+        except Exception as e:
+            self.log_test("Error Handling - Body Schemas", False, f"Error: {str(e)}")
+            all_passed = False
+
         # Test non-existent order
         try:
             fake_order_id = "non_existent_order_12345"
@@ -531,6 +847,44 @@ class PleyazulBackendTester:
         
         return all_passed
     
+    def test_telegram_delivery(self, order_id, timeout=30):
+        """send-reading queues delivery (202) and the worker marks it sent; resend requires the admin password"""
+        try:
+            for auth_headers in ({'Authorization': 'Bearer wrong-password'}, {}):
+                resend = self.session.post(f"{API_BASE}/admin/telegram/resend", json={"failed_only": True},
+                                           headers=auth_headers)
+                if resend.status_code != 401:
+                    self.log_test("Telegram Delivery", False, f"Resend without admin password should be 401, got {resend.status_code}")
+                    return False
+
+            response = self.session.post(f"{API_BASE}/telegram/send-reading", json={"order_id": order_id, "chat_id": 424242})
+            if response.status_code == 503:
+                self.log_test("Telegram Delivery", True, "Bot not configured; delivery not exercised")
+                return True
+            if response.status_code != 202:
+                self.log_test("Telegram Delivery", False, f"HTTP {response.status_code}", response.text)
+                return False
+
+            deadline = time.time() + timeout
+            status = None
+            while time.time() < deadline:
+                reading = self.session.get(f"{API_BASE}/orders/{order_id}").json().get('reading') or {}
+                status = reading.get('telegram_status')
+                if status in ('sent', 'failed'):
+                    break
+                time.sleep(1)
+
+            if status != 'sent':
+                self.log_test("Telegram Delivery", False, f"Delivery status after {timeout}s: {status}")
+                return False
+
+            self.log_test("Telegram Delivery", True, f"Reading {order_id} delivered through the queue")
+            return True
+
+        except Exception as e:
+            self.log_test("Telegram Delivery", False, f"Error: {str(e)}")
+            return False
+
     def test_admin_endpoints(self):
         """Test admin functionality"""
         try:
@@ -578,7 +932,7 @@ class PleyazulBackendTester:
         
         # Test 2: Content Loading
         print("\n2. Testing Content Loading Endpoints...")
-        content_status = self.test_content_endpoints()
+        content_status = self.test_content_endpoints() and self.test_content_bundle()
         
         # Test 3: Media Support (NEW)
         print("\n3. Testing Media Support (Images & Audio)...")
@@ -595,6 +949,9 @@ class PleyazulBackendTester:
         # Test 6: Reading Generation with Images
         print("\n6. Testing Reading Generation with Media Support...")
         reading_status = self.test_reading_generation(order_id if order_id else None)
+        if order_id:
+            reading_status = self.test_pdf_rendering(order_id) and reading_status
+            reading_status = self.test_order_events(order_id) and reading_status
         
         # Test 7: Database Operations
         print("\n7. Testing Database Operations...")
@@ -607,6 +964,12 @@ class PleyazulBackendTester:
         # Test 9: Admin Endpoints
         print("\n9. Testing Admin Endpoints...")
         admin_status = self.test_admin_endpoints()
+        if order_id:
+            admin_status = self.test_telegram_delivery(order_id) and admin_status
+        
+        # Test 10: Idempotency and concurrent writes
+        print("\n10. Testing Idempotency and Concurrent Reading Generation...")
+        race_status = self.test_checkout_idempotency() and self.test_concurrent_reading_generation()
         
         # Summary
         print("\n" + "=" * 60)
@@ -629,12 +992,16 @@ class PleyazulBackendTester:
                 if not result['success']:
                     print(f"  - {result['test']}: {result['message']}")
         
+        # Latency per endpoint
+        print("\n⏱️  LATENCY BY ENDPOINT")
+        self.metrics.print_summary()
+        
         # Enhanced features status
         enhanced_features = [demo_status, media_status]
         print(f"\n🆕 ENHANCED FEATURES: {'WORKING' if all(enhanced_features) else 'ISSUES DETECTED'}")
         
         # Overall status
-        critical_systems = [api_status, content_status, bool(order_id), reading_status]
+        critical_systems = [api_status, content_status, bool(order_id), reading_status, race_status]
         if all(critical_systems):
             print("\n🎉 CORE FUNCTIONALITY: WORKING")
             if all(enhanced_features):
@@ -647,14 +1014,283 @@ class PleyazulBackendTester:
             print("\n⚠️  CORE FUNCTIONALITY: ISSUES DETECTED")
             return False
 
+LOAD_SCENARIOS = ['content', 'purchase', 'mixed']
+
+
+class PleyazulLoadTester:
+    """Replays the backend scenarios concurrently through a bounded connection pool.
+
+    Without a rate the tester runs closed-loop: `concurrency` virtual users
+    repeat scenarios back to back. With a rate it runs open-loop: scenarios
+    start at `rate` per second and at most `concurrency` run at once.
+    """
+
+    def __init__(self, concurrency=20, rate=None, duration=30, scenario='mixed', timeout=30,
+                 verify_completion=False, completion_timeout=120):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.scenario = scenario
+        self.timeout = timeout
+        self.verify_completion = verify_completion
+        self.completion_timeout = completion_timeout
+        self.spread_ids = []
+        self.metrics = EndpointMetrics(track_recent=False)
+        self.scenarios_started = 0
+        self.late_starts = 0
+        self.elapsed = 0.0
+        # order_id -> perf_counter() when its mock payment returned
+        self.paid_orders = {}
+        self.completion = None
+
+    async def _request(self, http, method, endpoint, url, **kwargs):
+        return await timed_request(http, self.metrics, method, endpoint, url, **kwargs)
+
+    async def scenario_content(self, http):
+        """Fetch one content type, as the PWA does on page load"""
+        content_type = random.choice(CONTENT_TYPES)
+        await self._request(http, 'GET', 'GET /content/{type}', f"{API_BASE}/content/{content_type}")
+
+    async def scenario_purchase(self, http):
+        """Checkout, pay through the mock payment and open the lectura page's order view"""
+        order_data = {
+            "email": "load@pleyazul.com",
+            "spread_id": random.choice(self.spread_ids),
+            "custom_question": "Load test question"
+        }
+        status, data = await self._request(http, 'POST', 'POST /checkout', f"{API_BASE}/checkout", json=order_data)
+        if status != 200 or not data or not data.get('order_id'):
+            return
+
+        order_id = data['order_id']
+        status, _ = await self._request(http, 'POST', 'POST /paypal/mock-payment',
+                                        f"{API_BASE}/paypal/mock-payment", json={"order_id": order_id})
+        if status != 200:
+            return
+        self.paid_orders[order_id] = time.perf_counter()
+
+        # The reading is generated by the job worker, so this usually sees the order still paid
+        await self._request(http, 'GET', 'GET /orders/{id}', f"{API_BASE}/orders/{order_id}")
+
+    async def wait_for_completion(self, http):
+        """Poll every paid order until its reading and PDF exist or completion_timeout passes"""
+        poll_metrics = EndpointMetrics(track_recent=False)
+        lag = LatencyHistogram()
+        pending = set(self.paid_orders)
+        slots = asyncio.Semaphore(self.concurrency)
+        deadline = time.perf_counter() + self.completion_timeout
+
+        async def check(order_id):
+            async with slots:
+                status, data = await timed_request(http, poll_metrics, 'GET', 'GET /orders/{id}',
+                                                   f"{API_BASE}/orders/{order_id}")
+            reading = (data or {}).get('reading') or {}
+            order = (data or {}).get('order') or {}
+            if status == 200 and order.get('status') == 'completed' and reading.get('pdf_url'):
+                pending.discard(order_id)
+                lag.record((time.perf_counter() - self.paid_orders[order_id]) * 1000)
+
+        while pending and time.perf_counter() < deadline:
+            await asyncio.gather(*(check(order_id) for order_id in list(pending)))
+            if pending:
+                await asyncio.sleep(1)
+
+        self.completion = {
+            'orders': len(self.paid_orders),
+            'completed': len(self.paid_orders) - len(pending),
+            'incomplete_order_ids': sorted(pending)[:20],
+            'timeout_s': self.completion_timeout,
+            # Upper bound: includes up to one poll interval of observation delay
+            'lag_ms': {
+                'p50': lag.percentile(50),
+                'p95': lag.percentile(95),
+                'max': lag.max or 0
+            }
+        }
+
+    async def _run_scenario(self, http):
+        self.scenarios_started += 1
+        name = self.scenario
+        if name == 'mixed':
+            name = random.choice(['content', 'purchase'])
+        if name == 'content':
+            await self.scenario_content(http)
+        else:
+            await self.scenario_purchase(http)
+
+    async def _closed_loop(self, http, deadline):
+        async def virtual_user():
+            while time.perf_counter() < deadline:
+                await self._run_scenario(http)
+
+        await asyncio.gather(*(virtual_user() for _ in range(self.concurrency)))
+
+    async def _open_loop(self, http, deadline):
+        slots = asyncio.Semaphore(self.concurrency)
+        interval = 1.0 / self.rate
+        next_start = time.perf_counter()
+        tasks = set()
+
+        async def run_in_slot():
+            try:
+                await self._run_scenario(http)
+            finally:
+                slots.release()
+
+        while next_start < deadline:
+            delay = next_start - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if slots.locked():
+                # Every slot is busy: the arrival is delayed, so the target rate is not being met
+                self.late_starts += 1
+            await slots.acquire()
+            task = asyncio.create_task(run_in_slot())
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            next_start += interval
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def run(self):
+        """Run the configured scenario until the duration elapses"""
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = {'User-Agent': 'PleyazulLoadTester/1.0'}
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as http:
+            if self.scenario != 'content':
+                async with http.get(f"{API_BASE}/content/spreads") as response:
+                    spreads = await response.json()
+                self.spread_ids = list(spreads.keys())
+                if not self.spread_ids:
+                    raise RuntimeError('No spreads available for the purchase scenario')
+
+            start = time.perf_counter()
+            deadline = start + self.duration
+            if self.rate:
+                await self._open_loop(http, deadline)
+            else:
+                await self._closed_loop(http, deadline)
+            self.elapsed = time.perf_counter() - start
+
+            if self.verify_completion:
+                await self.wait_for_completion(http)
+
+        return self.report()
+
+    def report(self):
+        """Summarize throughput and latency percentiles per endpoint"""
+        endpoints = {}
+        for endpoint, stats in self.metrics.summary().items():
+            endpoints[endpoint] = {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'throughput_rps': stats['requests'] / self.elapsed if self.elapsed else 0.0,
+                'p50_ms': stats['wall_ms']['p50'],
+                'p95_ms': stats['wall_ms']['p95'],
+                'p99_ms': stats['wall_ms']['p99'],
+                'ttfb_p95_ms': stats['ttfb_ms']['p95'],
+                'max_ms': stats['max_ms']
+            }
+
+        total_requests = sum(e['requests'] for e in endpoints.values())
+        return {
+            'base_url': BASE_URL,
+            'scenario': self.scenario,
+            'concurrency': self.concurrency,
+            'target_rate': self.rate,
+            'duration_s': self.elapsed,
+            'scenarios_started': self.scenarios_started,
+            'late_starts': self.late_starts,
+            'total_requests': total_requests,
+            'total_errors': sum(e['errors'] for e in endpoints.values()),
+            'throughput_rps': total_requests / self.elapsed if self.elapsed else 0.0,
+            'endpoints': endpoints,
+            'histograms': self.metrics.to_dict()['histograms'],
+            'completion': self.completion
+        }
+
+
+def print_load_report(report):
+    """Print a load report as a per-endpoint table"""
+    print("🔮 LOAD TEST SUMMARY")
+    print("=" * 60)
+    rate = f"{report['target_rate']}/s" if report['target_rate'] else 'closed loop'
+    print(f"Scenario: {report['scenario']} | Concurrency: {report['concurrency']} | Arrival rate: {rate}")
+    print(f"Duration: {report['duration_s']:.1f}s | Scenarios: {report['scenarios_started']} | "
+          f"Requests: {report['total_requests']} | Errors: {report['total_errors']}")
+    print(f"Throughput: {report['throughput_rps']:.1f} req/s")
+    if report['late_starts']:
+        print(f"⚠️  {report['late_starts']} arrivals waited for a free slot (target rate not sustained)")
+
+    print(f"\n{'Endpoint':<28}{'req':>7}{'err':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for endpoint, stats in report['endpoints'].items():
+        print(f"{endpoint:<28}{stats['requests']:>7}{stats['errors']:>6}{stats['throughput_rps']:>9.1f}"
+              f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+    print("(latencies in ms)")
+
+    completion = report.get('completion')
+    if completion:
+        print(f"\nEventual completion: {completion['completed']}/{completion['orders']} paid orders have a reading and PDF")
+        if completion['completed']:
+            lag = completion['lag_ms']
+            print(f"Payment to completion: p50 {lag['p50'] / 1000:.1f}s | p95 {lag['p95'] / 1000:.1f}s | max {lag['max'] / 1000:.1f}s")
+        if completion['incomplete_order_ids']:
+            print(f"❌ Still incomplete after {completion['timeout_s']}s: {', '.join(completion['incomplete_order_ids'])}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Pleyazul Oráculos backend test suite')
+    parser.add_argument('--load', action='store_true', help='run the concurrent load mode instead of the functional suite')
+    parser.add_argument('--scenario', choices=LOAD_SCENARIOS, default='mixed', help='load scenario to replay')
+    parser.add_argument('--concurrency', type=int, default=20, help='maximum in-flight scenarios and pooled connections')
+    parser.add_argument('--rate', type=float, default=None, help='scenario arrivals per second (default: closed loop)')
+    parser.add_argument('--duration', type=float, default=30, help='load duration in seconds')
+    parser.add_argument('--verify-completion', action='store_true',
+                        help='after the load, wait until every paid order has its reading and PDF (needs a job worker)')
+    parser.add_argument('--completion-timeout', type=float, default=120, help='seconds to wait for --verify-completion')
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+
+    if args.load:
+        load_tester = PleyazulLoadTester(
+            concurrency=args.concurrency,
+            rate=args.rate,
+            duration=args.duration,
+            scenario=args.scenario,
+            verify_completion=args.verify_completion,
+            completion_timeout=args.completion_timeout
+        )
+        report = asyncio.run(load_tester.run())
+        print_load_report(report)
+
+        load_path = os.path.join(RESULTS_DIR, 'load_test_results.json')
+        with open(load_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        print(f"\n📄 Load report saved to: {load_path}")
+        completion = report['completion']
+        all_completed = completion is None or completion['completed'] == completion['orders']
+        exit(0 if report['total_errors'] == 0 and all_completed else 1)
+
     tester = PleyazulBackendTester()
     success = tester.run_all_tests()
     
-    # Save detailed results
-    with open('/app/test_results_detailed.json', 'w') as f:
+    # Save detailed results and latency histograms
+    results_path = os.path.join(RESULTS_DIR, 'test_results_detailed.json')
+    with open(results_path, 'w') as f:
         json.dump(tester.test_results, f, indent=2)
     
-    print(f"\n📄 Detailed results saved to: /app/test_results_detailed.json")
+    latency_path = tester.metrics.save('test_results_latency.json')
+    
+    print(f"\n📄 Detailed results saved to: {results_path}")
+    print(f"⏱️  Latency histograms saved to: {latency_path}")
     
     exit(0 if success else 1)
\ No newline at end of file
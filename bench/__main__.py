@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Pleyazul Oráculos benchmark regression suite
+
+    python3 -m bench                      # start a local stack, compare with bench/baseline.json
+    python3 -m bench --update-baseline    # record new baseline numbers
+    python3 -m bench --base-url http://localhost:3000   # reuse a running TEST_MODE server
+    python3 -m bench --standins="--latency-ms 150"      # PayPal/Telegram over HTTP to local stand-ins
+
+Fails (exit 1) when any workload loses more than --threshold of its baseline
+throughput or its p95 latency grows by more than --threshold, and when there is
+no baseline for it to compare with (pass --allow-missing-baseline to only warn).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shlex
+import sys
+from datetime import datetime
+
+from bench.stack import LocalStack
+from bench.workloads import run_all
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """(regressions, missing): human-readable regressions of results against the
+    baseline workloads, and the workloads/endpoints the baseline has no numbers for"""
+    regressions = []
+    missing = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            missing.append(name)
+            continue
+
+        if current['throughput'] < previous['throughput'] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {current['throughput']:.1f}/s vs baseline {previous['throughput']:.1f}/s"
+            )
+
+        for endpoint, p95 in current['p95_ms'].items():
+            baseline_p95 = previous['p95_ms'].get(endpoint)
+            if baseline_p95 is None:
+                missing.append(f"{name}: {endpoint}")
+                continue
+            # Ignore sub-millisecond jitter on very fast endpoints
+            if p95 > baseline_p95 * (1 + threshold) and p95 - baseline_p95 > min_delta_ms:
+                regressions.append(f"{name}: {endpoint} p95 {p95:.1f}ms vs baseline {baseline_p95:.1f}ms")
+
+    return regressions, missing
+
+
+def print_results(results, baseline):
+    print(f"\n{'Workload':<28}{'iter/s':>9}{'base':>9}{'fail':>6}  p95 by endpoint (ms)")
+    for name, result in results.items():
+        previous = baseline.get(name, {})
+        base = f"{previous['throughput']:.1f}" if previous else '-'
+        p95 = ', '.join(f"{endpoint} {value:.1f}" for endpoint, value in result['p95_ms'].items())
+        print(f"{name:<28}{result['throughput']:>9.1f}{base:>9}{result['failures']:>6}  {p95}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Pleyazul Oráculos benchmark regression suite')
+    parser.add_argument('--base-url', help='benchmark an already running server instead of starting a local stack')
+    parser.add_argument('--iterations', type=int, default=200, help='measured iterations per workload')
+    parser.add_argument('--concurrency', type=int, default=10, help='concurrent iterations per workload')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured iterations before each workload')
+    parser.add_argument('--only', help='run only workloads whose name contains this text')
+    parser.add_argument('--threshold', type=float, default=0.15, help='allowed relative regression (0.15 = 15%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='ignore p95 regressions smaller than this')
+    parser.add_argument('--standins', nargs='?', const='', metavar='ARGS',
+                        help='route PayPal and Telegram to local stand-ins, e.g. --standins="--latency-ms 150"')
+    parser.add_argument('--update-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help='only warn about workloads with no baseline numbers instead of failing')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("🔮 Pleyazul Oráculos Benchmark Suite")
+    print("=" * 60)
+
+    if args.base_url:
+        results = asyncio.run(run_all(f"{args.base_url}/api", args.iterations, args.concurrency, args.warmup, args.only))
+    else:
+        standins = shlex.split(args.standins) if args.standins is not None else None
+        with LocalStack(standins) as base_url:
+            print(f"Local stack ready at {base_url}")
+            results = asyncio.run(run_all(f"{base_url}/api", args.iterations, args.concurrency, args.warmup, args.only))
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f).get('workloads', {})
+
+    print_results(results, baseline)
+
+    failures = {name: result['failures'] for name, result in results.items() if result['failures']}
+    if failures:
+        print(f"\n❌ Workloads with failed iterations: {failures}")
+        return 1
+
+    if args.update_baseline:
+        merged = dict(baseline)
+        merged.update(results)
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump({
+                'recorded_at': datetime.now().isoformat(),
+                'machine': f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+                'workloads': merged
+            }, f, indent=2, sort_keys=True)
+        print(f"\n📄 Baseline updated: {BASELINE_PATH}")
+        return 0
+
+    regressions, missing = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n❌ PERFORMANCE REGRESSIONS (threshold {args.threshold:.0%}):")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    # Without numbers to compare with, a passing run would prove nothing
+    if missing:
+        marker = '⚠️ ' if args.allow_missing_baseline else '❌'
+        print(f"\n{marker} No baseline for {len(missing)} workloads/endpoints; "
+              f"record one on the reference machine with --update-baseline:")
+        for entry in missing:
+            print(f"  - {entry}")
+        if not args.allow_missing_baseline:
+            return 1
+
+    print("\n✅ No performance regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env node
+// Micro-benchmark: API route matching, previous switch/startsWith chain vs the
+// compiled route table in lib/api/router
+//
+//   node bench/api-router.mjs [--iterations 1000000]
+//
+// Matches a mix of the paths the app requests (and some unknown ones) with a
+// replica of the previous GET/POST/PUT handlers' routing and with the compiled
+// table, checks both pick the same handler, then dispatches content requests
+// end to end through handleApiRequest (the content domain needs no database).
+
+import { performance } from 'perf_hooks';
+
+const { API_ROUTES, compileRoutes, handleApiRequest } = await import('../lib/api/router.js');
+
+const iterationsArg = process.argv.indexOf('--iterations');
+const ITERATIONS = iterationsArg > 0 ? Number(process.argv[iterationsArg + 1]) : 1000000;
+
+const CONTENT_TYPES = ['tarot', 'iching', 'rueda', 'spreads', 'presets', 'meditaciones'];
+
+// The routing this replaces: one switch per method on the joined path, then
+// regular expressions and prefix checks in order. Returns the handler name.
+function legacyMatch(method, segments) {
+  const path = segments.join('/');
+  if (method === 'GET') {
+    switch (path) {
+      case '':
+      case 'status':
+        return 'getStatus';
+      case 'content/tarot':
+      case 'content/iching':
+      case 'content/rueda':
+      case 'content/spreads':
+      case 'content/presets':
+      case 'content/meditaciones':
+        return 'getContent';
+      case 'content/bundle':
+        return 'getContentBundle';
+      case 'content/schema/tarot':
+      case 'content/schema/iching':
+      case 'content/schema/rueda':
+      case 'content/schema/spreads':
+      case 'content/schema/presets':
+      case 'content/schema/meditaciones':
+        return 'getContentSchema';
+      case 'orders':
+        return 'listOrders';
+      default:
+        if (/^orders\/[^/]+\/events$/.test(path)) {
+          return 'streamOrderEvents';
+        }
+        if (path.startsWith('orders/')) {
+          return 'getOrder';
+        }
+        if (/^readings\/[^/]+\/pdf$/.test(path)) {
+          return 'getReadingPdf';
+        }
+        if (/^readings\/[^/]+\/document$/.test(path)) {
+          return 'getReadingDocument';
+        }
+        if (path.startsWith('readings/')) {
+          return 'getReading';
+        }
+        if (path === 'admin/setup-status') {
+          return 'getSetupStatus';
+        }
+        return null;
+    }
+  }
+  if (method === 'POST') {
+    switch (path) {
+      case 'checkout': return 'checkout';
+      case 'readings/generate': return 'generateReading';
+      case 'readings/generate-batch': return 'generateReadingBatch';
+      case 'telegram/send-reading': return 'sendReading';
+      case 'admin/telegram/resend': return 'resendTelegram';
+      case 'demo/reading': return 'createDemoReading';
+      case 'admin/content': return 'saveContent';
+      case 'paypal/mock-payment': return 'mockPayment';
+      default: return null;
+    }
+  }
+  if (method === 'PUT' && path.startsWith('webhooks/')) {
+    const webhookType = path.split('/')[1];
+    return { paypal: 'paypalWebhook', telegram: 'telegramWebhook' }[webhookType] || null;
+  }
+  return null;
+}
+
+const orderId = '3f2b8c1e-6a4d-4e7b-9c2a-1d5e8f7a6b3c';
+const requests = [
+  ['GET', 'status'],
+  ...CONTENT_TYPES.map((type) => ['GET', `content/${type}`]),
+  ['GET', 'content/bundle'],
+  ['GET', 'content/schema/tarot'],
+  ['GET', 'orders'],
+  ['GET', `orders/${orderId}`],
+  ['GET', `orders/${orderId}/events`],
+  ['GET', `readings/${orderId}`],
+  ['GET', `readings/${orderId}/pdf`],
+  ['GET', `readings/${orderId}/document`],
+  ['GET', 'admin/setup-status'],
+  ['POST', 'checkout'],
+  ['POST', 'paypal/mock-payment'],
+  ['POST', 'readings/generate'],
+  ['POST', 'telegram/send-reading'],
+  ['POST', 'admin/content'],
+  ['PUT', 'webhooks/paypal'],
+  ['PUT', 'webhooks/telegram'],
+  ['GET', 'favicon.ico'],
+  ['POST', 'unknown/endpoint']
+].map(([method, path]) => [method, path ? path.split('/') : []]);
+
+const router = compileRoutes(API_ROUTES);
+const compiledMatch = (method, segments) => router.match(method, segments)?.route?.pattern ?? null;
+
+// Both routings pick the same handler for every path in the mix
+const handlerByPattern = new Map(API_ROUTES.map(([method, pattern, , handler]) => [`${method} ${pattern}`, handler]));
+for (const [method, segments] of requests) {
+  const match = router.match(method, segments);
+  const compiled = match?.route ? handlerByPattern.get(`${method} ${match.route.pattern}`) : null;
+  if (compiled !== legacyMatch(method, segments)) {
+    console.error(`❌ ${method} /${segments.join('/')}: ${compiled} vs ${legacyMatch(method, segments)}`);
+    process.exit(1);
+  }
+}
+
+function measure(match) {
+  let found = 0;
+  for (let i = 0; i < 100000; i++) {
+    const [method, segments] = requests[i % requests.length];
+    found += match(method, segments) ? 1 : 0;
+  }
+
+  const start = performance.now();
+  for (let i = 0; i < ITERATIONS; i++) {
+    const [method, segments] = requests[i % requests.length];
+    found += match(method, segments) ? 1 : 0;
+  }
+  const elapsedMs = performance.now() - start;
+  return { perSecond: ITERATIONS / (elapsedMs / 1000), found };
+}
+
+console.log(`Route matching, ${ITERATIONS} lookups over ${requests.length} paths (lookups/s)\n`);
+const previous = measure(legacyMatch);
+const compiled = measure(compiledMatch);
+console.log(`${'previous'.padEnd(12)}${previous.perSecond.toFixed(0).padStart(12)}`);
+console.log(`${'compiled'.padEnd(12)}${compiled.perSecond.toFixed(0).padStart(12)}${`${(compiled.perSecond / previous.perSecond).toFixed(1)}x`.padStart(8)}`);
+
+// End to end: request context, lazy domain import and the content handler
+const base = 'http://localhost/api/';
+const first = await handleApiRequest(new Request(`${base}content/tarot`), ['content', 'tarot']);
+const etag = first.headers.get('etag');
+const checks = [
+  [first.status, 200],
+  [(await handleApiRequest(new Request(`${base}content/tarot`, { headers: { 'If-None-Match': etag } }), ['content', 'tarot'])).status, 304],
+  [(await handleApiRequest(new Request(`${base}content/unknown`), ['content', 'unknown'])).status, 404],
+  [(await handleApiRequest(new Request(`${base}content/tarot`, { method: 'POST' }), ['content', 'tarot'])).status, 405]
+];
+if (checks.some(([status, expected]) => status !== expected)) {
+  console.error(`❌ Unexpected content statuses: ${checks.map(([status]) => status).join(', ')}`);
+  process.exit(1);
+}
+
+const DISPATCHES = Math.max(1, Math.floor(ITERATIONS / 20));
+const start = performance.now();
+for (let i = 0; i < DISPATCHES; i++) {
+  const type = CONTENT_TYPES[i % CONTENT_TYPES.length];
+  await handleApiRequest(new Request(`${base}content/${type}`, { headers: { 'If-None-Match': '"stale"', 'Accept-Encoding': 'br' } }), ['content', type]);
+}
+const elapsedMs = performance.now() - start;
+console.log(`\nDispatched ${DISPATCHES} GET /api/content/{type} requests: ${(DISPATCHES / (elapsedMs / 1000)).toFixed(0)} requests/s`);
+
+const { default: contentService } = await import('../lib/contentService.js');
+contentService.close();
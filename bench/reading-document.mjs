@@ -0,0 +1,259 @@
+#!/usr/bin/env node
+// Micro-benchmark: reading documents (the HTML printed to PDF), previous
+// renderer vs lib/readingDocument
+//
+//   node bench/reading-document.mjs [--iterations 20000]
+//
+// For every spread, renders readings drawn from content/ with the previous
+// implementation (the whole page, stylesheet included, rebuilt through nested
+// template literals, and a new Intl formatter per call via toLocaleDateString)
+// and with the new renderer: to a string without the fragment cache (readings
+// stored before content_version existed), with it, and streamed. Then streams
+// one document into a local artifact store and checks both renderers produce
+// the same text.
+
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { performance } from 'perf_hooks';
+
+const { default: contentService } = await import('../lib/contentService.js');
+const { renderReadingDocument, streamReadingDocument } = await import('../lib/readingDocument.js');
+const { LocalArtifactStore, writeArtifact } = await import('../lib/artifactStore.js');
+
+const iterationsArg = process.argv.indexOf('--iterations');
+const ITERATIONS = iterationsArg > 0 ? Number(process.argv[iterationsArg + 1]) : 20000;
+
+// The implementation this replaces, kept verbatim for comparison
+function legacyGenerateReadingHTML(reading, orderData) {
+  const date = new Date().toLocaleDateString('es-ES', {
+    year: 'numeric',
+    month: 'long',
+    day: 'numeric'
+  });
+
+  let contentHTML = '';
+
+  if (reading.type === 'tarot') {
+    contentHTML = `
+      <div class="reading-content">
+        <h2>Lectura de Tarot</h2>
+        <p class="spread-name">Tirada: ${reading.spread.posiciones ? reading.spread.posiciones.join(' - ') : 'Lectura Personal'}</p>
+
+        <div class="cards-section">
+          ${reading.cards.map((card, index) => `
+            <div class="card-interpretation">
+              <h3>${card.position}</h3>
+              <h4>${card.name} ${card.reversed ? '(Invertida)' : ''}</h4>
+              <p><strong>Significado:</strong> ${card.interpretation}</p>
+              <p><strong>Consejo:</strong> ${card.advice}</p>
+            </div>
+          `).join('')}
+        </div>
+      </div>
+    `;
+  } else if (reading.type === 'iching') {
+    contentHTML = `
+      <div class="reading-content">
+        <h2>Consulta del I Ching</h2>
+        <h3>Hexagrama ${reading.hexagram.hex}: ${reading.hexagram.nombre}</h3>
+
+        <div class="hexagram-section">
+          <p><strong>Palabras Clave:</strong> ${reading.hexagram.palabras_clave.join(', ')}</p>
+          <p><strong>Juicio:</strong> ${reading.hexagram.juicio}</p>
+          <p><strong>Imagen:</strong> ${reading.hexagram.imagen}</p>
+          <p><strong>Consejo:</strong> ${reading.hexagram.consejo}</p>
+        </div>
+      </div>
+    `;
+  } else if (reading.type === 'rueda') {
+    contentHTML = `
+      <div class="reading-content">
+        <h2>Medicina de la Rueda Sagrada</h2>
+
+        <div class="animals-section">
+          ${reading.animals.map((animal, index) => `
+            <div class="animal-interpretation">
+              <h3>${animal.position}</h3>
+              <h4>${animal.animal} - ${animal.arquetipo}</h4>
+              <p><strong>Luz:</strong> ${animal.luz}</p>
+              <p><strong>Sombra:</strong> ${animal.sombra}</p>
+              <p><strong>Medicina:</strong> ${animal.medicina}</p>
+              <p><strong>Afirmación:</strong> ${animal.afirmacion}</p>
+            </div>
+          `).join('')}
+        </div>
+      </div>
+    `;
+  }
+
+  return `
+    <!DOCTYPE html>
+    <html lang="es">
+    <head>
+      <meta charset="UTF-8">
+      <meta name="viewport" content="width=device-width, initial-scale=1.0">
+      <title>Lectura Pleyazul - ${orderData.order_id}</title>
+      <style>
+        body {
+          font-family: 'Georgia', serif;
+          line-height: 1.6;
+          max-width: 800px;
+          margin: 0 auto;
+          padding: 20px;
+          color: #333;
+        }
+        .header {
+          text-align: center;
+          border-bottom: 2px solid #8B4513;
+          padding-bottom: 20px;
+          margin-bottom: 30px;
+        }
+        .header h1 {
+          color: #8B4513;
+          font-size: 2.5em;
+          margin: 0;
+        }
+        .date {
+          color: #666;
+          font-style: italic;
+        }
+        .card-interpretation, .animal-interpretation {
+          margin: 20px 0;
+          padding: 15px;
+          border-left: 4px solid #8B4513;
+          background: #f9f9f9;
+        }
+        .card-interpretation h3, .animal-interpretation h3 {
+          color: #8B4513;
+          margin-top: 0;
+        }
+        .disclaimer {
+          margin-top: 40px;
+          padding: 20px;
+          background: #f0f0f0;
+          border-radius: 5px;
+          font-size: 0.9em;
+          text-align: center;
+        }
+        .spiritual-note {
+          margin-top: 30px;
+          padding: 15px;
+          background: #e8f5e8;
+          border-radius: 5px;
+          font-style: italic;
+          text-align: center;
+        }
+      </style>
+    </head>
+    <body>
+      <div class="header">
+        <h1>🔮 Pleyazul Oráculos</h1>
+        <p class="date">Lectura realizada el ${date}</p>
+        <p>Para: ${orderData.email}</p>
+      </div>
+
+      ${contentHTML}
+
+      <div class="spiritual-note">
+        <p><strong>Mensaje Espiritual:</strong> ${reading.message}</p>
+      </div>
+
+      <div class="disclaimer">
+        <p><strong>Disclaimer:</strong> Este servicio es de carácter espiritual y recreativo. No sustituye el asesoramiento médico, legal o profesional.</p>
+        <p>Honramos las tradiciones Dakota, Lakota y Nakota en el uso respetuoso de la Rueda Medicinal.</p>
+      </div>
+    </body>
+    </html>
+  `;
+}
+
+async function drain(stream) {
+  let bytes = 0;
+  for await (const chunk of stream) {
+    bytes += chunk.length;
+  }
+  return bytes;
+}
+
+// 100 readings per spread, as stored in result_json, with their orders
+const spreads = contentService.loadContent('spreads');
+const readingsBySpread = Object.fromEntries(Object.keys(spreads).map((spreadId) => [
+  spreadId,
+  Array.from({ length: 100 }, (_, i) => {
+    const order = { order_id: `bench_${spreadId}_${i}`, email: `bench${i}@pleyazul.com` };
+    return { order, result: contentService.generateReading(order.order_id, order.email, spreadId) };
+  })
+]));
+contentService.close();
+
+async function measure(set, render, untagged) {
+  if (untagged) {
+    set = set.map(({ order, result }) => ({ order, result: { ...result, content_version: undefined } }));
+  }
+
+  // Warm up the JIT before timing
+  for (let i = 0; i < 500; i++) {
+    const { result, order } = set[i % set.length];
+    await render(result, order);
+  }
+
+  let bytes = 0;
+  const start = performance.now();
+  for (let i = 0; i < ITERATIONS; i++) {
+    const { result, order } = set[i % set.length];
+    bytes += await render(result, order);
+  }
+  const elapsedMs = performance.now() - start;
+  return { perSecond: ITERATIONS / (elapsedMs / 1000), bytesPerRender: bytes / ITERATIONS };
+}
+
+const renderers = [
+  ['previous', (result, order) => legacyGenerateReadingHTML(result, order).length],
+  ['no cache', (result, order) => renderReadingDocument(result, order).length, true],
+  ['cached', (result, order) => renderReadingDocument(result, order).length],
+  ['streamed', (result, order) => drain(streamReadingDocument(result, order))]
+];
+
+console.log(`Reading documents, ${ITERATIONS} renders per spread and renderer (renders/s)\n`);
+console.log(`${'Spread'.padEnd(18)}${renderers.map(([name]) => name.padStart(12)).join('')}${'speedup'.padStart(10)}${'KB'.padStart(7)}`);
+for (const [spreadId, set] of Object.entries(readingsBySpread)) {
+  const results = [];
+  for (const [, render, untagged] of renderers) {
+    results.push(await measure(set, render, untagged));
+  }
+  const speedup = results[2].perSecond / results[0].perSecond;
+  console.log(`${spreadId.padEnd(18)}${results.map((result) => result.perSecond.toFixed(0).padStart(12)).join('')}`
+    + `${`${speedup.toFixed(1)}x`.padStart(10)}${(results[2].bytesPerRender / 1024).toFixed(1).padStart(7)}`);
+}
+
+// Both renderers show the same text; only layout whitespace and escaping differ
+const textOf = (document) => document
+  .replace(/<style>[\s\S]*<\/style>/, '')
+  .replace(/<[^>]+>/g, ' ')
+  .replace(/&amp;|&lt;|&gt;|&quot;|&#39;/g, (entity) => ({ '&amp;': '&', '&lt;': '<', '&gt;': '>', '&quot;': '"', '&#39;': "'" })[entity])
+  .replace(/\s+/g, ' ')
+  .trim();
+
+for (const set of Object.values(readingsBySpread)) {
+  const { result, order } = set[0];
+  if (textOf(renderReadingDocument(result, order)) !== textOf(legacyGenerateReadingHTML(result, order))) {
+    console.error(`\n❌ Document text differs for ${order.order_id}`);
+    process.exit(1);
+  }
+}
+
+// The stream goes straight into the artifact writer
+const root = fs.mkdtempSync(path.join(os.tmpdir(), 'reading-document-'));
+try {
+  const { result, order } = readingsBySpread[Object.keys(readingsBySpread)[0]][0];
+  const date = new Date();
+  const artifact = await writeArtifact(new LocalArtifactStore(root), streamReadingDocument(result, order, { date }), (sha256) => `documents/${sha256}.html`, 'text/html');
+  if (artifact.size !== Buffer.byteLength(renderReadingDocument(result, order, { date }))) {
+    console.error('\n❌ Streamed document size differs from the rendered one');
+    process.exit(1);
+  }
+  console.log(`\nStreamed into the artifact store: ${artifact.key} (${artifact.size} bytes)`);
+} finally {
+  fs.rmSync(root, { recursive: true, force: true });
+}
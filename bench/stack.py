@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Local stack for the benchmark suite
+Starts a throwaway MongoDB and the Next.js API in TEST_MODE, so benchmarks
+run without network access or the shared preview host. Optionally starts the
+PayPal and Telegram stand-ins (see standins/) so payment and delivery calls
+go over HTTP with realistic latency instead of being mocked in-process.
+"""
+
+import hashlib
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NEXT_BIN = os.path.join(REPO_ROOT, 'node_modules', '.bin', 'next')
+# Written next to .next/BUILD_ID: the source tree the production build came from
+BUILD_STAMP = os.path.join(REPO_ROOT, '.next', 'BENCH_SOURCE')
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def source_stamp():
+    """HEAD plus a hash of uncommitted changes to tracked files, or None outside git"""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True, check=True).stdout
+
+    try:
+        head = git('rev-parse', 'HEAD').decode().strip()
+        diff = git('diff', 'HEAD', '--binary')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{head}+{hashlib.sha256(diff).hexdigest()[:16]}" if diff else head
+
+
+def wait_until(check, timeout, what):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if check():
+            return
+        time.sleep(0.25)
+    raise RuntimeError(f"Timed out after {timeout}s waiting for {what}")
+
+
+class LocalMongo:
+    """Use BENCH_MONGO_URL if set, otherwise run `mongod` on a temporary data directory"""
+
+    def __init__(self):
+        self.url = os.getenv('BENCH_MONGO_URL')
+        self.process = None
+        self.data_dir = None
+
+    def start(self):
+        if self.url:
+            return self.url
+
+        mongod = shutil.which('mongod')
+        if not mongod:
+            raise RuntimeError('mongod not found on PATH; install MongoDB or set BENCH_MONGO_URL')
+
+        port = free_port()
+        self.data_dir = tempfile.mkdtemp(prefix='pleyazul-bench-mongo-')
+        self.process = subprocess.Popen(
+            [mongod, '--dbpath', self.data_dir, '--port', str(port), '--bind_ip', '127.0.0.1', '--quiet'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+        def accepting():
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+                return True
+            except OSError:
+                return False
+
+        wait_until(accepting, 30, 'mongod')
+        self.url = f"mongodb://127.0.0.1:{port}"
+        return self.url
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+        if self.data_dir:
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+
+
+class LocalStandins:
+    """`python3 -m standins` on free ports; `args` are passed through (latency, error rate...)"""
+
+    def __init__(self, args=()):
+        self.args = list(args)
+        self.paypal_port = free_port()
+        self.telegram_port = free_port()
+        self.s3_port = free_port()
+        self.process = None
+
+    def env(self):
+        return {
+            'PAYPAL_API_BASE': f"http://127.0.0.1:{self.paypal_port}",
+            'PAYPAL_CLIENT_ID': 'standin-client',
+            'PAYPAL_CLIENT_SECRET': 'standin-secret',
+            'TELEGRAM_API_BASE': f"http://127.0.0.1:{self.telegram_port}",
+            'TELEGRAM_BOT_TOKEN': '123456:standin'
+        }
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'standins', '--paypal-port', str(self.paypal_port),
+             '--telegram-port', str(self.telegram_port), '--s3-port', str(self.s3_port), *self.args],
+            cwd=REPO_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT
+        )
+
+        def listening():
+            if self.process.poll() is not None:
+                raise RuntimeError(f"standins exited with code {self.process.returncode}")
+            try:
+                for port in (self.paypal_port, self.telegram_port):
+                    socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+                return True
+            except OSError:
+                return False
+
+        wait_until(listening, 15, 'the PayPal and Telegram stand-ins')
+        return self.env()
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+
+
+class LocalNextServer:
+    """Production Next.js server on a free port, built from the current source tree"""
+
+    def __init__(self, mongo_url, db_name='pleyazul_bench', upstreams=None):
+        self.mongo_url = mongo_url
+        self.db_name = db_name
+        self.upstreams = upstreams or {}
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+
+    def env(self):
+        env = dict(os.environ)
+        env.update({
+            'MONGO_URL': self.mongo_url,
+            'DB_NAME': self.db_name,
+            'TEST_MODE': 'true',
+            'JOB_WORKER_INLINE': 'true',
+            'NODE_ENV': 'production',
+            'APP_BASE_URL': self.base_url,
+            'NEXT_TELEMETRY_DISABLED': '1'
+        })
+        # Benchmarks must never reach the real upstreams
+        for key in ('PAYPAL_CLIENT_ID', 'PAYPAL_CLIENT_SECRET', 'TELEGRAM_BOT_TOKEN'):
+            env.pop(key, None)
+        # ...except local stand-ins
+        env.update(self.upstreams)
+        return env
+
+    def build(self):
+        """Run next build unless .next holds a production build of exactly this tree.
+        A build from another commit or `next dev` would be benchmarked silently."""
+        stamp = source_stamp()
+        built_from = None
+        if os.path.exists(os.path.join(REPO_ROOT, '.next', 'BUILD_ID')) and os.path.exists(BUILD_STAMP):
+            with open(BUILD_STAMP) as stamp_file:
+                built_from = stamp_file.read().strip()
+
+        if stamp and built_from == stamp:
+            return
+        print(f"🏗️  Running next build for {stamp or 'an untracked tree'}...")
+        subprocess.run([NEXT_BIN, 'build'], cwd=REPO_ROOT, env=self.env(), check=True)
+        if stamp:
+            with open(BUILD_STAMP, 'w') as stamp_file:
+                stamp_file.write(stamp)
+
+    def start(self):
+        if not os.path.exists(NEXT_BIN):
+            raise RuntimeError('node_modules not installed; run `yarn install` first')
+
+        self.build()
+
+        self.process = subprocess.Popen(
+            [NEXT_BIN, 'start', '-H', '127.0.0.1', '-p', str(self.port)],
+            cwd=REPO_ROOT,
+            env=self.env(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT
+        )
+
+        def healthy():
+            if self.process.poll() is not None:
+                raise RuntimeError(f"next start exited with code {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(f"{self.base_url}/api/status", timeout=1) as response:
+                    return response.status == 200
+            except OSError:
+                return False
+
+        wait_until(healthy, 60, 'the Next.js API')
+        return self.base_url
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+
+
+class LocalStack:
+    """Context manager yielding the base URL of a local TEST_MODE API.
+    With `standins` (a list of extra arguments, possibly empty) PayPal and
+    Telegram point at local stand-in servers."""
+
+    def __init__(self, standins=None):
+        self.mongo = LocalMongo()
+        self.standins = LocalStandins(standins) if standins is not None else None
+        self.server = None
+
+    def __enter__(self):
+        try:
+            mongo_url = self.mongo.start()
+            upstreams = self.standins.start() if self.standins else None
+            self.server = LocalNextServer(mongo_url, upstreams=upstreams)
+            return self.server.start()
+        except Exception:
+            self.__exit__(None, None, None)
+            raise
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.server:
+            self.server.stop()
+        if self.standins:
+            self.standins.stop()
+        self.mongo.stop()
+        return False
@@ -0,0 +1,102 @@
+#!/usr/bin/env node
+// Micro-benchmark: Telegram reading messages, previous renderer vs lib/telegramMessages
+//
+//   node bench/telegram-format.mjs [--iterations 100000]
+//
+// Renders readings drawn from content/ for every spread with the previous
+// implementation (string concatenation, then 18 RegExp passes over the whole
+// message) and with the template renderer, without the fragment cache (readings
+// stored before content_version existed) and with it. Also checks that the new output only escapes interpolated
+// text, i.e. the template's own *bold* markers are intact.
+
+import { performance } from 'perf_hooks';
+
+process.env.APP_BASE_URL = process.env.APP_BASE_URL || 'https://pleyazul.example';
+
+const { default: contentService } = await import('../lib/contentService.js');
+const { formatReadingForTelegram } = await import('../lib/telegramMessages.js');
+
+const iterationsArg = process.argv.indexOf('--iterations');
+const ITERATIONS = iterationsArg > 0 ? Number(process.argv[iterationsArg + 1]) : 100000;
+
+// The implementation this replaces, kept verbatim for comparison
+function legacyEscapeMarkdownV2(text) {
+  const specialChars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!'];
+  let escapedText = text;
+  for (const char of specialChars) {
+    escapedText = escapedText.replace(new RegExp('\\' + char, 'g'), '\\' + char);
+  }
+  return escapedText;
+}
+
+function legacyFormatReadingForTelegram(reading, orderId) {
+  let message = `🔮 *Tu lectura Pleyazul está lista*\n\n`;
+  if (reading.type === 'tarot') {
+    message += `*Lectura de Tarot*\n\n`;
+    reading.cards.forEach((card) => {
+      message += `*${card.position}*\n`;
+      message += `${card.name} ${card.reversed ? '(Invertida)' : ''}\n`;
+      message += `${card.interpretation}\n\n`;
+    });
+  } else if (reading.type === 'iching') {
+    message += `*Consulta del I Ching*\n\n`;
+    message += `*Hexagrama ${reading.hexagram.hex}: ${reading.hexagram.nombre}*\n\n`;
+    message += `${reading.hexagram.consejo}\n\n`;
+  } else if (reading.type === 'rueda') {
+    message += `*Medicina de la Rueda Sagrada*\n\n`;
+    reading.animals.forEach((animal) => {
+      message += `*${animal.position}*\n`;
+      message += `${animal.animal} - ${animal.arquetipo}\n`;
+      message += `${animal.medicina}\n\n`;
+    });
+  }
+  message += `✨ *${reading.message}*\n\n`;
+  message += `Ver lectura completa: ${process.env.APP_BASE_URL}/lectura/${orderId}`;
+  return legacyEscapeMarkdownV2(message);
+}
+
+// 200 readings spread over every spread, as stored in result_json
+const spreadIds = Object.keys(contentService.loadContent('spreads'));
+const readings = Array.from({ length: 200 }, (_, i) => {
+  const orderId = `bench_${i}`;
+  return { orderId, result: contentService.generateReading(orderId, `bench${i}@pleyazul.com`, spreadIds[i % spreadIds.length]) };
+});
+contentService.close();
+const untagged = readings.map(({ orderId, result }) => ({ orderId, result: { ...result, content_version: undefined } }));
+
+function measure(name, render, set = readings) {
+  // Warm up the JIT before timing
+  for (let i = 0; i < 1000; i++) {
+    const { result, orderId } = set[i % set.length];
+    render(result, orderId);
+  }
+
+  let bytes = 0;
+  const start = performance.now();
+  for (let i = 0; i < ITERATIONS; i++) {
+    const { result, orderId } = set[i % set.length];
+    bytes += render(result, orderId).length;
+  }
+  const elapsedMs = performance.now() - start;
+  return { name, elapsedMs, perSecond: ITERATIONS / (elapsedMs / 1000), usPerMessage: (elapsedMs * 1000) / ITERATIONS, bytes };
+}
+
+const results = [
+  measure('previous (18 RegExp passes)', legacyFormatReadingForTelegram),
+  measure('template, no fragment cache', formatReadingForTelegram, untagged),
+  measure('template, cached fragments', formatReadingForTelegram)
+];
+
+console.log(`Telegram message rendering, ${ITERATIONS} messages over ${readings.length} readings\n`);
+console.log(`${'Renderer'.padEnd(30)}${'msg/s'.padStart(12)}${'µs/msg'.padStart(10)}${'speedup'.padStart(10)}`);
+for (const result of results) {
+  const speedup = results[0].usPerMessage / result.usPerMessage;
+  console.log(`${result.name.padEnd(30)}${result.perSecond.toFixed(0).padStart(12)}${result.usPerMessage.toFixed(2).padStart(10)}${`${speedup.toFixed(1)}x`.padStart(10)}`);
+}
+
+// The previous renderer escaped the template's own markup; the new one must not
+const sample = formatReadingForTelegram(readings[0].result, readings[0].orderId);
+if (!sample.startsWith('🔮 *Tu lectura Pleyazul está lista*') || legacyFormatReadingForTelegram(readings[0].result, readings[0].orderId).startsWith('🔮 *')) {
+  console.error('\n❌ Unexpected MarkdownV2 output');
+  process.exit(1);
+}
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Fixed benchmark workloads, one set per spread in content/spreads.json
+Each workload runs a fixed number of iterations at a fixed concurrency so
+that results are comparable between commits
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from perf_metrics import EndpointMetrics, timed_request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPREADS_PATH = os.path.join(REPO_ROOT, 'content', 'spreads.json')
+CONTENT_TYPES = ['tarot', 'iching', 'rueda', 'spreads', 'presets', 'meditaciones']
+
+
+def load_spread_ids():
+    with open(SPREADS_PATH) as f:
+        return list(json.load(f).keys())
+
+
+async def content_iteration(http, metrics, api_base, i):
+    """Fetch one content type, cycling through all of them"""
+    content_type = CONTENT_TYPES[i % len(CONTENT_TYPES)]
+    status, _ = await timed_request(http, metrics, 'GET', f"GET /content/{content_type}", f"{api_base}/content/{content_type}")
+    return status == 200
+
+
+async def demo_iteration(http, metrics, api_base, spread_id, i):
+    """Generate one demo reading"""
+    demo_data = {"email": f"bench{i}@pleyazul.com", "spread_id": spread_id}
+    status, data = await timed_request(http, metrics, 'POST', 'POST /demo/reading', f"{api_base}/demo/reading", json=demo_data)
+    return status == 200 and bool(data and data.get('success'))
+
+
+async def purchase_iteration(http, metrics, api_base, spread_id, i):
+    """Checkout, generate the reading and fetch the completed order"""
+    order_data = {"email": f"bench{i}@pleyazul.com", "spread_id": spread_id, "custom_question": "Benchmark"}
+    status, data = await timed_request(http, metrics, 'POST', 'POST /checkout', f"{api_base}/checkout", json=order_data)
+    if status != 200 or not data or not data.get('order_id'):
+        return False
+
+    order_id = data['order_id']
+    status, _ = await timed_request(http, metrics, 'POST', 'POST /readings/generate',
+                                    f"{api_base}/readings/generate", json={"order_id": order_id})
+    if status != 200:
+        return False
+
+    status, _ = await timed_request(http, metrics, 'GET', 'GET /orders/{id}', f"{api_base}/orders/{order_id}")
+    return status == 200
+
+
+def build_workloads(spread_ids, iterations, concurrency):
+    """Workload name -> (iteration coroutine factory, iterations, concurrency)"""
+    workloads = {
+        'content': (lambda http, metrics, api_base, i: content_iteration(http, metrics, api_base, i), iterations, concurrency)
+    }
+    for spread_id in spread_ids:
+        workloads[f"{spread_id}/demo"] = (
+            lambda http, metrics, api_base, i, s=spread_id: demo_iteration(http, metrics, api_base, s, i),
+            iterations, concurrency
+        )
+        workloads[f"{spread_id}/purchase"] = (
+            lambda http, metrics, api_base, i, s=spread_id: purchase_iteration(http, metrics, api_base, s, i),
+            iterations, concurrency
+        )
+    return workloads
+
+
+async def run_workload(http, api_base, iteration, iterations, concurrency, warmup):
+    """Run warmup then measured iterations, returning throughput and per-endpoint latency"""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def bounded(metrics, i):
+        async with slots:
+            return await iteration(http, metrics, api_base, i)
+
+    await asyncio.gather(*(bounded(EndpointMetrics(track_recent=False), i) for i in range(warmup)))
+
+    metrics = EndpointMetrics(track_recent=False)
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(bounded(metrics, i) for i in range(iterations)))
+    elapsed = time.perf_counter() - start
+
+    summary = metrics.summary()
+    return {
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'failures': outcomes.count(False),
+        'elapsed_s': elapsed,
+        'throughput': iterations / elapsed if elapsed else 0.0,
+        'p50_ms': {endpoint: stats['wall_ms']['p50'] for endpoint, stats in summary.items()},
+        'p95_ms': {endpoint: stats['wall_ms']['p95'] for endpoint, stats in summary.items()}
+    }
+
+
+async def run_all(api_base, iterations=200, concurrency=10, warmup=20, only=None):
+    """Run every workload (or those whose name contains `only`) sequentially"""
+    import aiohttp
+
+    workloads = build_workloads(load_spread_ids(), iterations, concurrency)
+    results = {}
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+        for name, (iteration, count, limit) in workloads.items():
+            if only and only not in name:
+                continue
+            print(f"  ▶ {name} ({count} iterations, concurrency {limit})")
+            results[name] = await run_workload(http, api_base, iteration, count, limit, warmup)
+
+    return results
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Checkout Retry Test
+Runs POST /api/checkout (lib/api, under node) against a local MongoDB and the
+PayPal stand-in (standins/), outside TEST_MODE, and checks that a checkout
+whose PayPal call failed does not hold on to its Idempotency-Key:
+
+  - the failed checkout answers 500
+  - a retry with the same key runs the checkout again and succeeds
+  - a further retry replays that response (Idempotent-Replayed: true)
+  - a checkout whose key is released (by a failing checkout) between its
+    duplicate-key error and the lookup of the first order takes the key over
+
+Requires node, aiohttp and a MongoDB at MONGO_URL; no real PayPal credentials.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import uuid
+
+from aiohttp import web
+
+from standins import Faults, PayPalStandin
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+ROUTER_MODULE = f"file://{os.path.join(REPO_ROOT, 'lib', 'api', 'router.js')}"
+MONGO_URL = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.getenv('DB_NAME', 'pleyazul_oraculos_test')
+
+# One checkout through the API router; prints status, replay header and body.
+# With RACE_KEY_RELEASE set, another order holds the Idempotency-Key when the
+# checkout inserts its own and releases it right after, as a checkout whose
+# PayPal call failed does.
+NODE_DRIVER = """
+const { handleApiRequest } = await import(process.env.ROUTER_MODULE);
+if (process.env.RACE_KEY_RELEASE) {
+  const { Collection } = await import('mongodb');
+  const insertOne = Collection.prototype.insertOne;
+  Collection.prototype.insertOne = async function (doc, options) {
+    Collection.prototype.insertOne = insertOne;
+    const rival = { order_id: `rival-${doc.order_id}`, idempotency_key: doc.idempotency_key, status: 'created' };
+    await insertOne.call(this, rival);
+    try {
+      return await insertOne.call(this, doc, options);
+    } finally {
+      await this.updateOne({ order_id: rival.order_id }, { $unset: { idempotency_key: '' } });
+    }
+  };
+}
+const { connectToDatabase } = await import(new URL('../mongodb.js', process.env.ROUTER_MODULE));
+const response = await handleApiRequest(new Request('http://localhost/api/checkout', {
+  method: 'POST',
+  headers: { 'Content-Type': 'application/json', 'Idempotency-Key': process.env.IDEMPOTENCY_KEY },
+  body: process.env.CHECKOUT_BODY
+}), ['checkout']);
+console.log(JSON.stringify({
+  status: response.status,
+  replayed: response.headers.get('idempotent-replayed') === 'true',
+  body: await response.json()
+}));
+(await connectToDatabase()).client.close();
+"""
+
+
+async def checkout(env):
+    process = await asyncio.create_subprocess_exec(
+        'node', '--input-type=module', '-e', NODE_DRIVER,
+        cwd=REPO_ROOT, env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"node failed\n{stderr.decode()}")
+    return json.loads(stdout.decode().strip().splitlines()[-1])
+
+
+async def main():
+    print("🔮 Testing Checkout Retry After a PayPal Failure")
+    print("=" * 50)
+
+    with open(os.path.join(REPO_ROOT, 'content', 'spreads.json')) as spreads_file:
+        spread_id = next(iter(json.load(spreads_file)))
+
+    stub = PayPalStandin(Faults(error_rate=1.0))
+    runner = web.AppRunner(stub.app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    env = {key: value for key, value in os.environ.items() if key != 'TEST_MODE'}
+    env.update({
+        'MONGO_URL': MONGO_URL,
+        'DB_NAME': DB_NAME,
+        'PAYPAL_API_BASE': f"http://127.0.0.1:{port}",
+        'PAYPAL_CLIENT_ID': 'stub-client',
+        'PAYPAL_CLIENT_SECRET': 'stub-secret',
+        'ROUTER_MODULE': ROUTER_MODULE,
+        'IDEMPOTENCY_KEY': f"retry-test-{uuid.uuid4()}",
+        'CHECKOUT_BODY': json.dumps({'email': 'retry@pleyazul.com', 'spread_id': spread_id})
+    })
+
+    try:
+        failed = await checkout(env)
+        # PayPal is back
+        stub.faults.error_rate = 0.0
+        retried = await checkout(env)
+        replayed = await checkout(env)
+        raced = await checkout({**env, 'IDEMPOTENCY_KEY': f"race-test-{uuid.uuid4()}", 'RACE_KEY_RELEASE': '1'})
+    finally:
+        await runner.cleanup()
+
+    results = [
+        ("Failed checkout answers 500", failed['status'] == 500),
+        ("Retry with the same key succeeds", retried['status'] == 200 and not retried['replayed']
+         and retried['body'].get('success') is True),
+        ("Next retry replays the successful checkout", replayed['status'] == 200 and replayed['replayed']
+         and replayed['body'].get('order_id') == retried['body'].get('order_id')),
+        ("Key released mid-checkout is taken over", raced['status'] == 200 and not raced['replayed']
+         and raced['body'].get('success') is True),
+    ]
+    for name, ok in results:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    passed = sum(ok for _, ok in results)
+    print(f"\n{passed}/{len(results)} checks passed")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,18 @@
+'use client';
+
+import { useEffect } from 'react';
+
+// Registers public/sw.js (generated by scripts/generate-sw.mjs at build time).
+// Skipped in development, where pages and chunks change on every edit.
+export default function ServiceWorkerRegistration() {
+  useEffect(() => {
+    if (process.env.NODE_ENV !== 'production' || !('serviceWorker' in navigator)) {
+      return;
+    }
+    navigator.serviceWorker.register('/sw.js').catch((error) => {
+      console.error('Service worker registration failed:', error);
+    });
+  }, []);
+
+  return null;
+}
@@ -0,0 +1,82 @@
+import contentService from '../contentService.js';
+import { isPayPalConfigured } from '../paypal.js';
+import { isTelegramConfigured } from '../telegram.js';
+import { MAX_RESEND_BATCH, queueTelegramResend } from '../telegramDelivery.js';
+import { validateAdminContentBody, validateTelegramResendBody } from '../requestSchemas.js';
+import { getJobStats } from '../jobQueue.js';
+import { invalidBodyResponse, isAdmin, json } from './http.js';
+
+const unauthorized = () => json({ error: 'Unauthorized' }, { status: 401 });
+
+// GET /api/admin/setup-status
+export async function getSetupStatus() {
+  return json({
+    paypal_configured: isPayPalConfigured(),
+    telegram_configured: isTelegramConfigured(),
+    test_mode: process.env.TEST_MODE === 'true',
+    admin_password_set: !!process.env.ADMIN_PASSWORD,
+    jobs: await getJobStats(),
+    webhooks: {
+      paypal_url: `${process.env.APP_BASE_URL}/api/webhooks/paypal`,
+      telegram_url: `${process.env.APP_BASE_URL}/api/webhooks/telegram`
+    }
+  });
+}
+
+// POST /api/admin/telegram/resend: re-deliver readings already sent to
+// Telegram (e.g. after an outage)
+export async function resendTelegram(ctx) {
+  if (!isAdmin(ctx.request)) {
+    return unauthorized();
+  }
+
+  const body = await ctx.json();
+  const resendErrors = validateTelegramResendBody(body);
+  if (resendErrors.length > 0) {
+    return invalidBodyResponse(resendErrors);
+  }
+
+  const since = body.since ? new Date(body.since) : undefined;
+  if (since && isNaN(since.getTime())) {
+    return json({ error: 'since must be an ISO date' }, { status: 400 });
+  }
+
+  const result = await queueTelegramResend({
+    orderIds: body.order_ids,
+    failedOnly: body.failed_only,
+    since
+  });
+
+  return json({
+    success: true,
+    ...result,
+    // A full batch may have left more readings to resend
+    has_more: result.matched === MAX_RESEND_BATCH
+  }, { status: 202 });
+}
+
+// POST /api/admin/content: replace one content type
+export async function saveContent(ctx) {
+  if (!isAdmin(ctx.request)) {
+    return unauthorized();
+  }
+
+  const body = await ctx.json();
+  const adminErrors = validateAdminContentBody(body);
+  if (adminErrors.length > 0) {
+    return invalidBodyResponse(adminErrors);
+  }
+
+  const { type, content } = body;
+
+  // Never let malformed content replace what the oracles read from
+  const contentErrors = contentService.validateContent(type, content);
+  if (contentErrors.length > 0) {
+    return invalidBodyResponse(contentErrors);
+  }
+
+  if (!contentService.saveContent(type, content)) {
+    return json({ error: 'Failed to save content' }, { status: 500 });
+  }
+  return json({ success: true });
+}
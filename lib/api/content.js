@@ -0,0 +1,63 @@
+import contentService, { CONTENT_TYPES } from '../contentService.js';
+import { corsHeaders, json } from './http.js';
+
+// GET /api/content/{type}
+export function getContent({ request, params }) {
+  const payload = CONTENT_TYPES.includes(params.type) ? contentService.getContentPayload(params.type) : null;
+  return contentResponse(request, payload);
+}
+
+// GET /api/content/bundle: all content in one response;
+// ?since=tarot:<version>,iching:<version> returns only changed types
+export function getContentBundle({ request, searchParams }) {
+  const since = searchParams.get('since');
+  if (since) {
+    const sinceVersions = Object.fromEntries(
+      since.split(',').map(entry => entry.split(':')).filter(([type, version]) => type && version)
+    );
+    const delta = contentService.getBundlePayload(sinceVersions);
+    return new Response(delta.body, {
+      headers: { ...corsHeaders, 'Content-Type': 'application/json; charset=utf-8', 'Cache-Control': 'no-cache' }
+    });
+  }
+  return contentResponse(request, contentService.getBundlePayload());
+}
+
+// GET /api/content/schema/{type}
+export function getContentSchema({ request, params }) {
+  const payload = CONTENT_TYPES.includes(params.type) ? contentService.getSchemaPayload(params.type) : null;
+  return contentResponse(request, payload);
+}
+
+// Serve a pre-serialized content payload with a strong ETag, 304 revalidation
+// and the best pre-compressed encoding the client accepts
+function contentResponse(request, payload) {
+  if (!payload) {
+    return json({ error: 'Content not found' }, { status: 404 });
+  }
+
+  const headers = {
+    ...corsHeaders,
+    'Content-Type': 'application/json; charset=utf-8',
+    'Cache-Control': 'public, max-age=0, must-revalidate',
+    'ETag': payload.etag,
+    'Vary': 'Accept-Encoding'
+  };
+
+  const ifNoneMatch = request.headers.get('if-none-match');
+  if (ifNoneMatch) {
+    const tags = ifNoneMatch.split(',').map(tag => tag.trim().replace(/^W\//, ''));
+    if (tags.includes('*') || tags.includes(payload.etag)) {
+      return new Response(null, { status: 304, headers });
+    }
+  }
+
+  const acceptEncoding = request.headers.get('accept-encoding') || '';
+  if (/\bbr\b/.test(acceptEncoding)) {
+    return new Response(payload.br, { headers: { ...headers, 'Content-Encoding': 'br' } });
+  }
+  if (/\bgzip\b/.test(acceptEncoding)) {
+    return new Response(payload.gzip, { headers: { ...headers, 'Content-Encoding': 'gzip' } });
+  }
+  return new Response(payload.body, { headers });
+}
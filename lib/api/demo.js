@@ -0,0 +1,44 @@
+import { v4 as uuidv4 } from 'uuid';
+import { getCollection } from '../mongodb.js';
+import contentService from '../contentService.js';
+import { validateDemoReadingBody } from '../requestSchemas.js';
+import { invalidBodyResponse, json } from './http.js';
+
+// POST /api/demo/reading: a reading without an order (test mode)
+export async function createDemoReading(ctx) {
+  const body = await ctx.json();
+  const demoErrors = validateDemoReadingBody(body);
+  if (demoErrors.length > 0) {
+    return invalidBodyResponse(demoErrors);
+  }
+
+  const { email, spread_id } = body;
+
+  // Validate spread exists
+  const spreads = contentService.loadContent('spreads');
+  if (!spreads[spread_id]) {
+    return json({ error: 'Invalid spread_id' }, { status: 400 });
+  }
+
+  const orderId = `demo_${uuidv4()}`;
+
+  const readingData = {
+    _id: uuidv4(),
+    order_id: orderId,
+    result_json: contentService.generateReading(orderId, email, spread_id),
+    created_at: new Date(),
+    is_demo: true,
+    demo_email: email
+  };
+
+  const readingsCollection = await getCollection('readings');
+  await readingsCollection.insertOne(readingData);
+
+  return json({
+    success: true,
+    demo: true,
+    order_id: orderId,
+    reading: readingData,
+    redirect_url: `/lectura/${orderId}?demo=true`
+  });
+}
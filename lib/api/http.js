@@ -0,0 +1,65 @@
+import crypto from 'crypto';
+
+// Request context and response helpers shared by the API handlers in lib/api.
+// Handlers return standard Web Responses, so they run (and can be benchmarked)
+// outside Next as well.
+
+export const corsHeaders = {
+  'Access-Control-Allow-Origin': process.env.CORS_ORIGINS || '*',
+  'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+  'Access-Control-Allow-Headers': 'Content-Type, Authorization, Idempotency-Key, Range, If-Range',
+};
+
+// JSON response with the CORS headers
+export function json(data, { status = 200, headers } = {}) {
+  return Response.json(data, { status, headers: { ...corsHeaders, ...headers } });
+}
+
+// An error the dispatcher answers with `status` and `body` instead of a 500
+export function httpError(status, message) {
+  const error = new Error(message);
+  error.status = status;
+  error.body = { error: message };
+  return error;
+}
+
+// 400 response listing schema validation errors
+export function invalidBodyResponse(errors) {
+  return json({ error: 'Invalid request body', details: errors.slice(0, 20) }, { status: 400 });
+}
+
+// Admin endpoints take ADMIN_PASSWORD as a Bearer token; with no password
+// configured they are closed
+export function isAdmin(request) {
+  const password = process.env.ADMIN_PASSWORD;
+  const match = /^Bearer (.+)$/.exec(request.headers.get('Authorization') || '');
+  if (!password || !match) {
+    return false;
+  }
+  // Compare digests so the comparison takes the same time for any token
+  const digest = (value) => crypto.createHash('sha256').update(value).digest();
+  return crypto.timingSafeEqual(digest(match[1]), digest(password));
+}
+
+// What a handler gets: the request, the path parameters, the query string and
+// the JSON body, which is only read (once) when the handler asks for it
+export function createRequestContext(request, params) {
+  const url = new URL(request.url);
+  let body = null;
+
+  return {
+    request,
+    params,
+    url,
+    searchParams: url.searchParams,
+    // Resolves to the parsed body; rejects with a 400 for invalid JSON
+    json() {
+      if (!body) {
+        body = request.json().catch(() => {
+          throw httpError(400, 'Invalid JSON body');
+        });
+      }
+      return body;
+    }
+  };
+}
@@ -0,0 +1,106 @@
+import { getCollection } from '../mongodb.js';
+import { parseOrderListQuery, listOrders as listOrderPage } from '../orderListing.js';
+import { findOrderWithReading } from '../orderLookup.js';
+import { MAX_ORDER_EVENT_STREAMS, isFinalState, orderEventStreamCount, subscribeOrderEvents } from '../orderEvents.js';
+import { startInlineJobWorker } from '../jobWorker.js';
+import { corsHeaders, json } from './http.js';
+
+// GET /api/orders?status=&spread_id=&test_mode=&from=&to=&fields=&limit=&cursor=
+export async function listOrders({ searchParams }) {
+  const listQuery = parseOrderListQuery(searchParams);
+  if (listQuery.error) {
+    return json({ error: listQuery.error }, { status: 400 });
+  }
+  const ordersCollection = await getCollection('orders');
+  return json(await listOrderPage(ordersCollection, listQuery));
+}
+
+// GET /api/orders/{id}: the order and its reading
+export async function getOrder({ params }) {
+  const lookup = await findOrderWithReading(params.orderId);
+  if (!lookup) {
+    return json({ error: 'Order not found' }, { status: 404 });
+  }
+  return json(lookup);
+}
+
+// GET /api/orders/{id}/events: Server-Sent Events with the order's state now
+// and on every change, until final
+export function streamOrderEvents({ request, params }) {
+  startInlineJobWorker();
+  return orderEventsResponse(request, params.orderId);
+}
+
+// Stream an order's state as Server-Sent Events: a `status` event now and on
+// every change, then `done` once nothing else will happen (the client closes
+// then; EventSource would otherwise reconnect). Comments keep proxies from
+// dropping an idle connection.
+async function orderEventsResponse(request, orderId) {
+  if (orderEventStreamCount() >= MAX_ORDER_EVENT_STREAMS) {
+    return json({ error: 'Too many event streams' }, { status: 503, headers: { 'Retry-After': '5' } });
+  }
+
+  const encoder = new TextEncoder();
+  let controller;
+  let heartbeat = null;
+  let unsubscribe = null;
+  let closed = false;
+
+  const close = () => {
+    if (closed) {
+      return;
+    }
+    closed = true;
+    clearInterval(heartbeat);
+    unsubscribe?.();
+    try {
+      controller.close();
+    } catch (closeError) {
+      // Already closed by the client
+    }
+  };
+
+  const send = (state) => {
+    if (closed) {
+      return;
+    }
+    controller.enqueue(encoder.encode(`event: status\nid: ${state.stage}\ndata: ${JSON.stringify(state)}\n\n`));
+    if (isFinalState(state)) {
+      controller.enqueue(encoder.encode('event: done\ndata: {}\n\n'));
+      close();
+    }
+  };
+
+  const body = new ReadableStream({
+    start(streamController) {
+      controller = streamController;
+      controller.enqueue(encoder.encode('retry: 3000\n\n'));
+    },
+    cancel: close
+  });
+
+  unsubscribe = await subscribeOrderEvents(orderId, send);
+  if (!unsubscribe) {
+    return json({ error: 'Order not found' }, { status: 404 });
+  }
+  if (closed) {
+    unsubscribe();
+  } else {
+    heartbeat = setInterval(() => {
+      if (!closed) {
+        controller.enqueue(encoder.encode(': keep-alive\n\n'));
+      }
+    }, 15000);
+    request.signal?.addEventListener('abort', close);
+  }
+
+  return new Response(body, {
+    headers: {
+      ...corsHeaders,
+      'Content-Type': 'text/event-stream; charset=utf-8',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive',
+      'X-Accel-Buffering': 'no'
+    }
+  });
+}
@@ -0,0 +1,220 @@
+import crypto from 'crypto';
+import { v4 as uuidv4 } from 'uuid';
+import { getCollection } from '../mongodb.js';
+import contentService from '../contentService.js';
+import { createPayPalOrder, verifyPayPalWebhook } from '../paypal.js';
+import { validateCheckoutBody, validateMockPaymentBody } from '../requestSchemas.js';
+import { recordPayment } from '../readingService.js';
+import { invalidBodyResponse, json } from './http.js';
+
+// POST /api/checkout: create the order and its PayPal order
+export async function checkout(ctx) {
+  const body = await ctx.json();
+  const checkoutErrors = validateCheckoutBody(body);
+  if (checkoutErrors.length > 0) {
+    return invalidBodyResponse(checkoutErrors);
+  }
+
+  const { email, spread_id, custom_question } = body;
+
+  // Validate spread exists
+  const spreads = contentService.loadContent('spreads');
+  if (!spreads[spread_id]) {
+    return json({ error: 'Invalid spread_id' }, { status: 400 });
+  }
+
+  // A retried checkout with the same Idempotency-Key gets the first response
+  // instead of creating (and charging for) a second order
+  const idempotencyKey = ctx.request.headers.get('idempotency-key');
+  if (idempotencyKey !== null && (idempotencyKey.length === 0 || idempotencyKey.length > 255)) {
+    return json({ error: 'Idempotency-Key must be 1-255 characters' }, { status: 400 });
+  }
+
+  const orderId = uuidv4();
+  const orderData = {
+    order_id: orderId,
+    email,
+    spread_id,
+    custom_question: custom_question || '',
+    status: 'created',
+    amount: 19.99, // Fixed price for now
+    created_at: new Date(),
+    test_mode: process.env.TEST_MODE === 'true'
+  };
+
+  if (idempotencyKey) {
+    orderData.idempotency_key = idempotencyKey;
+    orderData.idempotency_fingerprint = crypto
+      .createHash('sha256')
+      .update(JSON.stringify([email, spread_id, orderData.custom_question]))
+      .digest('hex');
+  }
+
+  // Save order to database; the unique idempotency_key index makes this the gate
+  const ordersCollection = await getCollection('orders');
+  const { inserted, firstOrder } = await insertOrder(ordersCollection, orderData);
+  if (!inserted) {
+    return firstOrder
+      ? idempotentReplayResponse(firstOrder, orderData.idempotency_fingerprint)
+      : checkoutInProgressResponse();
+  }
+
+  try {
+    const paypalOrder = await createPayPalOrder({
+      orderId: orderId,
+      amount: orderData.amount,
+      description: `Lectura ${spread_id} - Pleyazul Oráculos`
+    });
+
+    // Update order with PayPal order ID
+    await ordersCollection.updateOne(
+      { order_id: orderId },
+      { $set: { paypal_order_id: paypalOrder.id, paypal_status: paypalOrder.status } }
+    );
+
+    return await checkoutResponse(ordersCollection, orderData, {
+      success: true,
+      order_id: orderId,
+      paypal_order: paypalOrder,
+      approval_url: paypalOrder.links?.find(link => link.rel === 'approve')?.href
+    });
+  } catch (paypalError) {
+    console.error('PayPal error:', paypalError);
+
+    // If PayPal fails but we're in test mode, continue with mock payment
+    if (process.env.TEST_MODE === 'true') {
+      return await checkoutResponse(ordersCollection, orderData, {
+        success: true,
+        order_id: orderId,
+        test_mode: true,
+        message: 'Order created in test mode',
+        mock_payment_url: `/api/paypal/mock-payment/${orderId}`
+      });
+    }
+
+    // No response will ever be stored for this order, so release the key:
+    // a retry runs the checkout again instead of waiting on this one
+    if (idempotencyKey) {
+      await ordersCollection.updateOne(
+        { order_id: orderId },
+        { $unset: { idempotency_key: '', idempotency_fingerprint: '' } }
+      );
+    }
+
+    throw paypalError;
+  }
+}
+
+// POST /api/paypal/mock-payment: pay an order without PayPal (test mode only)
+export async function mockPayment(ctx) {
+  if (process.env.TEST_MODE !== 'true') {
+    return json({ error: 'Mock payment only available in test mode' }, { status: 403 });
+  }
+
+  const body = await ctx.json();
+  const mockErrors = validateMockPaymentBody(body);
+  if (mockErrors.length > 0) {
+    return invalidBodyResponse(mockErrors);
+  }
+
+  const { order_id: orderId } = body;
+
+  const ordersCollection = await getCollection('orders');
+  const order = await ordersCollection.findOne({ order_id: orderId }, { projection: { _id: 1 } });
+  if (!order) {
+    return json({ error: 'Order not found' }, { status: 404 });
+  }
+
+  // Same in-process path as the PayPal webhook: the job worker generates the reading and its PDF
+  await recordPayment(orderId);
+
+  return json({
+    success: true,
+    message: 'Mock payment completed',
+    reading_queued: true,
+    redirect_url: `/lectura/${orderId}`
+  });
+}
+
+// PUT /api/webhooks/paypal
+export async function paypalWebhook({ request }) {
+  // The signature covers the raw body, so it is read as text
+  const body = await request.text();
+  const headers = Object.fromEntries(request.headers.entries());
+
+  // Verify webhook (simplified)
+  if (!verifyPayPalWebhook(headers, body)) {
+    return json({ error: 'Invalid webhook signature' }, { status: 401 });
+  }
+
+  const event = JSON.parse(body);
+
+  if (event.event_type === 'PAYMENT.CAPTURE.COMPLETED') {
+    const orderId = event.resource.supplementary_data?.related_ids?.order_id;
+
+    if (orderId) {
+      // Find our internal order
+      const ordersCollection = await getCollection('orders');
+      const order = await ordersCollection.findOne({ paypal_order_id: orderId }, { projection: { order_id: 1 } });
+
+      if (order) {
+        // Mark paid and queue the reading; PayPal retries reuse the same job
+        await recordPayment(order.order_id);
+      }
+    }
+  }
+
+  return json({ status: 'ok' });
+}
+
+// Send a checkout response, keeping it on the order when the request had an
+// Idempotency-Key so retries can be answered with the same body
+async function checkoutResponse(ordersCollection, orderData, response) {
+  if (orderData.idempotency_key) {
+    await ordersCollection.updateOne(
+      { order_id: orderData.order_id },
+      { $set: { checkout_response: response } }
+    );
+  }
+  return json(response);
+}
+
+// Insert a new order. { inserted: true }, or { firstOrder } when its
+// Idempotency-Key is already taken. A failed checkout releases its key, so the
+// first order can be gone by the time it is read: the insert is then retried
+// once, and {} means the key is still contended.
+async function insertOrder(ordersCollection, orderData) {
+  for (let attempt = 0; attempt < 2; attempt++) {
+    try {
+      await ordersCollection.insertOne(orderData);
+      return { inserted: true };
+    } catch (insertError) {
+      if (insertError.code !== 11000 || !orderData.idempotency_key) {
+        throw insertError;
+      }
+    }
+    const firstOrder = await ordersCollection.findOne({ idempotency_key: orderData.idempotency_key });
+    if (firstOrder) {
+      return { firstOrder };
+    }
+  }
+  return {};
+}
+
+// Answer a checkout whose Idempotency-Key was already used
+function idempotentReplayResponse(firstOrder, fingerprint) {
+  if (firstOrder.idempotency_fingerprint !== fingerprint) {
+    return json({ error: 'Idempotency-Key was already used with a different request' }, { status: 422 });
+  }
+  if (!firstOrder.checkout_response) {
+    return checkoutInProgressResponse();
+  }
+  return json(firstOrder.checkout_response, { headers: { 'Idempotent-Replayed': 'true' } });
+}
+
+function checkoutInProgressResponse() {
+  return json(
+    { error: 'A checkout with this Idempotency-Key is still in progress' },
+    { status: 409, headers: { 'Retry-After': '1' } }
+  );
+}
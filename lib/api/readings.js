@@ -0,0 +1,225 @@
+import { Readable } from 'stream';
+import { getCollection } from '../mongodb.js';
+import contentService from '../contentService.js';
+import { validateGenerateReadingBatchBody, validateGenerateReadingBody } from '../requestSchemas.js';
+import { findOrderWithReading, findReading, invalidateOrderLookup } from '../orderLookup.js';
+import { openArtifact } from '../artifacts.js';
+import { streamReadingDocument } from '../readingDocument.js';
+import { JOB_TYPES, enqueueJobs } from '../jobQueue.js';
+import { generateReadingForOrder, saveReadings } from '../readingService.js';
+import { corsHeaders, invalidBodyResponse, json } from './http.js';
+
+// GET /api/readings/{id}
+export async function getReading({ params }) {
+  const reading = await findReading(params.orderId);
+  if (!reading) {
+    return json({ error: 'Reading not found' }, { status: 404 });
+  }
+  return json(reading);
+}
+
+// GET /api/readings/{id}/pdf; ?v=<hash prefix> makes the response immutable
+export async function getReadingPdf({ request, params, searchParams }) {
+  const { orderId } = params;
+  let reading = await findReading(orderId);
+
+  if (reading?.pdf_artifact) {
+    const response = await artifactResponse(request, reading.pdf_artifact, {
+      contentType: 'application/pdf',
+      fileName: `lectura_${orderId}.pdf`,
+      immutable: searchParams.get('v') === reading.pdf_artifact.sha256.slice(0, 16)
+    });
+    if (response) {
+      return response;
+    }
+    // A cached reading can outlive its artifact (cleanup runs in the job
+    // worker), so drop it and answer from the stored reading
+    invalidateOrderLookup(orderId);
+    reading = await findReading(orderId);
+  }
+
+  return json(
+    { error: reading?.pdf_expired_at ? 'PDF expired' : 'PDF not found' },
+    { status: reading?.pdf_expired_at ? 410 : 404 }
+  );
+}
+
+// GET /api/readings/{id}/document: the reading as printable HTML
+export async function getReadingDocument({ params }) {
+  const lookup = await findOrderWithReading(params.orderId);
+  if (!lookup?.reading) {
+    return json({ error: 'Reading not found' }, { status: 404 });
+  }
+
+  const documentStream = streamReadingDocument(lookup.reading.result_json, lookup.order);
+  return new Response(Readable.toWeb(documentStream), {
+    headers: { ...corsHeaders, 'Content-Type': 'text/html; charset=utf-8', 'Cache-Control': 'private, no-cache' }
+  });
+}
+
+// POST /api/readings/generate
+export async function generateReading(ctx) {
+  const body = await ctx.json();
+  const generateErrors = validateGenerateReadingBody(body);
+  if (generateErrors.length > 0) {
+    return invalidBodyResponse(generateErrors);
+  }
+
+  const ordersCollection = await getCollection('orders');
+  const order = await ordersCollection.findOne({ order_id: body.order_id });
+  if (!order) {
+    return json({ error: 'Order not found' }, { status: 404 });
+  }
+
+  // Idempotent: concurrent calls and the generate-reading job share one reading
+  const { reading } = await generateReadingForOrder(order);
+
+  return json({
+    success: true,
+    reading,
+    pdf_url: reading.pdf_url
+  });
+}
+
+// POST /api/readings/generate-batch: readings for many orders at once
+// (reconciliation after payment outages)
+export async function generateReadingBatch(ctx) {
+  const body = await ctx.json();
+  const batchErrors = validateGenerateReadingBatchBody(body);
+  if (batchErrors.length > 0) {
+    return invalidBodyResponse(batchErrors);
+  }
+
+  const orderIds = [...new Set(body.order_ids)];
+  const ordersCollection = await getCollection('orders');
+  const readingsCollection = await getCollection('readings');
+
+  // One round trip each for the orders and the readings that already exist
+  const [orders, existing] = await Promise.all([
+    ordersCollection.find({ order_id: { $in: orderIds } }).toArray(),
+    readingsCollection.find({ order_id: { $in: orderIds } }, { projection: { order_id: 1 } }).toArray()
+  ]);
+
+  const ordersById = new Map(orders.map(order => [order.order_id, order]));
+  const existingIds = new Set(existing.map(reading => reading.order_id));
+  const status = new Map();
+  const newReadings = [];
+
+  for (const orderId of orderIds) {
+    const order = ordersById.get(orderId);
+
+    if (!order) {
+      status.set(orderId, { status: 'not_found' });
+      continue;
+    }
+    if (existingIds.has(orderId)) {
+      status.set(orderId, { status: 'exists' });
+      continue;
+    }
+
+    try {
+      newReadings.push({
+        order_id: orderId,
+        result: contentService.generateReading(orderId, order.email, order.spread_id)
+      });
+    } catch (generateError) {
+      status.set(orderId, { status: 'error', error: generateError.message });
+    }
+  }
+
+  if (newReadings.length > 0) {
+    // Upserts, so readings created since the lookup above are reported as existing
+    const saveOutcomes = await saveReadings(newReadings);
+    for (const [savedOrderId, outcome] of saveOutcomes) {
+      if (outcome === 'created') {
+        status.set(savedOrderId, { status: 'generated' });
+      } else if (outcome === 'exists') {
+        status.set(savedOrderId, { status: 'exists' });
+      } else {
+        status.set(savedOrderId, { status: 'error', error: outcome.error });
+      }
+    }
+
+    const completedIds = newReadings
+      .map(newReading => newReading.order_id)
+      .filter(completedId => status.get(completedId).status === 'generated');
+
+    if (completedIds.length > 0) {
+      await ordersCollection.bulkWrite(completedIds.map(completedId => ({
+        updateOne: {
+          filter: { order_id: completedId },
+          update: { $set: { status: 'completed', completed_at: new Date() } }
+        }
+      })), { ordered: false });
+      completedIds.forEach(completedId => invalidateOrderLookup(completedId));
+    }
+
+    await enqueueJobs(JOB_TYPES.RENDER_PDF, completedIds.map(completedId => ({
+      payload: { order_id: completedId },
+      key: `${JOB_TYPES.RENDER_PDF}:${completedId}`
+    })));
+  }
+
+  const results = orderIds.map(orderId => ({ order_id: orderId, ...status.get(orderId) }));
+
+  return json({
+    success: true,
+    requested: orderIds.length,
+    generated: results.filter(result => result.status === 'generated').length,
+    results
+  });
+}
+
+// Stream a stored artifact ({ key, sha256, size }) with single-range support
+// (Range / If-Range -> 206, 416 when unsatisfiable) and its hash as a strong ETag;
+// null when the file is no longer in the store
+async function artifactResponse(request, artifact, { contentType, fileName, immutable }) {
+  const etag = `"${artifact.sha256}"`;
+  const headers = {
+    ...corsHeaders,
+    'Content-Type': contentType,
+    'Content-Disposition': `inline; filename="${fileName}"`,
+    'Accept-Ranges': 'bytes',
+    'ETag': etag,
+    'Cache-Control': immutable ? 'public, max-age=31536000, immutable' : 'private, no-cache'
+  };
+
+  const ifNoneMatch = request.headers.get('if-none-match');
+  if (ifNoneMatch && ifNoneMatch.split(',').some(tag => tag.trim() === etag || tag.trim() === '*')) {
+    return new Response(null, { status: 304, headers });
+  }
+
+  // A Range is only honoured if the client's copy is still current (If-Range);
+  // multiple ranges are answered with the whole file
+  let range = null;
+  const rangeHeader = request.headers.get('range');
+  const ifRange = request.headers.get('if-range');
+  const match = rangeHeader && (!ifRange || ifRange === etag) && /^bytes=(\d*)-(\d*)$/.exec(rangeHeader.trim());
+  if (match && (match[1] || match[2])) {
+    const last = artifact.size - 1;
+    range = match[1]
+      ? { start: Number(match[1]), end: match[2] ? Math.min(Number(match[2]), last) : last }
+      : { start: Math.max(0, artifact.size - Number(match[2])), end: last };
+    if (range.start > range.end || range.start > last) {
+      return new Response(null, { status: 416, headers: { ...headers, 'Content-Range': `bytes */${artifact.size}` } });
+    }
+  }
+
+  const opened = await openArtifact(artifact.key, range);
+  if (!opened) {
+    return null;
+  }
+
+  const body = Readable.toWeb(opened.stream);
+  if (!range) {
+    return new Response(body, { headers: { ...headers, 'Content-Length': String(opened.size) } });
+  }
+  return new Response(body, {
+    status: 206,
+    headers: {
+      ...headers,
+      'Content-Length': String(range.end - range.start + 1),
+      'Content-Range': `bytes ${range.start}-${range.end}/${opened.size}`
+    }
+  });
+}
@@ -0,0 +1,176 @@
+import { corsHeaders, createRequestContext, json } from './http.js';
+
+// Route table for the catch-all API handler (app/api/[[...path]]/route.js).
+//
+// Each route maps a method and a path pattern (`:name` segments are
+// parameters) to a handler exported by a domain module. The table is compiled
+// once into a tree of path segments, so a lookup costs one step per segment
+// however many routes there are; literal segments win over parameters.
+// Domain modules are imported on first use, so a request only loads the code
+// (and dependencies) of its own domain.
+
+const domains = {
+  admin: () => import('./admin.js'),
+  content: () => import('./content.js'),
+  demo: () => import('./demo.js'),
+  orders: () => import('./orders.js'),
+  payments: () => import('./payments.js'),
+  readings: () => import('./readings.js'),
+  system: () => import('./system.js'),
+  telegram: () => import('./telegram.js')
+};
+
+// [method, path pattern, domain, handler export]
+export const API_ROUTES = [
+  ['GET', '', 'system', 'getStatus'],
+  ['GET', 'status', 'system', 'getStatus'],
+
+  ['GET', 'content/bundle', 'content', 'getContentBundle'],
+  ['GET', 'content/schema/:type', 'content', 'getContentSchema'],
+  ['GET', 'content/:type', 'content', 'getContent'],
+
+  ['GET', 'orders', 'orders', 'listOrders'],
+  ['GET', 'orders/:orderId', 'orders', 'getOrder'],
+  ['GET', 'orders/:orderId/events', 'orders', 'streamOrderEvents'],
+
+  ['GET', 'readings/:orderId', 'readings', 'getReading'],
+  ['GET', 'readings/:orderId/pdf', 'readings', 'getReadingPdf'],
+  ['GET', 'readings/:orderId/document', 'readings', 'getReadingDocument'],
+  ['POST', 'readings/generate', 'readings', 'generateReading'],
+  ['POST', 'readings/generate-batch', 'readings', 'generateReadingBatch'],
+
+  ['POST', 'checkout', 'payments', 'checkout'],
+  ['POST', 'paypal/mock-payment', 'payments', 'mockPayment'],
+  ['PUT', 'webhooks/paypal', 'payments', 'paypalWebhook'],
+
+  ['POST', 'telegram/send-reading', 'telegram', 'sendReading'],
+  ['PUT', 'webhooks/telegram', 'telegram', 'telegramWebhook'],
+
+  ['POST', 'demo/reading', 'demo', 'createDemoReading'],
+
+  ['GET', 'admin/setup-status', 'admin', 'getSetupStatus'],
+  ['POST', 'admin/content', 'admin', 'saveContent'],
+  ['POST', 'admin/telegram/resend', 'admin', 'resendTelegram']
+];
+
+const splitPath = (path) => (path ? path.split('/') : []);
+
+function newNode() {
+  return { literals: new Map(), param: null, methods: new Map() };
+}
+
+// Compile [method, pattern, domain, handler] rows into a matcher:
+//   match(method, segments) -> { route, params }, { allowed } when the path
+//   exists for other methods, or null
+export function compileRoutes(routes, loaders = domains) {
+  const root = newNode();
+
+  for (const [method, pattern, domain, handlerName] of routes) {
+    if (!loaders[domain]) {
+      throw new Error(`Route ${method} ${pattern}: unknown domain ${domain}`);
+    }
+    let node = root;
+    const paramNames = [];
+    for (const segment of splitPath(pattern)) {
+      if (segment.startsWith(':')) {
+        node.param = node.param || newNode();
+        node = node.param;
+        paramNames.push(segment.slice(1));
+      } else {
+        if (!node.literals.has(segment)) {
+          node.literals.set(segment, newNode());
+        }
+        node = node.literals.get(segment);
+      }
+    }
+    if (node.methods.has(method)) {
+      throw new Error(`Duplicate route ${method} ${pattern}`);
+    }
+
+    let handler = null;
+    node.methods.set(method, {
+      method,
+      pattern,
+      paramNames,
+      async resolve() {
+        if (!handler) {
+          const module = await loaders[domain]();
+          handler = module[handlerName];
+          if (typeof handler !== 'function') {
+            throw new Error(`Route ${method} ${pattern}: ${domain} has no handler ${handlerName}`);
+          }
+        }
+        return handler;
+      }
+    });
+  }
+
+  // Literal children first; fall back to the parameter branch
+  function find(node, segments, index, values) {
+    if (index === segments.length) {
+      return node.methods.size > 0 ? node : null;
+    }
+    const literal = node.literals.get(segments[index]);
+    const found = literal && find(literal, segments, index + 1, values);
+    if (found) {
+      return found;
+    }
+    if (node.param && segments[index] !== '') {
+      values.push(segments[index]);
+      const viaParam = find(node.param, segments, index + 1, values);
+      if (viaParam) {
+        return viaParam;
+      }
+      values.pop();
+    }
+    return null;
+  }
+
+  return {
+    match(method, segments) {
+      const values = [];
+      const node = find(root, segments, 0, values);
+      if (!node) {
+        return null;
+      }
+      const route = node.methods.get(method);
+      if (!route) {
+        return { allowed: [...node.methods.keys()] };
+      }
+      const params = {};
+      route.paramNames.forEach((name, i) => {
+        params[name] = values[i];
+      });
+      return { route, params };
+    }
+  };
+}
+
+let router = null;
+
+// Dispatch a request for /api/{segments...}. Handlers get a request context
+// (lib/api/http); errors carrying a status are answered with it, others are 500s.
+export async function handleApiRequest(request, segments = []) {
+  router = router || compileRoutes(API_ROUTES);
+  const match = router.match(request.method, segments);
+
+  if (!match) {
+    return json({ error: 'Not found' }, { status: 404 });
+  }
+  if (!match.route) {
+    return json({ error: 'Method not allowed' }, { status: 405, headers: { Allow: match.allowed.join(', ') } });
+  }
+
+  try {
+    const handler = await match.route.resolve();
+    return await handler(createRequestContext(request, match.params));
+  } catch (error) {
+    if (error.status) {
+      return json(error.body, { status: error.status });
+    }
+    console.error(`API ${request.method} ${match.route.pattern} Error:`, error);
+    return json({ error: 'Internal server error', message: error.message }, { status: 500 });
+  }
+}
+
+export { corsHeaders };
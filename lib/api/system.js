@@ -0,0 +1,27 @@
+import { connectToDatabase } from '../mongodb.js';
+import { isPayPalConfigured } from '../paypal.js';
+import { isTelegramConfigured } from '../telegram.js';
+import { json } from './http.js';
+
+// GET /api and /api/status; 503 while MongoDB is unreachable or its unique
+// indexes could not be built (lib/mongodb ensureIndexes)
+export async function getStatus() {
+  let database = 'ok';
+  try {
+    await connectToDatabase();
+  } catch (error) {
+    database = error.message;
+  }
+
+  return json({
+    status: database === 'ok' ? 'ok' : 'error',
+    service: 'Pleyazul Oráculos API',
+    timestamp: new Date().toISOString(),
+    database,
+    integrations: {
+      paypal: isPayPalConfigured(),
+      telegram: isTelegramConfigured(),
+      testMode: process.env.TEST_MODE === 'true'
+    }
+  }, { status: database === 'ok' ? 200 : 503 });
+}
@@ -0,0 +1,49 @@
+import { getCollection } from '../mongodb.js';
+import { sendTelegramMessage, isTelegramConfigured } from '../telegram.js';
+import { queueTelegramDelivery } from '../telegramDelivery.js';
+import { validateSendReadingBody } from '../requestSchemas.js';
+import { invalidBodyResponse, json } from './http.js';
+
+const WELCOME_MESSAGE = '¡Bienvenido a Pleyazul Oráculos! 🔮\n\nPuedes recibir tus lecturas directamente aquí después de realizar tu pago.\n\nVisita nuestro sitio web para hacer una consulta.';
+
+// POST /api/telegram/send-reading
+export async function sendReading(ctx) {
+  const body = await ctx.json();
+  const sendErrors = validateSendReadingBody(body);
+  if (sendErrors.length > 0) {
+    return invalidBodyResponse(sendErrors);
+  }
+
+  const { order_id: orderId, chat_id } = body;
+
+  if (!isTelegramConfigured()) {
+    return json({ success: false, error: 'Bot not configured' }, { status: 503 });
+  }
+
+  const readingsCollection = await getCollection('readings');
+  const reading = await readingsCollection.findOne({ order_id: orderId }, { projection: { _id: 1 } });
+  if (!reading) {
+    return json({ error: 'Reading not found' }, { status: 404 });
+  }
+
+  // Delivery goes through the rate-limited queue (lib/telegramDelivery)
+  const queued = await queueTelegramDelivery(orderId, chat_id);
+
+  return json({ success: true, queued, status: 'queued' }, { status: 202 });
+}
+
+// PUT /api/webhooks/telegram: bot updates; answers /start
+export async function telegramWebhook(ctx) {
+  const update = await ctx.json();
+
+  if (update.message) {
+    const chatId = update.message.chat.id;
+    const text = update.message.text || '';
+
+    if (text.startsWith('/start')) {
+      await sendTelegramMessage(chatId, WELCOME_MESSAGE);
+    }
+  }
+
+  return json({ status: 'ok' });
+}
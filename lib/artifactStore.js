@@ -0,0 +1,154 @@
+import crypto from 'crypto';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { Readable, Transform } from 'stream';
+import { pipeline } from 'stream/promises';
+import { createS3Client } from './s3Client.js';
+
+// Blob storage for generated documents (reading PDFs), addressed by key.
+//
+// Writes are streamed: the source is spooled to a temporary file while its
+// SHA-256 and size are computed, then moved into place (local) or uploaded
+// with that hash as the signed payload hash (S3). Reads take an optional byte
+// range and return a Node stream.
+//
+//   ARTIFACT_STORE=local (default): files under ARTIFACT_DIR (data/artifacts),
+//     sharded into two levels of directories by a hash of the key, so no
+//     directory grows past a few thousand entries
+//   ARTIFACT_STORE=s3: ARTIFACT_S3_ENDPOINT, ARTIFACT_S3_BUCKET,
+//     ARTIFACT_S3_REGION and AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY; any
+//     S3-compatible service, so files are shared by every instance
+
+// Hash and count bytes as they pass through
+function digestStream() {
+  const hash = crypto.createHash('sha256');
+  let size = 0;
+  const transform = new Transform({
+    transform(chunk, encoding, callback) {
+      hash.update(chunk);
+      size += chunk.length;
+      callback(null, chunk);
+    }
+  });
+  return { transform, result: () => ({ sha256: hash.digest('hex'), size }) };
+}
+
+// Write a Node stream, web stream or Buffer to a new file in dir.
+// Resolves to { path, sha256, size }.
+export async function spoolToFile(source, dir) {
+  await fs.promises.mkdir(dir, { recursive: true });
+  const tempPath = path.join(dir, `.spool-${process.pid}-${crypto.randomUUID()}`);
+  const input = Buffer.isBuffer(source) ? Readable.from([source])
+    : typeof source.getReader === 'function' ? Readable.fromWeb(source)
+      : source;
+  const digest = digestStream();
+
+  try {
+    await pipeline(input, digest.transform, fs.createWriteStream(tempPath, { flags: 'wx' }));
+  } catch (error) {
+    await fs.promises.rm(tempPath, { force: true });
+    throw error;
+  }
+  return { path: tempPath, ...digest.result() };
+}
+
+export class LocalArtifactStore {
+  constructor(root) {
+    this.root = root;
+    this.tempDir = path.join(root, 'tmp');
+  }
+
+  pathFor(key) {
+    const digest = crypto.createHash('sha256').update(key).digest('hex');
+    return path.join(this.root, digest.slice(0, 2), digest.slice(2, 4), `${digest}${path.extname(key)}`);
+  }
+
+  // Move a spooled file into place; rename() is atomic, so readers never see a partial file
+  async putFile(key, spooled, contentType) {
+    const target = this.pathFor(key);
+    await fs.promises.mkdir(path.dirname(target), { recursive: true });
+    await fs.promises.rename(spooled.path, target);
+  }
+
+  // { stream, size } for the whole file or range { start, end } (inclusive), or null
+  async get(key, range) {
+    const filePath = this.pathFor(key);
+    try {
+      const { size } = await fs.promises.stat(filePath);
+      return { stream: fs.createReadStream(filePath, range || {}), size };
+    } catch (error) {
+      if (error.code === 'ENOENT') {
+        return null;
+      }
+      throw error;
+    }
+  }
+
+  async delete(key) {
+    await fs.promises.rm(this.pathFor(key), { force: true });
+  }
+}
+
+export class S3ArtifactStore {
+  constructor(options) {
+    this.client = createS3Client(options);
+    this.tempDir = os.tmpdir();
+  }
+
+  async putFile(key, spooled, contentType) {
+    await this.client.putObject(key, Readable.toWeb(fs.createReadStream(spooled.path)), {
+      contentLength: spooled.size,
+      contentType,
+      sha256: spooled.sha256
+    });
+  }
+
+  async get(key, range) {
+    const response = await this.client.getObject(key, { range });
+    if (!response) {
+      return null;
+    }
+    // 206 responses carry the full size in Content-Range: bytes 0-99/1234
+    const contentRange = response.headers.get('content-range');
+    const size = contentRange ? Number(contentRange.split('/')[1]) : Number(response.headers.get('content-length'));
+    return { stream: Readable.fromWeb(response.body), size };
+  }
+
+  async delete(key) {
+    await this.client.deleteObject(key);
+  }
+}
+
+export function createArtifactStore(env = process.env) {
+  if (env.ARTIFACT_STORE === 's3') {
+    return new S3ArtifactStore({
+      endpoint: env.ARTIFACT_S3_ENDPOINT || `https://s3.${env.ARTIFACT_S3_REGION || 'us-east-1'}.amazonaws.com`,
+      region: env.ARTIFACT_S3_REGION || 'us-east-1',
+      bucket: env.ARTIFACT_S3_BUCKET,
+      accessKeyId: env.AWS_ACCESS_KEY_ID,
+      secretAccessKey: env.AWS_SECRET_ACCESS_KEY
+    });
+  }
+  return new LocalArtifactStore(env.ARTIFACT_DIR || path.join(process.cwd(), 'data', 'artifacts'));
+}
+
+// The configured store, one per process
+export function getArtifactStore() {
+  if (!global.artifactStore) {
+    global.artifactStore = createArtifactStore();
+  }
+  return global.artifactStore;
+}
+
+// Stream `source` into the store under keyFor(sha256). Resolves to { key, sha256, size }.
+export async function writeArtifact(store, source, keyFor, contentType) {
+  const spooled = await spoolToFile(source, store.tempDir);
+  const key = keyFor(spooled.sha256);
+  try {
+    await store.putFile(key, spooled, contentType);
+  } finally {
+    await fs.promises.rm(spooled.path, { force: true });
+  }
+  return { key, sha256: spooled.sha256, size: spooled.size };
+}
@@ -0,0 +1,93 @@
+import { getCollection } from './mongodb.js';
+import { getArtifactStore, writeArtifact } from './artifactStore.js';
+import { invalidateOrderLookup } from './orderLookup.js';
+
+// Generated documents in the artifact store (lib/artifactStore), tracked in the
+// `artifacts` collection: { _id: key, order_id, kind, sha256, size, content_type,
+// created_at, expires_at }.
+//
+// Keys are content-addressed per order (readings/{order_id}/{sha256}.pdf), so a
+// re-render never overwrites a file someone may be downloading; the artifact it
+// replaces expires after SUPERSEDED_GRACE_MS. With ARTIFACT_TTL_DAYS set, current
+// documents expire too. cleanupExpiredArtifacts (run by the job worker) deletes
+// expired files and detaches them from their reading.
+
+const READING_PDF = 'reading-pdf';
+const SUPERSEDED_GRACE_MS = 24 * 60 * 60 * 1000;
+const TTL_MS = Number(process.env.ARTIFACT_TTL_DAYS) * 24 * 60 * 60 * 1000 || null;
+
+// Stream a reading's PDF into the store. Resolves to { key, sha256, size }.
+export async function saveReadingPdf(orderId, source) {
+  const artifact = await writeArtifact(
+    getArtifactStore(),
+    source,
+    (sha256) => `readings/${orderId}/${sha256}.pdf`,
+    'application/pdf'
+  );
+
+  const artifactsCollection = await getCollection('artifacts');
+  const now = new Date();
+  await artifactsCollection.updateOne(
+    { _id: artifact.key },
+    {
+      $setOnInsert: {
+        order_id: orderId,
+        kind: READING_PDF,
+        sha256: artifact.sha256,
+        size: artifact.size,
+        content_type: 'application/pdf',
+        created_at: now
+      },
+      $set: { expires_at: TTL_MS ? new Date(now.getTime() + TTL_MS) : null }
+    },
+    { upsert: true }
+  );
+
+  // Earlier renders stay downloadable for a while, then go
+  const graceUntil = new Date(now.getTime() + SUPERSEDED_GRACE_MS);
+  await artifactsCollection.updateMany(
+    {
+      order_id: orderId,
+      kind: READING_PDF,
+      _id: { $ne: artifact.key },
+      $or: [{ expires_at: null }, { expires_at: { $gt: graceUntil } }]
+    },
+    { $set: { expires_at: graceUntil } }
+  );
+
+  return artifact;
+}
+
+// { stream, size } for an artifact, optionally a byte range { start, end }, or null
+export function openArtifact(key, range) {
+  return getArtifactStore().get(key, range);
+}
+
+// Delete up to `limit` expired artifacts; resolves to how many were removed
+export async function cleanupExpiredArtifacts({ limit = 200 } = {}) {
+  const artifactsCollection = await getCollection('artifacts');
+  const readingsCollection = await getCollection('readings');
+  const store = getArtifactStore();
+  const now = new Date();
+
+  const expired = await artifactsCollection
+    .find({ expires_at: { $lte: now } }, { projection: { order_id: 1 } })
+    .sort({ expires_at: 1 })
+    .limit(limit)
+    .toArray();
+
+  for (const artifact of expired) {
+    // Detach first, so the reading never points at a missing file
+    const { modifiedCount } = await readingsCollection.updateOne(
+      { order_id: artifact.order_id, 'pdf_artifact.key': artifact._id },
+      { $set: { pdf_url: null, pdf_artifact: null, pdf_expired_at: now } }
+    );
+    if (modifiedCount > 0) {
+      invalidateOrderLookup(artifact.order_id);
+    }
+    await store.delete(artifact._id);
+    await artifactsCollection.deleteOne({ _id: artifact._id });
+  }
+
+  return expired.length;
+}
@@ -1,13 +1,100 @@
 import fs from 'fs';
 import path from 'path';
 import crypto from 'crypto';
+import zlib from 'zlib';
+import { compileSchema } from './schemaValidator.js';
 
 const CONTENT_DIR = path.join(process.cwd(), 'content');
 const SCHEMA_DIR = path.join(CONTENT_DIR, 'schema');
 
+// Content types served to the PWA, in bundle order
+export const CONTENT_TYPES = ['tarot', 'iching', 'rueda', 'spreads', 'presets', 'meditaciones'];
+
+// Editors and deploys touch files in bursts; wait for them to settle before reloading
+const RELOAD_DEBOUNCE_MS = 150;
+
+// Reading draw algorithms. The tag is stored in every reading's result_json so a
+// reading can always be re-derived from order_id + email with the algorithm that made it.
+export const LEGACY_READING_ALGORITHM = 'sha256-v1';
+export const READING_ALGORITHM = 'sfc32-fy-v2';
+
+// Deterministic PRNG stream: one SHA-256 of the seed initialises an sfc32 generator
+export function createSeededStream(seed) {
+  const digest = crypto.createHash('sha256').update(seed).digest();
+  let a = digest.readUInt32BE(0);
+  let b = digest.readUInt32BE(4);
+  let c = digest.readUInt32BE(8);
+  let d = digest.readUInt32BE(12);
+
+  const nextUint32 = () => {
+    const t = (((a + b) | 0) + d) | 0;
+    d = (d + 1) | 0;
+    a = b ^ (b >>> 9);
+    b = (c + (c << 3)) | 0;
+    c = (c << 21) | (c >>> 11);
+    c = (c + t) | 0;
+    return t >>> 0;
+  };
+
+  // Discard the first outputs so the state is well mixed
+  for (let i = 0; i < 12; i++) nextUint32();
+
+  return {
+    nextUint32,
+    // Integer in [0, n)
+    nextInt: (n) => Math.floor((nextUint32() / 4294967296) * n)
+  };
+}
+
+// Partial Fisher-Yates shuffle: `count` distinct indexes from [0, length) in O(count),
+// keeping only the swapped positions instead of materialising the whole index array
+export function sampleIndexes(rng, length, count) {
+  if (count > length) {
+    throw new Error(`Cannot draw ${count} distinct items from ${length}`);
+  }
+
+  const swapped = new Map();
+  const result = [];
+  for (let i = 0; i < count; i++) {
+    const j = i + rng.nextInt(length - i);
+    const picked = swapped.has(j) ? swapped.get(j) : j;
+    swapped.set(j, swapped.has(i) ? swapped.get(i) : i);
+    result.push(picked);
+  }
+  return result;
+}
+
+// Serialize once and keep identity, gzip and brotli bodies plus a strong ETag
+function buildPayload(data) {
+  return compressPayload(Buffer.from(JSON.stringify(data), 'utf8'));
+}
+
+function compressPayload(body) {
+  const version = crypto.createHash('sha256').update(body).digest('hex').substring(0, 32);
+
+  return {
+    version,
+    etag: `"${version}"`,
+    body,
+    gzip: zlib.gzipSync(body, { level: zlib.constants.Z_BEST_COMPRESSION }),
+    br: zlib.brotliCompressSync(body, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT,
+        [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length
+      }
+    })
+  };
+}
+
 class ContentService {
   constructor() {
     this.cache = new Map();
+    this.payloads = new Map();
+    this.schemas = new Map();
+    this.validators = new Map();
+    this.watcher = null;
+    this.reloadTimers = new Map();
   }
 
   // Load JSON content with caching
@@ -16,6 +103,8 @@ class ContentService {
       return this.cache.get(type);
     }
 
+    this.watchContent();
+
     try {
       const filePath = path.join(CONTENT_DIR, `${type}.json`);
       const content = JSON.parse(fs.readFileSync(filePath, 'utf8'));
@@ -27,30 +116,216 @@ class ContentService {
     }
   }
 
-  // Save JSON content and clear cache
+  // Save JSON content atomically and swap it in
   saveContent(type, content) {
+    if (!CONTENT_TYPES.includes(type)) {
+      console.error(`Error saving ${type} content: unknown content type`);
+      return false;
+    }
+
+    const filePath = path.join(CONTENT_DIR, `${type}.json`);
+    const tempPath = `${filePath}.${process.pid}.${Date.now()}.tmp`;
+
     try {
-      const filePath = path.join(CONTENT_DIR, `${type}.json`);
-      fs.writeFileSync(filePath, JSON.stringify(content, null, 2), 'utf8');
-      this.cache.delete(type); // Clear cache
+      // rename() replaces the file in one step, so readers never see a half-written file
+      fs.writeFileSync(tempPath, JSON.stringify(content, null, 2), 'utf8');
+      fs.renameSync(tempPath, filePath);
+      this.installContent(type, content, buildPayload(content));
       return true;
     } catch (error) {
       console.error(`Error saving ${type} content:`, error);
+      fs.rmSync(tempPath, { force: true });
+      return false;
+    }
+  }
+
+  // Replace a content type's snapshot in one synchronous step: a request sees
+  // either the old content and payload or the new ones, never a mix
+  installContent(type, content, payload) {
+    this.cache.set(type, content);
+    this.payloads.set(type, payload);
+    this.payloads.delete('bundle');
+  }
+
+  // Watch content/ so edits made by hand or by another worker are picked up
+  // without a restart. Set CONTENT_WATCH=false to disable.
+  watchContent() {
+    if (this.watcher || process.env.CONTENT_WATCH === 'false') {
+      return;
+    }
+
+    try {
+      // Hot reloads in development create new instances; keep one watcher per process
+      global.contentWatcher?.close();
+      this.watcher = global.contentWatcher = fs.watch(CONTENT_DIR, (eventType, filename) => {
+        const type = filename?.endsWith('.json') ? filename.slice(0, -'.json'.length) : null;
+        if (CONTENT_TYPES.includes(type)) {
+          this.scheduleReload(type);
+        }
+      });
+      this.watcher.unref();
+      this.watcher.on('error', (error) => {
+        console.error('Content watcher error:', error);
+        this.watcher.close();
+        this.watcher = null;
+      });
+    } catch (error) {
+      console.error('Content watching unavailable:', error);
+      this.watcher = null;
+    }
+  }
+
+  scheduleReload(type) {
+    clearTimeout(this.reloadTimers.get(type));
+    const timer = setTimeout(() => {
+      this.reloadTimers.delete(type);
+      this.reloadContent(type);
+    }, RELOAD_DEBOUNCE_MS);
+    timer.unref();
+    this.reloadTimers.set(type, timer);
+  }
+
+  // Re-read, validate and swap in a content file, off the request path.
+  // Invalid or half-written files are rejected and the previous snapshot stays live.
+  async reloadContent(type) {
+    try {
+      const filePath = path.join(CONTENT_DIR, `${type}.json`);
+      const content = JSON.parse(await fs.promises.readFile(filePath, 'utf8'));
+
+      const errors = this.validateContent(type, content);
+      if (errors.length > 0) {
+        console.error(`Rejected ${type} content reload:`, errors.slice(0, 5));
+        return false;
+      }
+
+      const payload = buildPayload(content);
+      if (this.payloads.get(type)?.version !== payload.version) {
+        this.installContent(type, content, payload);
+        console.log(`Reloaded ${type} content (version ${payload.version})`);
+      }
+      return true;
+    } catch (error) {
+      console.error(`Error reloading ${type} content:`, error);
       return false;
     }
   }
 
-  // Load schema for validation
+  // Validation errors of content against its schema, empty when valid
+  validateContent(type, content) {
+    const validate = this.getValidator(type);
+    if (!validate) {
+      return [{ path: '$', message: `no schema for ${type}` }];
+    }
+    return validate(content);
+  }
+
+  // Compiled validator for a content type, built once per process
+  getValidator(type) {
+    if (!this.validators.has(type)) {
+      const schema = this.loadSchema(type);
+      if (!schema) {
+        return null;
+      }
+      this.validators.set(type, compileSchema(schema));
+    }
+    return this.validators.get(type);
+  }
+
+  // Load schema for validation (schemas only change on deploy, so they are read once)
   loadSchema(type) {
+    if (this.schemas.has(type)) {
+      return this.schemas.get(type);
+    }
+
     try {
       const schemaPath = path.join(SCHEMA_DIR, `${type}.schema.json`);
-      return JSON.parse(fs.readFileSync(schemaPath, 'utf8'));
+      const schema = JSON.parse(fs.readFileSync(schemaPath, 'utf8'));
+      this.schemas.set(type, schema);
+      return schema;
     } catch (error) {
       console.error(`Error loading ${type} schema:`, error);
       return null;
     }
   }
 
+  // Pre-serialized response payload for a content type
+  getContentPayload(type) {
+    if (this.payloads.has(type)) {
+      return this.payloads.get(type);
+    }
+
+    const content = this.loadContent(type);
+    if (content === null) {
+      return null;
+    }
+
+    const payload = buildPayload(content);
+    this.payloads.set(type, payload);
+    return payload;
+  }
+
+  // Pre-serialized response payload for a schema (schemas only change on deploy)
+  getSchemaPayload(type) {
+    const key = `schema/${type}`;
+    if (this.payloads.has(key)) {
+      return this.payloads.get(key);
+    }
+
+    const schema = this.loadSchema(type);
+    if (schema === null) {
+      return null;
+    }
+
+    const payload = buildPayload(schema);
+    this.payloads.set(key, payload);
+    return payload;
+  }
+
+  // Version hash per content type, e.g. { tarot: 'f4afc67b...' }
+  getContentVersions() {
+    const versions = {};
+    for (const type of CONTENT_TYPES) {
+      const payload = this.getContentPayload(type);
+      if (payload) {
+        versions[type] = payload.version;
+      }
+    }
+    return versions;
+  }
+
+  // All content types in one pre-serialized payload, or only the types whose
+  // version differs from `since` ({ type: version }) when the client has a copy.
+  // Bodies are spliced from the per-type payloads instead of re-stringified.
+  getBundlePayload(since = null) {
+    if (!since && this.payloads.has('bundle')) {
+      return this.payloads.get('bundle');
+    }
+
+    const versions = this.getContentVersions();
+    const changed = CONTENT_TYPES.filter(type => versions[type] && (!since || since[type] !== versions[type]));
+    const unchanged = CONTENT_TYPES.filter(type => versions[type] && !changed.includes(type));
+    const bundleVersion = crypto.createHash('sha256')
+      .update(CONTENT_TYPES.map(type => `${type}:${versions[type] || ''}`).join(','))
+      .digest('hex')
+      .substring(0, 32);
+
+    const parts = [Buffer.from(`{"version":${JSON.stringify(bundleVersion)},"versions":${JSON.stringify(versions)},"content":{`)];
+    changed.forEach((type, index) => {
+      parts.push(Buffer.from(`${index > 0 ? ',' : ''}${JSON.stringify(type)}:`));
+      parts.push(this.getContentPayload(type).body);
+    });
+    parts.push(Buffer.from(`},"unchanged":${JSON.stringify(unchanged)}}`));
+
+    if (since) {
+      // Delta bodies depend on the client's versions, so they are not cached or pre-compressed
+      return { body: Buffer.concat(parts), etag: null };
+    }
+
+    const payload = compressPayload(Buffer.concat(parts));
+    this.payloads.set('bundle', payload);
+    return payload;
+  }
+
   // Generate reproducible random numbers from seed
   seededRandom(seed, min = 0, max = 1) {
     const hash = crypto.createHash('sha256').update(seed).digest('hex');
@@ -69,7 +344,7 @@ class ContentService {
   }
 
   // Generate reading based on spread configuration
-  generateReading(orderId, email, spreadId) {
+  generateReading(orderId, email, spreadId, algorithm = READING_ALGORITHM) {
     const spreads = this.loadContent('spreads');
     const spread = spreads[spreadId];
     
@@ -78,46 +353,57 @@ class ContentService {
     }
 
     const seed = crypto.createHash('sha256').update(`${orderId}_${email}`).digest('hex');
+
+    if (algorithm === LEGACY_READING_ALGORITHM) {
+      return this.generateLegacyReading(spread, seed);
+    }
+    if (algorithm !== READING_ALGORITHM) {
+      throw new Error(`Unknown reading algorithm: ${algorithm}`);
+    }
+
+    const rng = createSeededStream(seed);
+    let reading;
     
     switch (spread.oraculo) {
       case 'tarot':
-        return this.generateTarotReading(spread, seed);
+        reading = this.generateTarotReading(spread, rng);
+        break;
       case 'iching':
-        return this.generateIChingReading(spread, seed);
+        reading = this.generateIChingReading(spread, rng);
+        break;
       case 'rueda':
-        return this.generateRuedaReading(spread, seed);
+        reading = this.generateRuedaReading(spread, rng);
+        break;
       default:
         throw new Error(`Unknown oracle type: ${spread.oraculo}`);
     }
+
+    // The content version lets renderers cache what depends only on the content
+    return { ...reading, algorithm, content_version: this.getContentPayload(spread.oraculo)?.version };
   }
 
-  generateTarotReading(spread, seed) {
+  // Algorithm that produced a stored reading (readings before the tag existed are legacy)
+  readingAlgorithm(result) {
+    return result?.algorithm || LEGACY_READING_ALGORITHM;
+  }
+
+  generateTarotReading(spread, rng) {
     const tarot = this.loadContent('tarot');
     if (!tarot || tarot.length === 0) {
       throw new Error('Tarot content not available');
     }
 
-    const cards = [];
-    const usedIndexes = new Set();
-    
-    for (let i = 0; i < spread.cartas; i++) {
-      let cardIndex;
-      do {
-        cardIndex = this.seededRandom(`${seed}_card_${i}`, 0, tarot.length - 1);
-      } while (usedIndexes.has(cardIndex));
-      
-      usedIndexes.add(cardIndex);
-      
+    const cards = sampleIndexes(rng, tarot.length, spread.cartas).map((cardIndex, i) => {
       const card = tarot[cardIndex];
-      const isReversed = this.seededRandom(`${seed}_reversed_${i}`, 0, 1) === 1;
+      const isReversed = rng.nextInt(2) === 1;
       
-      cards.push({
+      return {
         ...card,
         reversed: isReversed,
         position: spread.posiciones ? spread.posiciones[i] : `Carta ${i + 1}`,
         interpretation: isReversed ? card.reversed : card.upright
-      });
-    }
+      };
+    });
 
     return {
       type: 'tarot',
@@ -128,14 +414,13 @@ class ContentService {
     };
   }
 
-  generateIChingReading(spread, seed) {
+  generateIChingReading(spread, rng) {
     const iching = this.loadContent('iching');
     if (!iching || iching.length === 0) {
       throw new Error('I Ching content not available');
     }
 
-    const hexIndex = this.seededRandom(seed, 0, iching.length - 1);
-    const hexagram = iching[hexIndex];
+    const hexagram = iching[rng.nextInt(iching.length)];
 
     return {
       type: 'iching',
@@ -146,30 +431,16 @@ class ContentService {
     };
   }
 
-  generateRuedaReading(spread, seed) {
+  generateRuedaReading(spread, rng) {
     const rueda = this.loadContent('rueda');
     if (!rueda || rueda.length === 0) {
       throw new Error('Rueda Medicinal content not available');
     }
 
-    const animals = [];
-    const usedIndexes = new Set();
-    
-    for (let i = 0; i < spread.cartas; i++) {
-      let animalIndex;
-      do {
-        animalIndex = this.seededRandom(`${seed}_animal_${i}`, 0, rueda.length - 1);
-      } while (usedIndexes.has(animalIndex));
-      
-      usedIndexes.add(animalIndex);
-      
-      const animal = rueda[animalIndex];
-      
-      animals.push({
-        ...animal,
-        position: spread.posiciones ? spread.posiciones[i] : `Animal ${i + 1}`
-      });
-    }
+    const animals = sampleIndexes(rng, rueda.length, spread.cartas).map((animalIndex, i) => ({
+      ...rueda[animalIndex],
+      position: spread.posiciones ? spread.posiciones[i] : `Animal ${i + 1}`
+    }));
 
     return {
       type: 'rueda',
@@ -180,9 +451,82 @@ class ContentService {
     };
   }
 
+  // Re-derive a reading made before READING_ALGORITHM existed: one SHA-256 per draw.
+  // The per-draw seed never changes, so a repeated index could never be resolved by
+  // retrying; no stored legacy reading contains one, and it is reported as an error.
+  generateLegacyReading(spread, seed) {
+    const legacyDraw = (content, prefix) => {
+      const usedIndexes = new Set();
+      const indexes = [];
+      for (let i = 0; i < spread.cartas; i++) {
+        const index = this.seededRandom(`${seed}_${prefix}_${i}`, 0, content.length - 1);
+        if (usedIndexes.has(index)) {
+          throw new Error(`Legacy algorithm cannot draw ${prefix} ${i} without repeating`);
+        }
+        usedIndexes.add(index);
+        indexes.push(index);
+      }
+      return indexes;
+    };
+
+    let reading;
+    if (spread.oraculo === 'tarot') {
+      const tarot = this.loadContent('tarot');
+      reading = {
+        type: 'tarot',
+        spread: spread,
+        cards: legacyDraw(tarot, 'card').map((cardIndex, i) => {
+          const card = tarot[cardIndex];
+          const isReversed = this.seededRandom(`${seed}_reversed_${i}`, 0, 1) === 1;
+          return {
+            ...card,
+            reversed: isReversed,
+            position: spread.posiciones ? spread.posiciones[i] : `Carta ${i + 1}`,
+            interpretation: isReversed ? card.reversed : card.upright
+          };
+        }),
+        message: 'Las cartas han sido elegidas. Confía en su sabiduría.'
+      };
+    } else if (spread.oraculo === 'iching') {
+      const iching = this.loadContent('iching');
+      reading = {
+        type: 'iching',
+        spread: spread,
+        hexagram: iching[this.seededRandom(seed, 0, iching.length - 1)],
+        message: 'El I Ching revela su sabiduría milenaria.'
+      };
+    } else if (spread.oraculo === 'rueda') {
+      const rueda = this.loadContent('rueda');
+      reading = {
+        type: 'rueda',
+        spread: spread,
+        animals: legacyDraw(rueda, 'animal').map((animalIndex, i) => ({
+          ...rueda[animalIndex],
+          position: spread.posiciones ? spread.posiciones[i] : `Animal ${i + 1}`
+        })),
+        message: 'Los animales de poder han sido llamados para guiarte.'
+      };
+    } else {
+      throw new Error(`Unknown oracle type: ${spread.oraculo}`);
+    }
+
+    return { ...reading, timestamp: new Date().toISOString(), algorithm: LEGACY_READING_ALGORITHM };
+  }
+
   // Clear all cache
   clearCache() {
     this.cache.clear();
+    this.payloads.clear();
+  }
+
+  // Stop watching content files (tests and worker shutdown)
+  close() {
+    this.watcher?.close();
+    this.watcher = null;
+    for (const timer of this.reloadTimers.values()) {
+      clearTimeout(timer);
+    }
+    this.reloadTimers.clear();
   }
 }
 
@@ -0,0 +1,77 @@
+import { getCollection } from './mongodb.js';
+import { JOB_TYPES } from './jobQueue.js';
+import { generateReadingPDF } from './pdfGenerator.js';
+import { invalidateOrderLookup } from './orderLookup.js';
+import { generateReadingForOrder } from './readingService.js';
+import { deliverReading } from './telegramDelivery.js';
+
+// Post-payment work run by the job worker. Handlers are idempotent: a job can run
+// again after a crash or an expired lease, so each one checks what's already done.
+
+// A job's last attempt (or a permanent error) is recorded on the order or reading
+// it was for, so /api/orders/{id}/events can tell the page nothing more is coming
+const isFinalAttempt = (error, job) => !!error.permanent || job.attempts >= job.max_attempts;
+
+async function generateReading({ order_id }, job) {
+  const ordersCollection = await getCollection('orders');
+  const order = await ordersCollection.findOne({ order_id });
+  if (!order) {
+    throw new Error(`Order ${order_id} not found`);
+  }
+
+  try {
+    await generateReadingForOrder(order);
+  } catch (error) {
+    if (isFinalAttempt(error, job)) {
+      await ordersCollection.updateOne({ order_id }, { $set: { reading_failed_at: new Date(), reading_error: error.message } });
+      invalidateOrderLookup(order_id);
+    }
+    throw error;
+  }
+}
+
+async function renderPdf({ order_id }, job) {
+  const readingsCollection = await getCollection('readings');
+  const reading = await readingsCollection.findOne({ order_id });
+  if (!reading) {
+    throw new Error(`Reading for order ${order_id} not found`);
+  }
+  if (reading.pdf_url) {
+    return;
+  }
+  // Re-queued after failing: it is in progress again
+  if (reading.pdf_failed_at) {
+    await readingsCollection.updateOne({ order_id }, { $set: { pdf_failed_at: null, pdf_error: null } });
+    invalidateOrderLookup(order_id);
+  }
+
+  const ordersCollection = await getCollection('orders');
+  const order = await ordersCollection.findOne({ order_id });
+
+  const result = await generateReadingPDF(reading.result_json, order);
+  if (!result.success) {
+    const error = new Error(result.error);
+    if (isFinalAttempt(error, job)) {
+      await readingsCollection.updateOne({ order_id }, { $set: { pdf_failed_at: new Date(), pdf_error: result.error } });
+      invalidateOrderLookup(order_id);
+    }
+    throw error;
+  }
+
+  // The version parameter makes each render's URL immutable, so it can be cached
+  const { key, sha256, size } = result.artifact;
+  await readingsCollection.updateOne({ order_id }, {
+    $set: {
+      pdf_url: `/api/readings/${order_id}/pdf?v=${sha256.slice(0, 16)}`,
+      pdf_artifact: { key, sha256, size },
+      pdf_expired_at: null
+    }
+  });
+  invalidateOrderLookup(order_id);
+}
+
+export const jobHandlers = {
+  [JOB_TYPES.GENERATE_READING]: generateReading,
+  [JOB_TYPES.RENDER_PDF]: renderPdf,
+  [JOB_TYPES.SEND_TELEGRAM]: deliverReading
+};
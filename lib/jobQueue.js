@@ -0,0 +1,180 @@
+import { v4 as uuidv4 } from 'uuid';
+import { getCollection } from './mongodb.js';
+
+// Durable background jobs stored in the `jobs` collection.
+//
+// A job is claimable when its status is pending or running and available_at has
+// passed. Claiming sets it running and pushes available_at out by the visibility
+// timeout, so a job whose worker crashed becomes claimable again once that lease
+// expires. Failures are retried with exponential backoff up to max_attempts.
+
+export const JOB_TYPES = {
+  GENERATE_READING: 'generate-reading',
+  RENDER_PDF: 'render-pdf',
+  SEND_TELEGRAM: 'send-telegram'
+};
+
+const VISIBILITY_TIMEOUT_MS = Number(process.env.JOB_VISIBILITY_TIMEOUT_MS) || 60000;
+const BACKOFF_BASE_MS = 2000;
+const BACKOFF_MAX_MS = 5 * 60 * 1000;
+const DEFAULT_MAX_ATTEMPTS = 5;
+// Jobs that may still run; a keyed job is deduplicated only against these
+const ACTIVE_STATUSES = ['pending', 'running'];
+
+async function jobsCollection() {
+  return getCollection('jobs');
+}
+
+function newJob(type, payload, { key, maxAttempts = DEFAULT_MAX_ATTEMPTS, delayMs = 0 } = {}) {
+  const now = new Date();
+  return {
+    _id: uuidv4(),
+    type,
+    payload,
+    key: key || null,
+    status: 'pending',
+    attempts: 0,
+    max_attempts: maxAttempts,
+    available_at: new Date(now.getTime() + delayMs),
+    last_error: null,
+    created_at: now,
+    updated_at: now
+  };
+}
+
+// Upsert for a keyed job: inserts it, or starts a finished (done or failed) job
+// with the same key over as this one. A pending or running job is left as is.
+function keyedUpsert(job) {
+  const { _id, ...fields } = job;
+  return {
+    filter: { key: job.key },
+    update: [{
+      $replaceWith: {
+        $cond: [
+          { $in: ['$status', ACTIVE_STATUSES] },
+          '$$ROOT',
+          { $mergeObjects: [{ $literal: fields }, { _id: { $ifNull: ['$_id', _id] } }] }
+        ]
+      }
+    }]
+  };
+}
+
+// Enqueue a job. With a key, enqueueing it again while the first is pending or
+// running is a no-op, so webhook retries and repeated payment callbacks don't
+// duplicate work; once it has finished or failed, it runs again.
+export async function enqueueJob(type, payload, options = {}) {
+  const collection = await jobsCollection();
+  const job = newJob(type, payload, options);
+
+  if (!job.key) {
+    await collection.insertOne(job);
+    return job;
+  }
+
+  const { filter, update } = keyedUpsert(job);
+  return collection.findOneAndUpdate(filter, update, { upsert: true, returnDocument: 'after' });
+}
+
+// Enqueue many jobs in one round trip; keyed duplicates that are still pending
+// or running are skipped
+export async function enqueueJobs(type, jobs, options = {}) {
+  if (jobs.length === 0) {
+    return;
+  }
+  const collection = await jobsCollection();
+  await collection.bulkWrite(jobs.map(({ payload, key }) => {
+    const job = newJob(type, payload, { ...options, key });
+    if (!job.key) {
+      return { insertOne: { document: job } };
+    }
+    return { updateOne: { ...keyedUpsert(job), upsert: true } };
+  }), { ordered: false });
+}
+
+// Claim the next due job, or null when none is available
+export async function claimJob(workerId, types) {
+  const collection = await jobsCollection();
+  const now = new Date();
+  const filter = {
+    status: { $in: ACTIVE_STATUSES },
+    available_at: { $lte: now }
+  };
+  if (types) {
+    filter.type = { $in: types };
+  }
+
+  return collection.findOneAndUpdate(
+    filter,
+    {
+      $set: {
+        status: 'running',
+        locked_by: workerId,
+        available_at: new Date(now.getTime() + VISIBILITY_TIMEOUT_MS),
+        updated_at: now
+      },
+      $inc: { attempts: 1 }
+    },
+    { sort: { available_at: 1 }, returnDocument: 'after' }
+  );
+}
+
+// The attempts match makes a late ack from a worker whose lease expired a no-op
+function ownedBy(job) {
+  return { _id: job._id, status: 'running', attempts: job.attempts };
+}
+
+export async function completeJob(job) {
+  const collection = await jobsCollection();
+  const now = new Date();
+  await collection.updateOne(ownedBy(job), {
+    $set: { status: 'done', finished_at: now, updated_at: now, last_error: null }
+  });
+}
+
+export function backoffDelay(attempts) {
+  const delay = Math.min(BACKOFF_BASE_MS * 2 ** (attempts - 1), BACKOFF_MAX_MS);
+  // Jitter spreads out retries of jobs that failed together
+  return Math.round(delay * (0.5 + Math.random() / 2));
+}
+
+export async function failJob(job, error) {
+  const collection = await jobsCollection();
+  const now = new Date();
+  const exhausted = !!error.permanent || job.attempts >= job.max_attempts;
+  const delayMs = error.retryAfterMs ?? backoffDelay(job.attempts);
+
+  await collection.updateOne(ownedBy(job), {
+    $set: exhausted
+      ? { status: 'failed', finished_at: now, updated_at: now, last_error: error.message }
+      : {
+        status: 'pending',
+        available_at: new Date(now.getTime() + delayMs),
+        updated_at: now,
+        last_error: error.message
+      }
+  });
+
+  return exhausted ? 'failed' : 'retrying';
+}
+
+// Put a claimed job back for later without using up an attempt: the handler
+// was throttled (rate limits), not failing
+export async function deferJob(job, delayMs) {
+  const collection = await jobsCollection();
+  const now = new Date();
+  await collection.updateOne(ownedBy(job), {
+    $set: { status: 'pending', available_at: new Date(now.getTime() + delayMs), updated_at: now },
+    $inc: { attempts: -1 }
+  });
+}
+
+// Job counts by status, for the admin status endpoint
+export async function getJobStats() {
+  const collection = await jobsCollection();
+  const counts = await collection.aggregate([
+    { $match: { status: { $in: ['pending', 'running', 'failed'] } } },
+    { $group: { _id: '$status', count: { $sum: 1 } } }
+  ]).toArray();
+  return Object.fromEntries(counts.map(({ _id, count }) => [_id, count]));
+}
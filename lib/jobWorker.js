@@ -0,0 +1,78 @@
+import os from 'os';
+import { claimJob, completeJob, deferJob, failJob } from './jobQueue.js';
+import { jobHandlers } from './jobHandlers.js';
+
+// Drains the job queue: `concurrency` loops each claim a job, run its handler and
+// ack it, sleeping for pollIntervalMs whenever the queue is empty.
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function runJob(job) {
+  const handler = jobHandlers[job.type];
+
+  try {
+    if (!handler) {
+      throw new Error(`No handler for job type ${job.type}`);
+    }
+    // Attempts past the limit mean earlier runs crashed before they could ack
+    if (job.attempts > job.max_attempts) {
+      throw new Error('Exceeded max attempts');
+    }
+    await handler(job.payload, job);
+    await completeJob(job);
+  } catch (error) {
+    if (error.deferMs !== undefined) {
+      await deferJob(job, error.deferMs);
+      return;
+    }
+    const outcome = await failJob(job, error);
+    console.error(`Job ${job.type} ${job._id} attempt ${job.attempts} failed (${outcome}):`, error.message);
+  }
+}
+
+export function startJobWorker({
+  concurrency = Number(process.env.JOB_WORKER_CONCURRENCY) || 2,
+  pollIntervalMs = Number(process.env.JOB_POLL_INTERVAL_MS) || 1000
+} = {}) {
+  const workerId = `${os.hostname()}:${process.pid}`;
+  let running = true;
+
+  async function loop() {
+    while (running) {
+      try {
+        const job = await claimJob(workerId, Object.keys(jobHandlers));
+        if (job) {
+          await runJob(job);
+        } else {
+          await sleep(pollIntervalMs);
+        }
+      } catch (error) {
+        console.error('Job worker error:', error.message);
+        await sleep(pollIntervalMs);
+      }
+    }
+  }
+
+  const loops = Array.from({ length: concurrency }, loop);
+
+  return {
+    workerId,
+    // Finish the jobs in progress, then stop claiming
+    async stop() {
+      running = false;
+      await Promise.all(loops);
+    }
+  };
+}
+
+// Run a worker inside the API process (JOB_WORKER_INLINE=true), for development
+// and test setups without a separate `yarn worker`
+export function startInlineJobWorker() {
+  if (process.env.JOB_WORKER_INLINE !== 'true') {
+    return null;
+  }
+  if (!global.inlineJobWorker) {
+    global.inlineJobWorker = startJobWorker();
+  }
+  return global.inlineJobWorker;
+}
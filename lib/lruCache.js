@@ -0,0 +1,38 @@
+// Minimal LRU cache on top of Map's insertion order: a hit re-inserts the key
+// so the first key in the map is always the least recently used one.
+export class LRUCache {
+  constructor(maxEntries = 1000) {
+    this.maxEntries = maxEntries;
+    this.entries = new Map();
+  }
+
+  get(key) {
+    if (!this.entries.has(key)) {
+      return undefined;
+    }
+    const value = this.entries.get(key);
+    this.entries.delete(key);
+    this.entries.set(key, value);
+    return value;
+  }
+
+  set(key, value) {
+    this.entries.delete(key);
+    this.entries.set(key, value);
+    if (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value);
+    }
+  }
+
+  delete(key) {
+    return this.entries.delete(key);
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+}
@@ -6,6 +6,116 @@ if (!cached) {
   cached = global.mongo = { conn: null, promise: null };
 }
 
+// Indexes backing the hot lookups: orders/readings by order_id, the PayPal
+// webhook's paypal_order_id lookup and the keyset-paginated orders listing
+// (newest first on created_at, order_id, optionally filtered by status/spread).
+// The unique order_id and idempotency_key indexes also make reading creation and
+// checkout retries race-free.
+const INDEXES = {
+  orders: [
+    { key: { order_id: 1 }, name: 'order_id_unique', unique: true },
+    { key: { paypal_order_id: 1 }, name: 'paypal_order_id', sparse: true },
+    {
+      key: { idempotency_key: 1 },
+      name: 'idempotency_key_unique',
+      unique: true,
+      partialFilterExpression: { idempotency_key: { $type: 'string' } }
+    },
+    { key: { created_at: -1, order_id: -1 }, name: 'created_at_order_id' },
+    { key: { status: 1, created_at: -1, order_id: -1 }, name: 'status_created_at_order_id' },
+    { key: { spread_id: 1, created_at: -1, order_id: -1 }, name: 'spread_id_created_at_order_id' }
+  ],
+  readings: [
+    { key: { order_id: 1 }, name: 'order_id_unique', unique: true }
+  ],
+  // lib/jobQueue: the claim query, keyed dedupe and a week of finished-job history
+  jobs: [
+    { key: { status: 1, available_at: 1 }, name: 'status_available_at' },
+    { key: { key: 1 }, name: 'key_unique', unique: true, partialFilterExpression: { key: { $type: 'string' } } },
+    {
+      key: { finished_at: 1 },
+      name: 'finished_at_ttl',
+      expireAfterSeconds: 7 * 24 * 60 * 60,
+      partialFilterExpression: { status: 'done' }
+    }
+  ],
+  // lib/artifacts: an order's documents and the expiry sweep
+  artifacts: [
+    { key: { order_id: 1, kind: 1 }, name: 'order_id_kind' },
+    { key: { expires_at: 1 }, name: 'expires_at' }
+  ]
+};
+
+// Readings raced into duplicates before readings.order_id was unique (the
+// PayPal webhook and /readings/generate both inserted one). Keep the reading
+// with a PDF, else the oldest, and move the others to readings_duplicates so
+// the unique index can be built. Only runs while that index is missing.
+export async function dedupeReadings(db) {
+  const readingsCollection = db.collection('readings');
+  if (await readingsCollection.indexExists('order_id_unique').catch(() => false)) {
+    return 0;
+  }
+
+  const groups = await readingsCollection.aggregate([
+    { $match: { order_id: { $exists: true } } },
+    { $sort: { pdf_url: -1, created_at: 1, _id: 1 } },
+    { $group: { _id: '$order_id', ids: { $push: '$_id' } } },
+    { $match: { 'ids.1': { $exists: true } } }
+  ], { allowDiskUse: true }).toArray();
+
+  const duplicateIds = groups.flatMap(group => group.ids.slice(1));
+  if (duplicateIds.length === 0) {
+    return 0;
+  }
+
+  // Archive before deleting; several processes may run this at once, so the
+  // archive is keyed by _id and deleting twice is harmless
+  const archivedAt = new Date();
+  const duplicates = await readingsCollection.find({ _id: { $in: duplicateIds } }).toArray();
+  await db.collection('readings_duplicates').bulkWrite(duplicates.map(reading => ({
+    replaceOne: { filter: { _id: reading._id }, replacement: { ...reading, archived_at: archivedAt }, upsert: true }
+  })), { ordered: false });
+  await readingsCollection.deleteMany({ _id: { $in: duplicateIds } });
+
+  console.warn(`Moved ${duplicateIds.length} duplicate readings to readings_duplicates`);
+  return duplicateIds.length;
+}
+
+// Create missing indexes (a no-op when they already exist). Unique indexes are
+// created one per call, so one that cannot be built does not take the others
+// with it, and a failure rejects: reading creation, checkout retries and job
+// dedupe are only race-free with them. Other indexes only speed up queries, so
+// their failures are logged.
+export async function ensureIndexes(db) {
+  await dedupeReadings(db);
+
+  const failures = [];
+  await Promise.all(Object.entries(INDEXES).map(async ([collection, indexes]) => {
+    const unique = indexes.filter(index => index.unique);
+    const others = indexes.filter(index => !index.unique);
+
+    await Promise.all(unique.map(async ({ key, ...options }) => {
+      try {
+        await db.collection(collection).createIndex(key, options);
+      } catch (error) {
+        failures.push(`${collection}.${options.name}: ${error.message}`);
+      }
+    }));
+
+    if (others.length > 0) {
+      try {
+        await db.collection(collection).createIndexes(others);
+      } catch (error) {
+        console.error(`Error creating ${collection} indexes:`, error.message);
+      }
+    }
+  }));
+
+  if (failures.length > 0) {
+    throw new Error(`Could not create unique indexes (remove the duplicates and restart): ${failures.join('; ')}`);
+  }
+}
+
 export async function connectToDatabase() {
   // Check environment variables only when connecting, not at module load time
   const MONGO_URL = process.env.MONGO_URL || process.env.MONGODB_URI;
@@ -26,15 +136,28 @@ export async function connectToDatabase() {
       socketTimeoutMS: 45000,
     };
 
-    cached.promise = MongoClient.connect(MONGO_URL, opts).then((client) => {
+    cached.promise = MongoClient.connect(MONGO_URL, opts).then(async (client) => {
+      const db = client.db(DB_NAME);
+      try {
+        await ensureIndexes(db);
+      } catch (error) {
+        await client.close();
+        throw error;
+      }
       return {
         client,
-        db: client.db(DB_NAME),
+        db,
       };
     });
   }
 
-  cached.conn = await cached.promise;
+  try {
+    cached.conn = await cached.promise;
+  } catch (error) {
+    // Don't keep a failed connection (or index build) for every later request
+    cached.promise = null;
+    throw error;
+  }
   return cached.conn;
 }
 
@@ -0,0 +1,266 @@
+import { EventEmitter } from 'events';
+import { getCollection, connectToDatabase } from './mongodb.js';
+import { isOrderFinished } from './orderProgress.js';
+
+// Order progress for GET /api/orders/{id}/events (Server-Sent Events).
+//
+// An order moves through stages created -> paid -> reading_ready -> pdf_ready,
+// or ends in `unpaid` (no payment within ORDER_EVENTS_PAYMENT_WINDOW_MS of
+// checkout) or `failed` (its reading or PDF job gave up, see lib/jobHandlers);
+// subscribers get the order's state once, then again whenever it changes. The
+// state is re-read from MongoDB for orders someone is subscribed to, on:
+//   - publishOrderChange(orderId), called after every write in this process
+//     (invalidateOrderLookup calls it)
+//   - a change stream on orders and readings, for writes made by the job worker
+//     in another process
+//   - a poll every ORDER_EVENTS_POLL_MS, one query per collection for all
+//     subscribed orders, when change streams are unavailable (standalone mongod)
+//     or disabled with ORDER_EVENTS_CHANGE_STREAM=false
+// Orders nobody is subscribed to cost nothing. The hub lives on `global` so dev
+// hot reloads keep one change stream.
+
+const POLL_INTERVAL_MS = Number(process.env.ORDER_EVENTS_POLL_MS) || 2000;
+const USE_CHANGE_STREAM = process.env.ORDER_EVENTS_CHANGE_STREAM !== 'false';
+const PAYMENT_WINDOW_MS = Number(process.env.ORDER_EVENTS_PAYMENT_WINDOW_MS) || 60 * 60 * 1000;
+
+const ORDER_PROJECTION = { _id: 0, order_id: 1, status: 1, created_at: 1, reading_failed_at: 1 };
+const READING_PROJECTION = { _id: 0, order_id: 1, pdf_url: 1, pdf_expired_at: 1, pdf_failed_at: 1, telegram_status: 1 };
+
+// Open streams per process; more are refused with 503
+export const MAX_ORDER_EVENT_STREAMS = Number(process.env.ORDER_EVENTS_MAX_STREAMS) || 2000;
+
+let hub = global.orderEvents;
+
+if (!hub) {
+  hub = global.orderEvents = {
+    emitter: new EventEmitter().setMaxListeners(0),
+    // orderId -> { subscribers, key } where key identifies the last state sent
+    watched: new Map(),
+    streams: 0,
+    pending: new Set(),
+    flushScheduled: false,
+    changeStream: null,
+    changeStreamUnsupported: false,
+    pollTimer: null
+  };
+}
+
+// The state sent to subscribers; `stage` is the furthest step reached
+export function orderState(order, reading, now = Date.now()) {
+  const paid = order.status === 'paid' || order.status === 'completed';
+  let stage = 'created';
+  if (reading?.pdf_url) {
+    stage = 'pdf_ready';
+  } else if (reading?.pdf_failed_at || (!reading && order.reading_failed_at)) {
+    stage = 'failed';
+  } else if (reading) {
+    stage = 'reading_ready';
+  } else if (paid) {
+    stage = 'paid';
+  } else if (now - new Date(order.created_at || 0).getTime() >= PAYMENT_WINDOW_MS) {
+    stage = 'unpaid';
+  }
+
+  return {
+    order_id: order.order_id,
+    stage,
+    order_status: order.status,
+    pdf_url: reading?.pdf_url || null,
+    pdf_expired: !!reading?.pdf_expired_at,
+    telegram_status: reading?.telegram_status || null,
+    finished: isOrderFinished(order, reading)
+  };
+}
+
+// Nothing left to wait for: the order is finished (lib/orderProgress), or it
+// went unpaid or failed and no Telegram send is pending
+export function isFinalState(state) {
+  return state.finished
+    || ((state.stage === 'unpaid' || state.stage === 'failed') && state.telegram_status !== 'queued');
+}
+
+// Re-read the given orders and notify subscribers of the ones that changed
+async function refresh(orderIds) {
+  const ids = orderIds.filter((orderId) => hub.watched.has(orderId));
+  if (ids.length === 0) {
+    return;
+  }
+
+  const ordersCollection = await getCollection('orders');
+  const readingsCollection = await getCollection('readings');
+  const [orders, readings] = await Promise.all([
+    ordersCollection.find({ order_id: { $in: ids } }, { projection: ORDER_PROJECTION }).toArray(),
+    readingsCollection.find({ order_id: { $in: ids } }, { projection: READING_PROJECTION }).toArray()
+  ]);
+  const readingsById = new Map(readings.map((reading) => [reading.order_id, reading]));
+
+  for (const order of orders) {
+    const watch = hub.watched.get(order.order_id);
+    const state = orderState(order, readingsById.get(order.order_id));
+    const key = JSON.stringify(state);
+    if (watch && watch.key !== key) {
+      watch.key = key;
+      hub.emitter.emit(order.order_id, state);
+    }
+  }
+}
+
+function flush() {
+  hub.flushScheduled = false;
+  const ids = [...hub.pending];
+  hub.pending.clear();
+  refresh(ids).catch((error) => console.error('Order events refresh failed:', error.message));
+}
+
+// Note a write to an order or its reading. Changes in the same tick are
+// coalesced into one read.
+export function publishOrderChange(orderId) {
+  if (!hub.watched.has(orderId)) {
+    return;
+  }
+  hub.pending.add(orderId);
+  if (!hub.flushScheduled) {
+    hub.flushScheduled = true;
+    setImmediate(flush);
+  }
+}
+
+function startPolling() {
+  if (!hub.pollTimer) {
+    hub.pollTimer = setInterval(() => {
+      refresh([...hub.watched.keys()]).catch((error) => console.error('Order events poll failed:', error.message));
+    }, POLL_INTERVAL_MS);
+    hub.pollTimer.unref?.();
+  }
+}
+
+function stopPolling() {
+  clearInterval(hub.pollTimer);
+  hub.pollTimer = null;
+}
+
+async function startChangeStream() {
+  const { db } = await connectToDatabase();
+  if (hub.watched.size === 0 || hub.changeStream) {
+    return;
+  }
+
+  const changeStream = db.watch([
+    { $match: { 'ns.coll': { $in: ['orders', 'readings'] }, operationType: { $in: ['insert', 'update', 'replace'] } } },
+    { $project: { 'fullDocument.order_id': 1 } }
+  ], { fullDocument: 'updateLookup' });
+  hub.changeStream = changeStream;
+
+  changeStream.on('change', (change) => {
+    if (change.fullDocument?.order_id) {
+      publishOrderChange(change.fullDocument.order_id);
+    }
+  });
+  // Writes made before the stream was open are caught by one read once it is
+  changeStream.once('resumeTokenChanged', () => {
+    hub.watched.forEach((watch, orderId) => publishOrderChange(orderId));
+  });
+  changeStream.on('error', (error) => {
+    // Standalone servers don't support change streams (code 40573); poll from now on
+    hub.changeStreamUnsupported = error.code === 40573 || hub.changeStreamUnsupported;
+    console.error('Order events change stream failed, polling instead:', error.message);
+    changeStream.close().catch(() => {});
+    if (hub.changeStream === changeStream) {
+      hub.changeStream = null;
+      if (hub.watched.size > 0) {
+        startPolling();
+      }
+    }
+  });
+}
+
+function startSources() {
+  if (!USE_CHANGE_STREAM || hub.changeStreamUnsupported) {
+    startPolling();
+    return;
+  }
+  if (!hub.changeStream && !hub.pollTimer) {
+    startChangeStream().catch((error) => {
+      console.error('Order events change stream failed, polling instead:', error.message);
+      startPolling();
+    });
+  }
+}
+
+function stopSources() {
+  stopPolling();
+  if (hub.changeStream) {
+    hub.changeStream.close().catch(() => {});
+    hub.changeStream = null;
+  }
+}
+
+// Call listener(state) with the order's current state and on every change.
+// Resolves to an unsubscribe function, or null when the order doesn't exist.
+export async function subscribeOrderEvents(orderId, listener) {
+  let watch = hub.watched.get(orderId);
+  if (!watch) {
+    watch = { subscribers: 0, key: null };
+    hub.watched.set(orderId, watch);
+  }
+  watch.subscribers++;
+  hub.streams++;
+
+  // A change seen while the first read is in flight is newer than that read
+  let delivered = false;
+  const deliver = (state) => {
+    delivered = true;
+    listener(state);
+  };
+  hub.emitter.on(orderId, deliver);
+  let paymentTimer = null;
+
+  const unsubscribe = () => {
+    clearTimeout(paymentTimer);
+    hub.emitter.off(orderId, deliver);
+    hub.streams--;
+    if (--watch.subscribers === 0) {
+      hub.watched.delete(orderId);
+      if (hub.watched.size === 0) {
+        stopSources();
+      }
+    }
+  };
+
+  try {
+    const ordersCollection = await getCollection('orders');
+    const readingsCollection = await getCollection('readings');
+    const [order, reading] = await Promise.all([
+      ordersCollection.findOne({ order_id: orderId }, { projection: ORDER_PROJECTION }),
+      readingsCollection.findOne({ order_id: orderId }, { projection: READING_PROJECTION })
+    ]);
+    if (!order) {
+      unsubscribe();
+      return null;
+    }
+
+    const state = orderState(order, reading);
+    if (watch.key === null) {
+      watch.key = JSON.stringify(state);
+    }
+    if (!delivered) {
+      listener(state);
+    }
+    // Nothing is written when the payment window closes, so re-read the order then
+    if (state.stage === 'created') {
+      const remainingMs = PAYMENT_WINDOW_MS - (Date.now() - new Date(order.created_at).getTime());
+      paymentTimer = setTimeout(() => publishOrderChange(orderId), remainingMs + 1000);
+      paymentTimer.unref?.();
+    }
+    startSources();
+    return unsubscribe;
+  } catch (error) {
+    unsubscribe();
+    throw error;
+  }
+}
+
+// Open streams in this process
+export function orderEventStreamCount() {
+  return hub.streams;
+}
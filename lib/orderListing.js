@@ -0,0 +1,127 @@
+// Keyset pagination for GET /api/orders, newest first on (created_at, order_id).
+// Each page continues strictly after the last row of the previous one, so the
+// cost of a page does not grow with how deep the admin has browsed.
+
+const DEFAULT_LIMIT = 50;
+const MAX_LIMIT = 200;
+
+// Public order fields: the listing returns all of them by default and `fields`
+// may pick among them. Internal columns (idempotency_key, checkout_response...)
+// are never listed. created_at and order_id are always returned because the
+// cursor is built from them
+const LISTABLE_FIELDS = new Set([
+  '_id', 'order_id', 'email', 'spread_id', 'custom_question', 'status', 'amount',
+  'test_mode', 'paypal_order_id', 'paypal_status', 'created_at', 'paid_at', 'completed_at'
+]);
+
+const DEFAULT_PROJECTION = Object.fromEntries([...LISTABLE_FIELDS].map(field => [field, 1]));
+
+export const ORDER_LIST_SORT = { created_at: -1, order_id: -1 };
+
+export function encodeCursor(order) {
+  const payload = JSON.stringify({ c: new Date(order.created_at).getTime(), o: order.order_id });
+  return Buffer.from(payload).toString('base64url');
+}
+
+function decodeCursor(cursor) {
+  let decoded;
+  try {
+    decoded = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+  } catch {
+    decoded = null;
+  }
+  if (!decoded || !Number.isFinite(decoded.c) || typeof decoded.o !== 'string') {
+    throw new Error('cursor is invalid');
+  }
+  return { createdAt: new Date(decoded.c), orderId: decoded.o };
+}
+
+function parseDate(value, name) {
+  const date = new Date(value);
+  if (Number.isNaN(date.getTime())) {
+    throw new Error(`${name} must be an ISO date`);
+  }
+  return date;
+}
+
+// Build { filter, projection, limit } from the query string, or { error }
+export function parseOrderListQuery(searchParams) {
+  try {
+    const filter = {};
+
+    const status = searchParams.get('status');
+    if (status) {
+      const statuses = status.split(',').filter(Boolean);
+      filter.status = statuses.length === 1 ? statuses[0] : { $in: statuses };
+    }
+
+    const spreadId = searchParams.get('spread_id');
+    if (spreadId) {
+      filter.spread_id = spreadId;
+    }
+
+    const testMode = searchParams.get('test_mode');
+    if (testMode !== null) {
+      if (testMode !== 'true' && testMode !== 'false') {
+        throw new Error('test_mode must be true or false');
+      }
+      filter.test_mode = testMode === 'true';
+    }
+
+    const from = searchParams.get('from');
+    const to = searchParams.get('to');
+    if (from || to) {
+      filter.created_at = {};
+      if (from) filter.created_at.$gte = parseDate(from, 'from');
+      if (to) filter.created_at.$lt = parseDate(to, 'to');
+    }
+
+    const cursor = searchParams.get('cursor');
+    if (cursor) {
+      // Strictly after the cursor row in (created_at desc, order_id desc) order
+      const { createdAt, orderId } = decodeCursor(cursor);
+      filter.$or = [
+        { created_at: { $lt: createdAt } },
+        { created_at: createdAt, order_id: { $lt: orderId } }
+      ];
+    }
+
+    const limitParam = searchParams.get('limit');
+    const limit = limitParam === null ? DEFAULT_LIMIT : Number(limitParam);
+    if (!Number.isInteger(limit) || limit < 1 || limit > MAX_LIMIT) {
+      throw new Error(`limit must be an integer between 1 and ${MAX_LIMIT}`);
+    }
+
+    let projection = DEFAULT_PROJECTION;
+    const fields = searchParams.get('fields');
+    if (fields) {
+      const requested = fields.split(',').filter(Boolean);
+      const unknown = requested.filter(field => !LISTABLE_FIELDS.has(field));
+      if (unknown.length > 0) {
+        throw new Error(`unknown fields: ${unknown.join(', ')}`);
+      }
+      projection = { _id: 0, created_at: 1, order_id: 1 };
+      for (const field of requested) {
+        projection[field] = 1;
+      }
+    }
+
+    return { filter, projection, limit };
+  } catch (error) {
+    return { error: error.message };
+  }
+}
+
+// Run one page of the listing: fetches limit + 1 rows to know whether more exist
+export async function listOrders(collection, { filter, projection, limit }) {
+  const rows = await collection.find(filter, { projection }).sort(ORDER_LIST_SORT).limit(limit + 1).toArray();
+
+  const hasMore = rows.length > limit;
+  const orders = hasMore ? rows.slice(0, limit) : rows;
+
+  return {
+    orders,
+    has_more: hasMore,
+    next_cursor: hasMore ? encodeCursor(orders[orders.length - 1]) : null
+  };
+}
@@ -0,0 +1,91 @@
+import { getCollection } from './mongodb.js';
+import { LRUCache } from './lruCache.js';
+import { publishOrderChange } from './orderEvents.js';
+import { isOrderFinished } from './orderProgress.js';
+
+// Order + reading lookups for GET /api/orders/{id} and /api/readings/{id}.
+// Once an order is finished (lib/orderProgress: completed, its PDF rendered or
+// expired) it rarely changes, so it is kept in an in-process LRU and repeat
+// views of a finished reading skip MongoDB. The PDF and Telegram delivery are
+// written by the job worker, possibly in another process, so readings still
+// waiting for either are never cached.
+//
+// invalidateOrderLookup only reaches this process's LRU, while finished orders
+// still change elsewhere: the worker's artifact cleanup detaches expired PDFs,
+// and other instances queue Telegram resends. Entries therefore expire after
+// READING_CACHE_TTL_MS (30 s), which bounds how long another process's write
+// can go unseen.
+
+const CACHE_TTL_MS = Number(process.env.READING_CACHE_TTL_MS) || 30 * 1000;
+
+let completedLookups = global.completedLookups;
+
+if (!completedLookups) {
+  completedLookups = global.completedLookups = new LRUCache(Number(process.env.READING_CACHE_SIZE) || 1000);
+}
+
+// The cached lookup for an order_id, or undefined when absent or past its TTL
+function cachedLookup(orderId) {
+  const entry = completedLookups.get(orderId);
+  if (!entry) {
+    return undefined;
+  }
+  if (Date.now() - entry.cachedAt > CACHE_TTL_MS) {
+    completedLookups.delete(orderId);
+    return undefined;
+  }
+  return entry.lookup;
+}
+
+// { order, reading } for an order_id in one round trip, or null when the order doesn't exist
+export async function findOrderWithReading(orderId) {
+  const cached = cachedLookup(orderId);
+  if (cached) {
+    return cached;
+  }
+
+  const ordersCollection = await getCollection('orders');
+  const [order] = await ordersCollection.aggregate([
+    { $match: { order_id: orderId } },
+    { $limit: 1 },
+    {
+      $lookup: {
+        from: 'readings',
+        localField: 'order_id',
+        foreignField: 'order_id',
+        as: 'readings'
+      }
+    }
+  ]).toArray();
+
+  if (!order) {
+    return null;
+  }
+
+  const { readings, ...orderFields } = order;
+  const lookup = { order: orderFields, reading: readings[0] || null };
+
+  if (isOrderFinished(lookup.order, lookup.reading)) {
+    completedLookups.set(orderId, { lookup, cachedAt: Date.now() });
+  }
+
+  return lookup;
+}
+
+// The reading for an order_id, served from the LRU when the order is finished
+export async function findReading(orderId) {
+  const cached = cachedLookup(orderId);
+  if (cached) {
+    return cached.reading;
+  }
+
+  const readingsCollection = await getCollection('readings');
+  return readingsCollection.findOne({ order_id: orderId });
+}
+
+// Drop a cached lookup after writing to its order or reading, and tell
+// /api/orders/{id}/events subscribers (lib/orderEvents)
+export function invalidateOrderLookup(orderId) {
+  completedLookups.delete(orderId);
+  publishOrderChange(orderId);
+}
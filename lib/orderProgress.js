@@ -0,0 +1,12 @@
+// When an order is finished, shared by the server (lib/orderLookup caches
+// finished lookups, lib/orderEvents ends event streams) and the reading page
+// (which stops listening), so they can't disagree. No server-only imports: the
+// page bundles this module.
+
+// Completed, its PDF rendered (or rendered and since expired) and no Telegram
+// send pending: nothing else will happen to the order on its own
+export function isOrderFinished(order, reading) {
+  return order.status === 'completed'
+    && !!(reading?.pdf_url || reading?.pdf_expired_at)
+    && reading.telegram_status !== 'queued';
+}
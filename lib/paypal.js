@@ -1,9 +1,21 @@
 import crypto from 'crypto';
 
-// PayPal API Base URLs
-const PAYPAL_API_BASE = process.env.PAYPAL_ENV === 'live' 
+// PayPal API Base URLs (PAYPAL_API_BASE points at a stand-in server for tests)
+const PAYPAL_API_BASE = process.env.PAYPAL_API_BASE || (process.env.PAYPAL_ENV === 'live'
   ? 'https://api-m.paypal.com'
-  : 'https://api-m.sandbox.paypal.com';
+  : 'https://api-m.sandbox.paypal.com');
+
+// Refresh the token this long before PayPal says it expires
+const TOKEN_REFRESH_MARGIN_MS = 5 * 60 * 1000;
+
+// The OAuth token is cached per process (on `global` so dev hot reloads keep it).
+// Node's fetch keeps connections to PayPal alive between calls, so a cached
+// token turns a checkout into a single request on a warm connection.
+let tokenCache = global.paypalToken;
+
+if (!tokenCache) {
+  tokenCache = global.paypalToken = { token: null, refreshAt: 0, refreshing: null };
+}
 
 // Check if PayPal is configured
 export function isPayPalConfigured() {
@@ -13,12 +25,7 @@ export function isPayPalConfigured() {
          clientSecret && clientSecret !== '<to be added later>';
 }
 
-// Get PayPal access token
-export async function getPayPalAccessToken() {
-  if (!isPayPalConfigured()) {
-    throw new Error('PayPal not configured');
-  }
-
+async function requestAccessToken() {
   const clientId = process.env.PAYPAL_CLIENT_ID;
   const clientSecret = process.env.PAYPAL_CLIENT_SECRET;
   
@@ -34,13 +41,69 @@ export async function getPayPalAccessToken() {
   });
   
   if (!response.ok) {
+    // Drain the body so the connection can be reused
+    await response.text();
     throw new Error('Failed to get PayPal access token');
   }
   
   const data = await response.json();
+  const lifetimeMs = (Number(data.expires_in) || 0) * 1000;
+  // Short-lived tokens are refreshed at half their lifetime instead
+  const margin = Math.min(TOKEN_REFRESH_MARGIN_MS, lifetimeMs / 2);
+  
+  tokenCache.token = data.access_token;
+  tokenCache.refreshAt = Date.now() + lifetimeMs - margin;
   return data.access_token;
 }
 
+// Get PayPal access token, cached until shortly before it expires. Concurrent
+// callers during a refresh share the same token request.
+export async function getPayPalAccessToken() {
+  if (!isPayPalConfigured()) {
+    throw new Error('PayPal not configured');
+  }
+
+  if (tokenCache.token && Date.now() < tokenCache.refreshAt) {
+    return tokenCache.token;
+  }
+  
+  if (!tokenCache.refreshing) {
+    tokenCache.refreshing = requestAccessToken().finally(() => {
+      tokenCache.refreshing = null;
+    });
+  }
+  return tokenCache.refreshing;
+}
+
+// Forget the cached token (PayPal rejected it, or credentials changed)
+export function clearPayPalAccessToken() {
+  tokenCache.token = null;
+  tokenCache.refreshAt = 0;
+}
+
+// Call the PayPal API with the cached token; a 401 means the token was revoked
+// or expired early, so it is refreshed and the call retried once
+async function paypalFetch(path, options) {
+  for (let attempt = 0; ; attempt++) {
+    const accessToken = await getPayPalAccessToken();
+    const response = await fetch(`${PAYPAL_API_BASE}${path}`, {
+      ...options,
+      headers: {
+        'Content-Type': 'application/json',
+        'Authorization': `Bearer ${accessToken}`,
+      },
+    });
+    
+    if (response.status !== 401 || attempt > 0) {
+      return response;
+    }
+    await response.text();
+    if (tokenCache.token === accessToken) {
+      clearPayPalAccessToken();
+    }
+  }
+}
+
 // Create PayPal order
 export async function createPayPalOrder(orderData) {
   if (!isPayPalConfigured()) {
@@ -56,14 +119,8 @@ export async function createPayPalOrder(orderData) {
     };
   }
 
-  const accessToken = await getPayPalAccessToken();
-  
-  const response = await fetch(`${PAYPAL_API_BASE}/v2/checkout/orders`, {
+  const response = await paypalFetch('/v2/checkout/orders', {
     method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      'Authorization': `Bearer ${accessToken}`,
-    },
     body: JSON.stringify({
       intent: 'CAPTURE',
       purchase_units: [{
@@ -112,14 +169,8 @@ export async function capturePayPalOrder(orderId) {
     };
   }
 
-  const accessToken = await getPayPalAccessToken();
-  
-  const response = await fetch(`${PAYPAL_API_BASE}/v2/checkout/orders/${orderId}/capture`, {
+  const response = await paypalFetch(`/v2/checkout/orders/${orderId}/capture`, {
     method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      'Authorization': `Bearer ${accessToken}`,
-    },
   });
   
   if (!response.ok) {
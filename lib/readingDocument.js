@@ -0,0 +1,175 @@
+import { Readable } from 'stream';
+
+// The reading document: the HTML page printed to PDF (lib/pdfGenerator) and
+// served at /api/readings/{id}/document.
+//
+// The shell (head, stylesheet, disclaimer) is built once at load. Per-card,
+// per-hexagram and per-animal fragments only depend on the content the reading
+// was drawn from, so for readings tagged with a content_version they are cached
+// and shared between readings, as in lib/telegramMessages. The document can be
+// rendered to a string or streamed chunk by chunk into an HTTP response or the
+// artifact store.
+
+const HTML_SPECIAL = /[&<>"']/g;
+const HAS_HTML_SPECIAL = /[&<>"']/;
+const HTML_ENTITIES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+
+// Rendered fragments per content version; see lib/telegramMessages
+const MAX_CACHED_VERSIONS = 4;
+
+const dateFormat = new Intl.DateTimeFormat('es-ES', { year: 'numeric', month: 'long', day: 'numeric' });
+
+let fragmentCache = global.readingDocumentFragments;
+
+if (!fragmentCache) {
+  fragmentCache = global.readingDocumentFragments = new Map();
+}
+
+function fragmentsFor(contentVersion) {
+  let fragments = fragmentCache.get(contentVersion);
+  if (!fragments) {
+    if (fragmentCache.size >= MAX_CACHED_VERSIONS) {
+      fragmentCache.delete(fragmentCache.keys().next().value);
+    }
+    fragments = new Map();
+    fragmentCache.set(contentVersion, fragments);
+  }
+  return fragments;
+}
+
+export function escapeHTML(text) {
+  const value = String(text ?? '');
+  return HAS_HTML_SPECIAL.test(value) ? value.replace(HTML_SPECIAL, (char) => HTML_ENTITIES[char]) : value;
+}
+
+// Tagged template: literal parts are HTML, interpolated values are escaped
+export function html(strings, ...values) {
+  let out = strings[0];
+  for (let i = 0; i < values.length; i++) {
+    out += escapeHTML(values[i]) + strings[i + 1];
+  }
+  return out;
+}
+
+const STYLESHEET = `
+body { font-family: 'Georgia', serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; color: #333; }
+.header { text-align: center; border-bottom: 2px solid #8B4513; padding-bottom: 20px; margin-bottom: 30px; }
+.header h1 { color: #8B4513; font-size: 2.5em; margin: 0; }
+.date { color: #666; font-style: italic; }
+.card-interpretation, .animal-interpretation { margin: 20px 0; padding: 15px; border-left: 4px solid #8B4513; background: #f9f9f9; }
+.card-interpretation h3, .animal-interpretation h3 { color: #8B4513; margin-top: 0; }
+.disclaimer { margin-top: 40px; padding: 20px; background: #f0f0f0; border-radius: 5px; font-size: 0.9em; text-align: center; }
+.spiritual-note { margin-top: 30px; padding: 15px; background: #e8f5e8; border-radius: 5px; font-style: italic; text-align: center; }
+`;
+
+// The shell, split where per-reading values go
+const SHELL_START = '<!DOCTYPE html>\n<html lang="es">\n<head>\n<meta charset="UTF-8">\n'
+  + '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n<title>Lectura Pleyazul - ';
+const SHELL_HEADER = `</title>\n<style>${STYLESHEET}</style>\n</head>\n<body>\n`
+  + '<div class="header">\n<h1>🔮 Pleyazul Oráculos</h1>\n<p class="date">Lectura realizada el ';
+const SHELL_END = '<div class="disclaimer">\n'
+  + '<p><strong>Disclaimer:</strong> Este servicio es de carácter espiritual y recreativo. No sustituye el asesoramiento médico, legal o profesional.</p>\n'
+  + '<p>Honramos las tradiciones Dakota, Lakota y Nakota en el uso respetuoso de la Rueda Medicinal.</p>\n'
+  + '</div>\n</body>\n</html>\n';
+
+const renderCard = (card) => html`<div class="card-interpretation">
+<h3>${card.position}</h3>
+<h4>${card.name}${card.reversed ? ' (Invertida)' : ''}</h4>
+<p><strong>Significado:</strong> ${card.interpretation}</p>
+<p><strong>Consejo:</strong> ${card.advice}</p>
+</div>
+`;
+
+const renderHexagram = (hexagram) => html`<h3>Hexagrama ${hexagram.hex}: ${hexagram.nombre}</h3>
+<div class="hexagram-section">
+<p><strong>Palabras Clave:</strong> ${hexagram.palabras_clave.join(', ')}</p>
+<p><strong>Juicio:</strong> ${hexagram.juicio}</p>
+<p><strong>Imagen:</strong> ${hexagram.imagen}</p>
+<p><strong>Consejo:</strong> ${hexagram.consejo}</p>
+</div>
+`;
+
+const renderAnimal = (animal) => html`<div class="animal-interpretation">
+<h3>${animal.position}</h3>
+<h4>${animal.animal} - ${animal.arquetipo}</h4>
+<p><strong>Luz:</strong> ${animal.luz}</p>
+<p><strong>Sombra:</strong> ${animal.sombra}</p>
+<p><strong>Medicina:</strong> ${animal.medicina}</p>
+<p><strong>Afirmación:</strong> ${animal.afirmacion}</p>
+</div>
+`;
+
+// Render a fragment, through the cache when the reading knows its content version
+function fragment(fragments, key, render, item) {
+  if (!fragments) {
+    return render(item);
+  }
+  let rendered = fragments.get(key);
+  if (rendered === undefined) {
+    rendered = render(item);
+    fragments.set(key, rendered);
+  }
+  return rendered;
+}
+
+// The document in order, as a few large chunks: shell, header, one per
+// card/hexagram/animal, closing note. `date` defaults to now.
+export function* readingDocumentChunks(reading, order, { date = new Date() } = {}) {
+  const fragments = reading.content_version ? fragmentsFor(reading.content_version) : null;
+
+  yield SHELL_START + escapeHTML(order.order_id) + SHELL_HEADER
+    + html`${dateFormat.format(date)}</p>\n<p>Para: ${order.email}</p>\n</div>\n<div class="reading-content">\n`;
+
+  if (reading.type === 'tarot') {
+    const positions = reading.spread?.posiciones ? reading.spread.posiciones.join(' - ') : 'Lectura Personal';
+    yield html`<h2>Lectura de Tarot</h2>\n<p class="spread-name">Tirada: ${positions}</p>\n<div class="cards-section">\n`;
+    for (const card of reading.cards) {
+      yield fragment(fragments, `t${card.reversed ? 1 : 0}${card.position}\u0000${card.name}`, renderCard, card);
+    }
+    yield '</div>\n';
+  } else if (reading.type === 'iching') {
+    yield '<h2>Consulta del I Ching</h2>\n';
+    yield fragment(fragments, `i${reading.hexagram.hex}`, renderHexagram, reading.hexagram);
+  } else if (reading.type === 'rueda') {
+    yield '<h2>Medicina de la Rueda Sagrada</h2>\n<div class="animals-section">\n';
+    for (const animal of reading.animals) {
+      yield fragment(fragments, `r${animal.position}\u0000${animal.animal}`, renderAnimal, animal);
+    }
+    yield '</div>\n';
+  }
+
+  yield html`</div>\n<div class="spiritual-note">\n<p><strong>Mensaje Espiritual:</strong> ${reading.message}</p>\n</div>\n` + SHELL_END;
+}
+
+// The whole document as a string (Puppeteer's setContent takes one)
+export function renderReadingDocument(reading, order, options) {
+  let out = '';
+  for (const chunk of readingDocumentChunks(reading, order, options)) {
+    out += chunk;
+  }
+  return out;
+}
+
+// The document as a Node byte stream, for an HTTP response (Readable.toWeb)
+// or writeArtifact (lib/artifactStore). Chunks are coalesced up to
+// STREAM_CHUNK_SIZE characters: every stream chunk costs a trip through the
+// event loop, and a typical document fits in one.
+const STREAM_CHUNK_SIZE = 16 * 1024;
+
+function* encodeChunks(chunks) {
+  let pending = '';
+  for (const chunk of chunks) {
+    pending += chunk;
+    if (pending.length >= STREAM_CHUNK_SIZE) {
+      yield Buffer.from(pending);
+      pending = '';
+    }
+  }
+  if (pending) {
+    yield Buffer.from(pending);
+  }
+}
+
+export function streamReadingDocument(reading, order, options) {
+  return Readable.from(encodeChunks(readingDocumentChunks(reading, order, options)));
+}
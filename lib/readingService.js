@@ -0,0 +1,137 @@
+import { v4 as uuidv4 } from 'uuid';
+import { getCollection } from './mongodb.js';
+import { JOB_TYPES, enqueueJob } from './jobQueue.js';
+import contentService from './contentService.js';
+import { invalidateOrderLookup } from './orderLookup.js';
+
+// The order -> reading lifecycle, shared by the API routes, the payment paths
+// (PayPal webhook, test-mode mock payment) and the job worker, so none of them
+// has to call back into the HTTP API.
+//
+// There is exactly one reading per order: writes are upserts keyed on order_id
+// (unique index, see lib/mongodb) that only insert when no reading exists, so
+// concurrent generate calls, the webhook job and batch reconciliation all end up
+// with the same document.
+
+const DUPLICATE_KEY = 11000;
+
+function newReadingFields(result) {
+  return {
+    _id: uuidv4(),
+    result_json: result,
+    created_at: new Date(),
+    delivered_at: null,
+    pdf_url: null
+  };
+}
+
+// Store the reading for an order unless one exists. Resolves to
+// { reading, created } where reading is whichever document won.
+export async function saveReading(orderId, result) {
+  const readingsCollection = await getCollection('readings');
+
+  try {
+    const { value, lastErrorObject } = await readingsCollection.findOneAndUpdate(
+      { order_id: orderId },
+      { $setOnInsert: newReadingFields(result) },
+      { upsert: true, returnDocument: 'after', includeResultMetadata: true }
+    );
+    return { reading: value, created: !lastErrorObject?.updatedExisting };
+  } catch (error) {
+    // Two upserts raced on the unique index; the other one inserted
+    if (error.code !== DUPLICATE_KEY) {
+      throw error;
+    }
+    return { reading: await readingsCollection.findOne({ order_id: orderId }), created: false };
+  }
+}
+
+// Bulk form of saveReading for [{ order_id, result }]. Resolves to a Map of
+// order_id -> 'created' | 'exists' | { error }.
+export async function saveReadings(entries) {
+  const outcomes = new Map();
+  if (entries.length === 0) {
+    return outcomes;
+  }
+
+  const readingsCollection = await getCollection('readings');
+  let bulkResult;
+  let writeErrors = [];
+
+  try {
+    bulkResult = await readingsCollection.bulkWrite(entries.map(({ order_id, result }) => ({
+      updateOne: {
+        filter: { order_id },
+        update: { $setOnInsert: newReadingFields(result) },
+        upsert: true
+      }
+    })), { ordered: false });
+  } catch (error) {
+    if (!error.writeErrors) {
+      throw error;
+    }
+    // Unordered writes keep going past failures; the rest still applied
+    bulkResult = error.result;
+    writeErrors = [].concat(error.writeErrors);
+  }
+
+  const upserted = new Set(Object.keys(bulkResult.upsertedIds || {}).map(Number));
+  const failed = new Map(writeErrors.map(writeError => [writeError.index, writeError]));
+
+  entries.forEach(({ order_id }, index) => {
+    if (failed.has(index)) {
+      const writeError = failed.get(index);
+      outcomes.set(order_id, writeError.code === DUPLICATE_KEY ? 'exists' : { error: writeError.errmsg });
+    } else {
+      outcomes.set(order_id, upserted.has(index) ? 'created' : 'exists');
+    }
+  });
+
+  return outcomes;
+}
+
+// Enqueue the PDF render for an order's reading (one waiting job per order)
+export function enqueueRenderPdf(orderId) {
+  return enqueueJob(JOB_TYPES.RENDER_PDF, { order_id: orderId }, { key: `${JOB_TYPES.RENDER_PDF}:${orderId}` });
+}
+
+// Enqueue reading generation for a paid order (one waiting job per order)
+export function enqueueGenerateReading(orderId) {
+  return enqueueJob(JOB_TYPES.GENERATE_READING, { order_id: orderId }, { key: `${JOB_TYPES.GENERATE_READING}:${orderId}` });
+}
+
+// Record a captured payment and queue the reading. Retries (PayPal resends
+// webhooks) keep the first paid_at and never move a completed order back.
+export async function recordPayment(orderId) {
+  const ordersCollection = await getCollection('orders');
+  await ordersCollection.updateOne(
+    { order_id: orderId, status: { $nin: ['paid', 'completed'] } },
+    { $set: { status: 'paid', paid_at: new Date() } }
+  );
+  invalidateOrderLookup(orderId);
+  await enqueueGenerateReading(orderId);
+}
+
+// Generate and store the reading for an order unless it has one, then complete
+// the order and queue its PDF. Resolves to { reading, created }.
+export async function generateReadingForOrder(order) {
+  const readingsCollection = await getCollection('readings');
+  const existing = await readingsCollection.findOne({ order_id: order.order_id });
+
+  const saved = existing
+    ? { reading: existing, created: false }
+    : await saveReading(order.order_id, contentService.generateReading(order.order_id, order.email, order.spread_id));
+
+  // Also finishes a run that stopped between saving the reading and completing the order
+  if (saved.created || order.status !== 'completed') {
+    const ordersCollection = await getCollection('orders');
+    await ordersCollection.updateOne(
+      { order_id: order.order_id, status: { $ne: 'completed' } },
+      { $set: { status: 'completed', completed_at: new Date() } }
+    );
+    invalidateOrderLookup(order.order_id);
+    await enqueueRenderPdf(order.order_id);
+  }
+
+  return saved;
+}
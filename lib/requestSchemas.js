@@ -0,0 +1,79 @@
+import { compileSchema } from './schemaValidator.js';
+import { CONTENT_TYPES } from './contentService.js';
+
+// Request body schemas, compiled once at module load so malformed requests are
+// rejected before any database work
+
+const email = { type: 'string', format: 'email', maxLength: 254 };
+const spreadId = { type: 'string', minLength: 1, maxLength: 64 };
+const orderId = { type: 'string', minLength: 1, maxLength: 128 };
+
+// Maximum order IDs accepted by readings/generate-batch
+export const MAX_BATCH_SIZE = 500;
+
+export const validateCheckoutBody = compileSchema({
+  type: 'object',
+  required: ['email', 'spread_id'],
+  properties: {
+    email,
+    spread_id: spreadId,
+    custom_question: { type: 'string', maxLength: 1000 }
+  }
+});
+
+export const validateDemoReadingBody = compileSchema({
+  type: 'object',
+  required: ['email', 'spread_id'],
+  properties: {
+    email,
+    spread_id: spreadId
+  }
+});
+
+// { order_id } bodies: readings/generate and paypal/mock-payment
+const orderIdBody = {
+  type: 'object',
+  required: ['order_id'],
+  properties: {
+    order_id: orderId
+  }
+};
+
+export const validateGenerateReadingBody = compileSchema(orderIdBody);
+
+export const validateMockPaymentBody = compileSchema(orderIdBody);
+
+export const validateGenerateReadingBatchBody = compileSchema({
+  type: 'object',
+  required: ['order_ids'],
+  properties: {
+    order_ids: { type: 'array', items: orderId, minItems: 1, maxItems: MAX_BATCH_SIZE }
+  }
+});
+
+// A chat's numeric id (negative for groups), as a number or string, or a @channel name
+export const validateSendReadingBody = compileSchema({
+  type: 'object',
+  required: ['order_id', 'chat_id'],
+  properties: {
+    order_id: orderId,
+    chat_id: { type: ['integer', 'string'], pattern: '^(-?\\d{1,20}|@\\w{5,32})$' }
+  }
+});
+
+export const validateTelegramResendBody = compileSchema({
+  type: 'object',
+  properties: {
+    order_ids: { type: 'array', items: orderId, minItems: 1, maxItems: 5000 },
+    failed_only: { type: 'boolean' },
+    since: { type: 'string', maxLength: 64 }
+  }
+});
+
+export const validateAdminContentBody = compileSchema({
+  type: 'object',
+  required: ['type', 'content'],
+  properties: {
+    type: { type: 'string', enum: CONTENT_TYPES }
+  }
+});
@@ -0,0 +1,122 @@
+import crypto from 'crypto';
+
+// Minimal S3 client (PUT/GET/HEAD/DELETE object) signed with AWS Signature V4,
+// for S3 and S3-compatible stores (MinIO, R2, the stand-in in standins/). Uses
+// path-style URLs, {endpoint}/{bucket}/{key}, which every implementation accepts.
+
+const EMPTY_SHA256 = crypto.createHash('sha256').update('').digest('hex');
+
+const sha256Hex = (data) => crypto.createHash('sha256').update(data).digest('hex');
+const hmac = (key, data) => crypto.createHmac('sha256', key).update(data).digest();
+
+// RFC 3986 encoding of each path segment, as SigV4 canonical URIs require
+function encodeKey(key) {
+  return key.split('/').map(segment => encodeURIComponent(segment)
+    .replace(/[!'()*]/g, char => `%${char.charCodeAt(0).toString(16).toUpperCase()}`)).join('/');
+}
+
+export function createS3Client({ endpoint, region = 'us-east-1', bucket, accessKeyId, secretAccessKey }) {
+  const base = new URL(endpoint);
+  let signingKey = null;
+  let signingDate = null;
+
+  function keyFor(dateStamp) {
+    if (signingDate !== dateStamp) {
+      const dateKey = hmac(`AWS4${secretAccessKey}`, dateStamp);
+      signingKey = hmac(hmac(hmac(dateKey, region), 's3'), 'aws4_request');
+      signingDate = dateStamp;
+    }
+    return signingKey;
+  }
+
+  // Signed fetch of one object. `payloadHash` is the body's SHA-256 (hex).
+  function request(method, key, { headers = {}, body, payloadHash = EMPTY_SHA256 } = {}) {
+    const path = `${base.pathname.replace(/\/$/, '')}/${bucket}/${encodeKey(key)}`;
+    const amzDate = new Date().toISOString().replace(/[:-]|\.\d{3}/g, '');
+    const dateStamp = amzDate.slice(0, 8);
+    const scope = `${dateStamp}/${region}/s3/aws4_request`;
+
+    const signed = {
+      host: base.host,
+      'x-amz-content-sha256': payloadHash,
+      'x-amz-date': amzDate
+    };
+    const signedHeaders = Object.keys(signed).join(';');
+    const canonicalRequest = [
+      method,
+      path,
+      '',
+      ...Object.entries(signed).map(([name, value]) => `${name}:${value}`),
+      '',
+      signedHeaders,
+      payloadHash
+    ].join('\n');
+    const stringToSign = ['AWS4-HMAC-SHA256', amzDate, scope, sha256Hex(canonicalRequest)].join('\n');
+    const signature = crypto.createHmac('sha256', keyFor(dateStamp)).update(stringToSign).digest('hex');
+
+    return fetch(`${base.origin}${path}`, {
+      method,
+      headers: {
+        ...headers,
+        'x-amz-content-sha256': payloadHash,
+        'x-amz-date': amzDate,
+        'Authorization': `AWS4-HMAC-SHA256 Credential=${accessKeyId}/${scope}, SignedHeaders=${signedHeaders}, Signature=${signature}`
+      },
+      body,
+      ...(body && typeof body.getReader === 'function' ? { duplex: 'half' } : {})
+    });
+  }
+
+  async function expectOk(response, action, key) {
+    if (!response.ok) {
+      const detail = await response.text();
+      throw new Error(`S3 ${action} ${key} failed: HTTP ${response.status} ${detail.slice(0, 200)}`);
+    }
+    return response;
+  }
+
+  return {
+    // body: Buffer or web ReadableStream of exactly contentLength bytes hashing to sha256
+    async putObject(key, body, { contentLength, contentType, sha256 }) {
+      const response = await request('PUT', key, {
+        headers: { 'Content-Length': String(contentLength), 'Content-Type': contentType },
+        body,
+        payloadHash: sha256
+      });
+      await expectOk(response, 'PUT', key);
+      await response.arrayBuffer();
+    },
+
+    // Resolves to the fetch Response (200 or 206), or null when the key doesn't exist
+    async getObject(key, { range } = {}) {
+      const headers = range ? { Range: `bytes=${range.start}-${range.end}` } : {};
+      const response = await request('GET', key, { headers });
+      if (response.status === 404) {
+        await response.arrayBuffer();
+        return null;
+      }
+      return expectOk(response, 'GET', key);
+    },
+
+    async headObject(key) {
+      const response = await request('HEAD', key);
+      if (response.status === 404) {
+        return null;
+      }
+      await expectOk(response, 'HEAD', key);
+      return {
+        size: Number(response.headers.get('content-length')),
+        contentType: response.headers.get('content-type')
+      };
+    },
+
+    async deleteObject(key) {
+      const response = await request('DELETE', key);
+      // Deleting a missing key succeeds on S3 too
+      if (response.status !== 404) {
+        await expectOk(response, 'DELETE', key);
+      }
+      await response.arrayBuffer();
+    }
+  };
+}
@@ -0,0 +1,136 @@
+// JSON Schema validators compiled once into plain closures.
+// Supports the keywords used by content/schema and lib/requestSchemas: type (one
+// or a list), enum, required, properties, additionalProperties, items, minItems,
+// maxItems, minimum, maximum, minLength, maxLength, pattern and format: email.
+
+const EMAIL_PATTERN = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+
+const TYPE_CHECKS = {
+  array: (value) => Array.isArray(value),
+  object: (value) => value !== null && typeof value === 'object' && !Array.isArray(value),
+  string: (value) => typeof value === 'string',
+  integer: (value) => Number.isInteger(value),
+  number: (value) => typeof value === 'number' && Number.isFinite(value),
+  boolean: (value) => typeof value === 'boolean',
+  null: (value) => value === null
+};
+
+function describe(value) {
+  if (value === null) return 'null';
+  if (Array.isArray(value)) return 'array';
+  if (Number.isInteger(value)) return 'integer';
+  return typeof value;
+}
+
+// Build a checker (value, path, errors) => void for one schema node
+function compileNode(schema) {
+  const checks = [];
+
+  if (schema.type) {
+    // A list of types accepts a value of any of them
+    const types = [].concat(schema.type);
+    const typeChecks = types.map((type) => {
+      if (!TYPE_CHECKS[type]) {
+        throw new Error(`Unsupported schema type: ${type}`);
+      }
+      return TYPE_CHECKS[type];
+    });
+    const expected = types.join(' or ');
+    // A wrong type makes the remaining keywords meaningless, so it short-circuits
+    checks.push((value, path, errors) => {
+      if (!typeChecks.some((isType) => isType(value))) {
+        errors.push({ path, message: `expected ${expected}, got ${describe(value)}` });
+        return false;
+      }
+      return true;
+    });
+  }
+
+  if (schema.enum) {
+    const allowed = new Set(schema.enum);
+    const message = `must be one of ${schema.enum.join(', ')}`;
+    checks.push((value, path, errors) => {
+      if (!allowed.has(value)) errors.push({ path, message });
+    });
+  }
+
+  if (schema.minimum !== undefined || schema.maximum !== undefined) {
+    const { minimum, maximum } = schema;
+    checks.push((value, path, errors) => {
+      if (typeof value !== 'number') return;
+      if (minimum !== undefined && value < minimum) errors.push({ path, message: `must be >= ${minimum}` });
+      if (maximum !== undefined && value > maximum) errors.push({ path, message: `must be <= ${maximum}` });
+    });
+  }
+
+  if (schema.minLength !== undefined || schema.maxLength !== undefined || schema.pattern || schema.format === 'email') {
+    const { minLength, maxLength } = schema;
+    const pattern = schema.pattern ? new RegExp(schema.pattern) : null;
+    const email = schema.format === 'email';
+    checks.push((value, path, errors) => {
+      if (typeof value !== 'string') return;
+      if (minLength !== undefined && value.length < minLength) errors.push({ path, message: `must have at least ${minLength} characters` });
+      if (maxLength !== undefined && value.length > maxLength) errors.push({ path, message: `must have at most ${maxLength} characters` });
+      if (pattern && !pattern.test(value)) errors.push({ path, message: `must match ${schema.pattern}` });
+      if (email && !EMAIL_PATTERN.test(value)) errors.push({ path, message: 'must be an email address' });
+    });
+  }
+
+  if (schema.items || schema.minItems !== undefined || schema.maxItems !== undefined) {
+    const item = schema.items ? compileNode(schema.items) : null;
+    const { minItems, maxItems } = schema;
+    checks.push((value, path, errors) => {
+      if (!Array.isArray(value)) return;
+      if (minItems !== undefined && value.length < minItems) errors.push({ path, message: `must have at least ${minItems} items` });
+      if (maxItems !== undefined && value.length > maxItems) errors.push({ path, message: `must have at most ${maxItems} items` });
+      if (item) {
+        for (let i = 0; i < value.length; i++) item(value[i], `${path}[${i}]`, errors);
+      }
+    });
+  }
+
+  if (schema.required || schema.properties || schema.additionalProperties !== undefined) {
+    const required = schema.required || [];
+    const properties = new Map(Object.entries(schema.properties || {}).map(([key, node]) => [key, compileNode(node)]));
+    const rejectAdditional = schema.additionalProperties === false;
+    const additional = typeof schema.additionalProperties === 'object' ? compileNode(schema.additionalProperties) : null;
+    checks.push((value, path, errors) => {
+      if (!TYPE_CHECKS.object(value)) return;
+      for (const key of required) {
+        if (value[key] === undefined) errors.push({ path, message: `missing required property ${key}` });
+      }
+      for (const key in value) {
+        const property = properties.get(key);
+        if (property) property(value[key], `${path}.${key}`, errors);
+        else if (additional) additional(value[key], `${path}.${key}`, errors);
+        else if (rejectAdditional) errors.push({ path, message: `unexpected property ${key}` });
+      }
+    });
+  }
+
+  return (value, path, errors) => {
+    for (const check of checks) {
+      if (check(value, path, errors) === false) return;
+    }
+  };
+}
+
+// Compile a schema into validate(value) => errors ({ path, message }), empty when valid
+export function compileSchema(schema) {
+  const root = compileNode(schema);
+  return (value) => {
+    const errors = [];
+    root(value, '$', errors);
+    return errors;
+  };
+}
+
+const compiled = new WeakMap();
+
+// One-off validation; compiles the schema on first use and reuses it afterwards
+export function validateSchema(schema, value) {
+  if (!compiled.has(schema)) {
+    compiled.set(schema, compileSchema(schema));
+  }
+  return compiled.get(schema)(value);
+}
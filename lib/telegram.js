@@ -1,5 +1,7 @@
 import TelegramBot from 'node-telegram-bot-api';
 
+export { escapeMarkdownV2, formatReadingForTelegram } from './telegramMessages.js';
+
 // Singleton pattern to avoid multiple instances
 let botInstance = null;
 
@@ -14,25 +16,14 @@ export function getTelegramBot() {
         return null;
       }
       
-      botInstance = new TelegramBot(token);
+      // TELEGRAM_API_BASE points at a stand-in server for tests
+      botInstance = new TelegramBot(token, { baseApiUrl: process.env.TELEGRAM_API_BASE || 'https://api.telegram.org' });
     }
   }
   
   return botInstance;
 }
 
-// Helper function to escape special characters for MarkdownV2
-export function escapeMarkdownV2(text) {
-  const specialChars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!'];
-  let escapedText = text;
-  
-  for (const char of specialChars) {
-    escapedText = escapedText.replace(new RegExp('\\' + char, 'g'), '\\' + char);
-  }
-  
-  return escapedText;
-}
-
 // Send a message to a specific chat
 export async function sendTelegramMessage(chatId, message, parseMode = '') {
   const bot = getTelegramBot();
@@ -42,22 +33,25 @@ export async function sendTelegramMessage(chatId, message, parseMode = '') {
     return { success: false, error: 'Bot not configured' };
   }
   
+  // MarkdownV2 messages arrive already formatted (see lib/telegramMessages)
   const options = {};
   if (parseMode) {
     options.parse_mode = parseMode;
-    
-    // Escape special characters for MarkdownV2
-    if (parseMode === 'MarkdownV2') {
-      message = escapeMarkdownV2(message);
-    }
   }
   
   try {
     const result = await bot.sendMessage(chatId, message, options);
     return { success: true, messageId: result.message_id };
   } catch (error) {
-    console.error('Error sending Telegram message:', error);
-    return { success: false, error: error.message };
+    console.error('Error sending Telegram message:', error.message);
+    // Telegram API errors carry the HTTP status and, for 429s, how long to wait
+    const response = error.response;
+    return {
+      success: false,
+      error: error.message,
+      status: response?.statusCode,
+      retryAfter: response?.body?.parameters?.retry_after
+    };
   }
 }
 
@@ -65,4 +59,4 @@ export async function sendTelegramMessage(chatId, message, parseMode = '') {
 export function isTelegramConfigured() {
   const token = process.env.TELEGRAM_BOT_TOKEN;
   return token && token !== '<to be added later>';
-}
\ No newline at end of file
+}
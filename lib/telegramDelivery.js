@@ -0,0 +1,203 @@
+import { v4 as uuidv4 } from 'uuid';
+import { getCollection } from './mongodb.js';
+import { JOB_TYPES, enqueueJob, enqueueJobs } from './jobQueue.js';
+import { LRUCache } from './lruCache.js';
+import { TokenBucket } from './tokenBucket.js';
+import { isTelegramConfigured, sendTelegramMessage } from './telegram.js';
+import { formatReadingForTelegram } from './telegramMessages.js';
+import { invalidateOrderLookup } from './orderLookup.js';
+
+// Reading delivery to Telegram through the job queue.
+//
+// Telegram allows about 30 messages/second per bot and 1/second per chat, and
+// answers 429 with retry_after beyond that. Every send first takes a token from
+// a global bucket and from the chat's bucket; when the wait would be long the job
+// is deferred instead of holding a worker, and a 429 pauses the chat for
+// retry_after. The buckets are per process, so with several workers split
+// TELEGRAM_GLOBAL_RATE between them.
+//
+// A reading's telegram_status is queued -> sent | failed. Queueing only succeeds
+// when the reading isn't queued already, so repeated clicks and overlapping bulk
+// resends send once; a queued mark older than STALE_QUEUED_MS (a lost job) can be
+// queued again.
+
+const GLOBAL_RATE = Number(process.env.TELEGRAM_GLOBAL_RATE) || 25;
+const CHAT_RATE = Number(process.env.TELEGRAM_CHAT_RATE) || 1;
+// Waits up to this long are slept through inside the job; longer ones defer it
+const MAX_INLINE_WAIT_MS = 2000;
+const STALE_QUEUED_MS = 60 * 60 * 1000;
+const MAX_ATTEMPTS = 8;
+
+// Largest bulk resend accepted by queueTelegramResend
+export const MAX_RESEND_BATCH = 5000;
+
+let limits = global.telegramLimits;
+
+if (!limits) {
+  limits = global.telegramLimits = { global: new TokenBucket(GLOBAL_RATE), chats: new LRUCache(10000) };
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+function chatBucket(chatId) {
+  const key = String(chatId);
+  let bucket = limits.chats.get(key);
+  if (!bucket) {
+    bucket = new TokenBucket(CHAT_RATE, 1);
+    limits.chats.set(key, bucket);
+  }
+  return bucket;
+}
+
+function deferral(message, delayMs) {
+  const error = new Error(message);
+  error.deferMs = delayMs;
+  return error;
+}
+
+// Wait for a send slot on both buckets, or throw a deferral when it is far off
+async function acquireSendSlot(chatId) {
+  const chat = chatBucket(chatId);
+  for (;;) {
+    const delayMs = Math.max(limits.global.delayMs(), chat.delayMs());
+    if (delayMs === 0) {
+      limits.global.take();
+      chat.take();
+      return;
+    }
+    if (delayMs > MAX_INLINE_WAIT_MS) {
+      throw deferral(`Rate limited for chat ${chatId}`, delayMs);
+    }
+    await sleep(delayMs);
+  }
+}
+
+function requeueable(now) {
+  return {
+    $or: [
+      { telegram_status: { $ne: 'queued' } },
+      { telegram_queued_at: { $lt: new Date(now.getTime() - STALE_QUEUED_MS) } }
+    ]
+  };
+}
+
+// Queue one reading for delivery to chatId. Resolves to false when it is
+// already queued.
+export async function queueTelegramDelivery(orderId, chatId) {
+  const readingsCollection = await getCollection('readings');
+  const now = new Date();
+
+  const { modifiedCount } = await readingsCollection.updateOne(
+    { order_id: orderId, ...requeueable(now) },
+    { $set: { telegram_status: 'queued', telegram_chat_id: chatId, telegram_queued_at: now, telegram_error: null } }
+  );
+  if (modifiedCount === 0) {
+    return false;
+  }
+
+  await enqueueJob(JOB_TYPES.SEND_TELEGRAM, { order_id: orderId, chat_id: chatId }, { maxAttempts: MAX_ATTEMPTS });
+  invalidateOrderLookup(orderId);
+  return true;
+}
+
+// Queue readings that have been sent to Telegram before (they have a chat id)
+// for delivery again, e.g. after an outage. Narrowed by orderIds, failedOnly
+// (only failed deliveries) and since (readings created at or after it).
+// Resolves to { matched, queued }.
+export async function queueTelegramResend({ orderIds, failedOnly = false, since } = {}) {
+  const readingsCollection = await getCollection('readings');
+  const now = new Date();
+
+  const filter = { telegram_chat_id: { $ne: null }, ...requeueable(now) };
+  if (orderIds) {
+    filter.order_id = { $in: orderIds };
+  }
+  if (failedOnly) {
+    filter.telegram_status = 'failed';
+  }
+  if (since) {
+    filter.created_at = { $gte: since };
+  }
+
+  const candidates = await readingsCollection
+    .find(filter, { projection: { _id: 0, order_id: 1 } })
+    .limit(MAX_RESEND_BATCH)
+    .toArray();
+  if (candidates.length === 0) {
+    return { matched: 0, queued: 0 };
+  }
+
+  // Mark them with this batch's id, then read back the ones this call actually
+  // claimed: a concurrent send or resend may have queued some in between
+  const batchId = uuidv4();
+  const candidateIds = candidates.map(candidate => candidate.order_id);
+  await readingsCollection.updateMany(
+    { order_id: { $in: candidateIds }, ...requeueable(now) },
+    { $set: { telegram_status: 'queued', telegram_queued_at: now, telegram_batch: batchId, telegram_error: null } }
+  );
+  const claimed = await readingsCollection
+    .find({ order_id: { $in: candidateIds }, telegram_batch: batchId }, { projection: { _id: 0, order_id: 1, telegram_chat_id: 1 } })
+    .toArray();
+
+  await enqueueJobs(JOB_TYPES.SEND_TELEGRAM, claimed.map(reading => ({
+    payload: { order_id: reading.order_id, chat_id: reading.telegram_chat_id }
+  })), { maxAttempts: MAX_ATTEMPTS });
+  claimed.forEach(reading => invalidateOrderLookup(reading.order_id));
+
+  return { matched: candidates.length, queued: claimed.length };
+}
+
+async function markFailed(readingsCollection, orderId, message) {
+  await readingsCollection.updateOne(
+    { order_id: orderId, telegram_status: 'queued' },
+    { $set: { telegram_status: 'failed', telegram_error: message } }
+  );
+  invalidateOrderLookup(orderId);
+}
+
+// Job handler for JOB_TYPES.SEND_TELEGRAM
+export async function deliverReading({ order_id, chat_id }, job) {
+  const readingsCollection = await getCollection('readings');
+  const reading = await readingsCollection.findOne({ order_id }, { projection: { result_json: 1 } });
+
+  if (!reading || !isTelegramConfigured()) {
+    const error = new Error(reading ? 'Telegram bot not configured' : `Reading for order ${order_id} not found`);
+    error.permanent = true;
+    await markFailed(readingsCollection, order_id, error.message);
+    throw error;
+  }
+
+  await acquireSendSlot(chat_id);
+  const result = await sendTelegramMessage(chat_id, formatReadingForTelegram(reading.result_json, order_id), 'MarkdownV2');
+
+  if (result.success) {
+    await readingsCollection.updateOne(
+      { order_id },
+      {
+        $set: {
+          delivered_at: new Date(),
+          telegram_sent: true,
+          telegram_status: 'sent',
+          telegram_message_id: result.messageId,
+          telegram_error: null
+        }
+      }
+    );
+    invalidateOrderLookup(order_id);
+    return;
+  }
+
+  if (result.retryAfter) {
+    const retryAfterMs = result.retryAfter * 1000;
+    chatBucket(chat_id).pause(retryAfterMs);
+    throw deferral(`Telegram asked to retry after ${result.retryAfter}s`, retryAfterMs);
+  }
+
+  // Other 4xx (bad request, bot blocked, chat not found) won't succeed on retry
+  const error = new Error(result.error);
+  error.permanent = result.status >= 400 && result.status < 500;
+  if (error.permanent || job.attempts >= job.max_attempts) {
+    await markFailed(readingsCollection, order_id, result.error);
+  }
+  throw error;
+}
@@ -0,0 +1,95 @@
+// Telegram MarkdownV2 message rendering.
+//
+// Templates are written in MarkdownV2 and only interpolated values are escaped,
+// so the template's own *bold* survives. Escaping is one pass of a precompiled
+// character class. Per-card and per-animal fragments only depend on the content
+// the reading was drawn from, so for readings tagged with a content_version they
+// are cached and shared between readings.
+
+// Every character MarkdownV2 reserves, plus the backslash itself
+const MARKDOWN_V2_SPECIAL = /[_*[\]()~`>#+\-=|{}.!\\]/g;
+const HAS_MARKDOWN_V2_SPECIAL = /[_*[\]()~`>#+\-=|{}.!\\]/;
+
+// Rendered fragments per content version. The fragments of one version are
+// bounded by the content itself (cards x orientations x positions), so only the
+// number of versions is capped: readings of older content are rare.
+const MAX_CACHED_VERSIONS = 4;
+
+let fragmentCache = global.telegramFragments;
+
+if (!fragmentCache) {
+  fragmentCache = global.telegramFragments = new Map();
+}
+
+function fragmentsFor(contentVersion) {
+  let fragments = fragmentCache.get(contentVersion);
+  if (!fragments) {
+    if (fragmentCache.size >= MAX_CACHED_VERSIONS) {
+      fragmentCache.delete(fragmentCache.keys().next().value);
+    }
+    fragments = new Map();
+    fragmentCache.set(contentVersion, fragments);
+  }
+  return fragments;
+}
+
+// Escape text so Telegram shows it literally in a MarkdownV2 message
+export function escapeMarkdownV2(text) {
+  const value = String(text ?? '');
+  return HAS_MARKDOWN_V2_SPECIAL.test(value) ? value.replace(MARKDOWN_V2_SPECIAL, '\\$&') : value;
+}
+
+// Tagged template: literal parts are MarkdownV2, interpolated values are escaped.
+//   md`*${title}*\n` -> bold title, whatever characters it contains
+export function md(strings, ...values) {
+  let out = strings[0];
+  for (let i = 0; i < values.length; i++) {
+    out += escapeMarkdownV2(values[i]) + strings[i + 1];
+  }
+  return out;
+}
+
+const renderCard = (card) =>
+  md`*${card.position}*\n${card.name}${card.reversed ? ' (Invertida)' : ''}\n${card.interpretation}\n\n`;
+
+const renderAnimal = (animal) =>
+  md`*${animal.position}*\n${animal.animal} \\- ${animal.arquetipo}\n${animal.medicina}\n\n`;
+
+// Render a fragment, through the cache when the reading knows its content version
+function fragment(fragments, key, render, item) {
+  if (!fragments) {
+    return render(item);
+  }
+  let rendered = fragments.get(key);
+  if (rendered === undefined) {
+    rendered = render(item);
+    fragments.set(key, rendered);
+  }
+  return rendered;
+}
+
+// Format a reading as a MarkdownV2 Telegram message
+export function formatReadingForTelegram(reading, orderId) {
+  const fragments = reading.content_version ? fragmentsFor(reading.content_version) : null;
+  let message = '🔮 *Tu lectura Pleyazul está lista*\n\n';
+
+  if (reading.type === 'tarot') {
+    message += '*Lectura de Tarot*\n\n';
+    for (const card of reading.cards) {
+      message += fragment(fragments, `t${card.reversed ? 1 : 0}${card.position}\u0000${card.name}`, renderCard, card);
+    }
+  } else if (reading.type === 'iching') {
+    message += '*Consulta del I Ching*\n\n';
+    message += fragment(fragments, `i${reading.hexagram.hex}`, (hexagram) =>
+      md`*Hexagrama ${hexagram.hex}: ${hexagram.nombre}*\n\n${hexagram.consejo}\n\n`, reading.hexagram);
+  } else if (reading.type === 'rueda') {
+    message += '*Medicina de la Rueda Sagrada*\n\n';
+    for (const animal of reading.animals) {
+      message += fragment(fragments, `r${animal.position}\u0000${animal.animal}`, renderAnimal, animal);
+    }
+  }
+
+  message += md`✨ *${reading.message}*\n\nVer lectura completa: ${process.env.APP_BASE_URL}/lectura/${orderId}`;
+
+  return message;
+}
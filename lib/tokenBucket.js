@@ -0,0 +1,36 @@
+// Token bucket: `rate` tokens per second refill up to `burst`. Callers check
+// delayMs() and take() once it is 0; pause() blocks the bucket entirely, e.g.
+// for the retry_after of a 429.
+export class TokenBucket {
+  constructor(rate, burst = Math.max(1, rate)) {
+    this.rate = rate;
+    this.burst = burst;
+    this.tokens = burst;
+    this.updatedAt = Date.now();
+    this.pausedUntil = 0;
+  }
+
+  refill(now) {
+    this.tokens = Math.min(this.burst, this.tokens + ((now - this.updatedAt) / 1000) * this.rate);
+    this.updatedAt = now;
+  }
+
+  // Milliseconds until a token is available (0 when one is available now)
+  delayMs() {
+    const now = Date.now();
+    this.refill(now);
+    const pauseMs = Math.max(0, this.pausedUntil - now);
+    const refillMs = this.tokens >= 1 ? 0 : Math.ceil(((1 - this.tokens) / this.rate) * 1000);
+    return Math.max(pauseMs, refillMs);
+  }
+
+  take() {
+    this.refill(Date.now());
+    this.tokens -= 1;
+  }
+
+  pause(ms) {
+    this.pausedUntil = Math.max(this.pausedUntil, Date.now() + ms);
+    this.tokens = Math.min(this.tokens, 0);
+  }
+}
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+MongoDB Query Plan Check
+Runs explain() for the hot order/reading lookups against a local MongoDB and
+fails if any of them falls back to a collection scan (COLLSCAN) or a unique
+index is missing
+
+The indexes are created by connectToDatabase in lib/mongodb.js, so point
+NEXT_PUBLIC_BASE_URL at a server using the same database and the check will
+call the API once to make it connect before explaining.
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+import requests
+from pymongo import MongoClient
+
+MONGO_URL = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.getenv('DB_NAME', 'pleyazul_oraculos')
+BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')
+API_BASE = f"{BASE_URL}/api"
+
+SAMPLE_ORDER_ID = 'index_check_order'
+
+# (name, collection, filter, sort) for every lookup on a request path
+HOT_QUERIES = [
+    ("orders by order_id", 'orders', {'order_id': SAMPLE_ORDER_ID}, None),
+    ("readings by order_id", 'readings', {'order_id': SAMPLE_ORDER_ID}, None),
+    ("orders by paypal_order_id (webhook)", 'orders', {'paypal_order_id': 'MOCK_ORDER_0'}, None),
+    ("orders newest first", 'orders', {}, [('created_at', -1), ('order_id', -1)]),
+    ("orders by status newest first", 'orders', {'status': 'completed'}, [('created_at', -1), ('order_id', -1)]),
+    ("orders by spread newest first", 'orders', {'spread_id': 'tres_cartas'}, [('created_at', -1), ('order_id', -1)]),
+    ("expired artifacts (cleanup)", 'artifacts', {'expires_at': {'$lte': datetime.now(timezone.utc)}}, [('expires_at', 1)]),
+]
+
+# Unique indexes that make reading creation, checkout retries and job dedupe race-free
+UNIQUE_INDEXES = [
+    ('orders', 'order_id_unique'),
+    ('orders', 'idempotency_key_unique'),
+    ('readings', 'order_id_unique'),
+    ('jobs', 'key_unique'),
+]
+
+
+def plan_stages(plan):
+    """Yield every stage name in a winning plan, classic or slot-based engine"""
+    if not isinstance(plan, dict):
+        return
+    if 'stage' in plan:
+        yield plan['stage']
+    for key in ('inputStage', 'queryPlan', 'outerStage', 'innerStage'):
+        yield from plan_stages(plan.get(key))
+    for child in plan.get('inputStages', []):
+        yield from plan_stages(child)
+
+
+def explain_query(db, collection, query, sort):
+    cursor = db[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort).limit(50)
+    return cursor.explain()['queryPlanner']['winningPlan']
+
+
+def test_query_plans():
+    """Fail on any COLLSCAN among the hot queries"""
+    print("🔮 Testing MongoDB Query Plans")
+    print("=" * 50)
+
+    # Let the app connect so its index bootstrap has run against this database
+    try:
+        requests.get(f"{API_BASE}/orders/{SAMPLE_ORDER_ID}", timeout=30)
+    except requests.RequestException as e:
+        print(f"⚠️  Could not reach {API_BASE} ({e}); checking existing indexes only")
+
+    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=5000)
+    db = client[DB_NAME]
+
+    # explain() on a missing collection reports EOF, which would hide a missing index
+    for collection in ('orders', 'readings'):
+        if collection not in db.list_collection_names():
+            db.create_collection(collection)
+
+    results = []
+    for collection, name in UNIQUE_INDEXES:
+        built = name in db[collection].index_information()
+        print(f"{'✅' if built else '❌'} unique index {collection}.{name}")
+        results.append(built)
+
+    for name, collection, query, sort in HOT_QUERIES:
+        stages = list(plan_stages(explain_query(db, collection, query, sort)))
+        collscan = 'COLLSCAN' in stages
+        print(f"{'❌' if collscan else '✅'} {name}: {' <- '.join(stages)}")
+        results.append(not collscan)
+
+    client.close()
+
+    passed = sum(results)
+    print(f"\n{passed}/{len(results)} index checks passed")
+    if passed < len(results):
+        print("Run the app once against this database (connectToDatabase creates the indexes)")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = test_query_plans()
+    sys.exit(0 if success else 1)
@@ -2,15 +2,25 @@
 """
 Focused Oracle Reading Generation Test
 Tests the core oracle functionality with updated content
+
+Run with --batch to create many orders and generate their readings
+through POST /api/readings/generate-batch instead.
 """
 
 import requests
+import argparse
 import json
 import time
 
+from perf_metrics import EndpointMetrics, TimedSession
+
 BASE_URL = "https://divine-insight-1.preview.emergentagent.com"
 API_BASE = f"{BASE_URL}/api"
 
+# Every call is timed per endpoint
+metrics = EndpointMetrics()
+session = TimedSession(metrics)
+
 def test_oracle_reading_generation():
     """Test oracle reading generation for all spread types"""
     
@@ -40,7 +50,7 @@ def test_oracle_reading_generation():
             }
             
             print("  📝 Creating order...")
-            checkout_response = requests.post(f"{API_BASE}/checkout", json=order_data, timeout=30)
+            checkout_response = session.post(f"{API_BASE}/checkout", json=order_data, timeout=30)
             
             if checkout_response.status_code != 200:
                 print(f"  ❌ Order creation failed: {checkout_response.status_code}")
@@ -59,7 +69,7 @@ def test_oracle_reading_generation():
             # Step 2: Generate reading
             print("  🔮 Generating reading...")
             reading_data = {"order_id": order_id}
-            reading_response = requests.post(f"{API_BASE}/readings/generate", json=reading_data, timeout=30)
+            reading_response = session.post(f"{API_BASE}/readings/generate", json=reading_data, timeout=30)
             
             if reading_response.status_code != 200:
                 print(f"  ❌ Reading generation failed: {reading_response.status_code}")
@@ -155,8 +165,92 @@ def test_oracle_reading_generation():
             if not success:
                 print(f"  - {spread_id}: {message}")
     
+    print("\n⏱️  LATENCY BY ENDPOINT")
+    metrics.print_summary()
+    
     return passed == total
 
+def test_batch_reading_generation(order_count=50):
+    """Test batch reading generation for many orders across all spread types"""
+    
+    print("🔮 Testing Batch Reading Generation")
+    print("=" * 50)
+    
+    spread_ids = ["tarot_3_ppf", "tarot_5_claridad", "iching_1", "rueda_3", "rueda_astral"]
+    order_ids = []
+    
+    print(f"📝 Creating {order_count} orders...")
+    for i in range(order_count):
+        order_data = {
+            "email": f"batch.test{i}@pleyazul.com",
+            "spread_id": spread_ids[i % len(spread_ids)],
+            "custom_question": "Batch test question"
+        }
+        try:
+            response = session.post(f"{API_BASE}/checkout", json=order_data, timeout=30)
+        except requests.RequestException as e:
+            print(f"  ❌ Order creation failed: {e}")
+            break
+        if response.status_code == 200 and response.json().get('success'):
+            order_ids.append(response.json()['order_id'])
+        else:
+            print(f"  ❌ Order creation failed: {response.status_code}")
+    
+    if not order_ids:
+        print("❌ No orders created, cannot test batch generation")
+        return False
+    print(f"  ✅ {len(order_ids)} orders created")
+    
+    missing_order_id = "non_existent_order_12345"
+    checks = []
+    
+    # First pass generates everything, second pass must find every reading already there
+    for expected_status in ('generated', 'exists'):
+        print(f"\n🔮 Generating batch (expecting '{expected_status}')...")
+        start = time.time()
+        response = session.post(f"{API_BASE}/readings/generate-batch",
+                                json={"order_ids": order_ids + [missing_order_id]}, timeout=120)
+        elapsed = time.time() - start
+        
+        if response.status_code != 200:
+            print(f"  ❌ Batch generation failed: {response.status_code} {response.text[:200]}")
+            return False
+        
+        data = response.json()
+        statuses = {result['order_id']: result['status'] for result in data.get('results', [])}
+        wrong = [order_id for order_id in order_ids if statuses.get(order_id) != expected_status]
+        missing_ok = statuses.get(missing_order_id) == 'not_found'
+        
+        print(f"  📊 {data.get('generated', 0)} generated of {data.get('requested', 0)} requested in {elapsed:.2f}s")
+        if wrong:
+            print(f"  ❌ {len(wrong)} orders not '{expected_status}': {[statuses.get(order_id) for order_id in wrong[:5]]}")
+        if not missing_ok:
+            print(f"  ❌ Unknown order reported as '{statuses.get(missing_order_id)}' instead of 'not_found'")
+        checks.append(not wrong and missing_ok)
+    
+    # Spot-check that the generated readings are retrievable
+    reading_response = session.get(f"{API_BASE}/readings/{order_ids[0]}", timeout=30)
+    readable = reading_response.status_code == 200
+    print(f"\n{'✅' if readable else '❌'} Reading retrievable for {order_ids[0]}: HTTP {reading_response.status_code}")
+    checks.append(readable)
+    
+    print("\n⏱️  LATENCY BY ENDPOINT")
+    metrics.print_summary()
+    
+    return all(checks)
+
 if __name__ == "__main__":
-    success = test_oracle_reading_generation()
+    parser = argparse.ArgumentParser(description='Oracle reading generation test')
+    parser.add_argument('--batch', action='store_true', help='exercise POST /api/readings/generate-batch')
+    parser.add_argument('--orders', type=int, default=50, help='orders to create in --batch mode')
+    args = parser.parse_args()
+    
+    if args.batch:
+        success = test_batch_reading_generation(args.orders)
+    else:
+        success = test_oracle_reading_generation()
+    
+    latency_path = metrics.save('oracle_test_latency.json')
+    print(f"\n⏱️  Latency histograms saved to: {latency_path}")
+    
     exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+PayPal OAuth Token Cache Test
+Runs lib/paypal.js under node against the PayPal stand-in (standins/), which
+counts token requests and client connections, and checks that:
+
+  - concurrent checkouts share a single token request (single-flight)
+  - the token is reused until shortly before expires_in, then refreshed
+  - a token revoked early (401) is refreshed and the call retried once
+  - calls reuse kept-alive connections instead of opening one per request
+
+Requires node and aiohttp; no real PayPal credentials or network access.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+from aiohttp import web
+
+from standins import Faults, PayPalStandin
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+PAYPAL_MODULE = f"file://{os.path.join(REPO_ROOT, 'lib', 'paypal.js')}"
+
+# Drives lib/paypal.js: `phases` is a list of [concurrent calls, pause in ms after]
+NODE_DRIVER = """
+const { createPayPalOrder } = await import(process.env.PAYPAL_MODULE);
+const phases = JSON.parse(process.env.PHASES);
+let ok = 0;
+for (const [calls, pauseMs] of phases) {
+  const orders = await Promise.all(Array.from({ length: calls }, (_, i) =>
+    createPayPalOrder({ orderId: `test_${i}`, amount: 19.99 })));
+  ok += orders.filter(order => order.status === 'CREATED').length;
+  await new Promise(resolve => setTimeout(resolve, pauseMs));
+}
+console.log(JSON.stringify({ ok }));
+"""
+
+
+class RevokingPayPal(PayPalStandin):
+    """Rejects the first token it issued, as PayPal does for a token revoked early"""
+
+    def _authorized(self, request):
+        first = next(iter(self.tokens), None)
+        if first and request.headers.get('Authorization') == f"Bearer {first}":
+            return False
+        return super()._authorized(request)
+
+
+async def run_scenario(name, stub, phases, check):
+    runner = web.AppRunner(stub.app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    env = dict(os.environ)
+    env.update({
+        'PAYPAL_API_BASE': f"http://127.0.0.1:{port}",
+        'PAYPAL_CLIENT_ID': 'stub-client',
+        'PAYPAL_CLIENT_SECRET': 'stub-secret',
+        'PAYPAL_MODULE': PAYPAL_MODULE,
+        'PHASES': json.dumps(phases)
+    })
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            'node', '--input-type=module', '-e', NODE_DRIVER,
+            env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+    finally:
+        await runner.cleanup()
+
+    if process.returncode != 0:
+        print(f"❌ {name}: node failed\n{stderr.decode()}")
+        return False
+
+    calls = sum(count for count, _ in phases)
+    ok = json.loads(stdout.decode().strip().splitlines()[-1])['ok']
+    problem = check(stub) if ok == calls else f"only {ok}/{calls} orders created"
+    status = '❌' if problem else '✅'
+    print(f"{status} {name}: {calls} orders, {stub.stats['token_requests']} token requests, "
+          f"{len(stub.connections)} connections{f' - {problem}' if problem else ''}")
+    return not problem
+
+
+async def main():
+    print("🔮 Testing PayPal OAuth Token Cache")
+    print("=" * 50)
+
+    results = [
+        await run_scenario(
+            "Single-flight under concurrency",
+            PayPalStandin(Faults(latency_ms=20)),
+            [[50, 0], [50, 0]],
+            lambda stub: None if stub.stats['token_requests'] == 1 else "expected exactly 1 token request"
+        ),
+        await run_scenario(
+            "Early refresh before expires_in",
+            # A 2s token is refreshed after half its lifetime
+            PayPalStandin(Faults(latency_ms=20), token_ttl=2),
+            [[10, 1200], [10, 0]],
+            lambda stub: None if stub.stats['token_requests'] == 2 else "expected 2 token requests"
+        ),
+        await run_scenario(
+            "Refresh and retry on 401",
+            RevokingPayPal(Faults(latency_ms=20)),
+            [[20, 0]],
+            lambda stub: None if stub.stats['token_requests'] == 2 and stub.stats['unauthorized'] > 0 else "expected a refresh after the 401"
+        ),
+        await run_scenario(
+            "Keep-alive connection reuse",
+            PayPalStandin(Faults(latency_ms=20)),
+            [[1, 0]] * 20,
+            lambda stub: None if len(stub.connections) <= 2 else "sequential calls opened new connections"
+        ),
+    ]
+
+    passed = sum(results)
+    print(f"\n{passed}/{len(results)} scenarios passed")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
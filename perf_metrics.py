@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Latency instrumentation shared by the Pleyazul Oráculos test scripts
+Records wall-clock, time-to-first-byte and response size per endpoint
+into HDR-style histograms
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+import requests
+
+# Where the test scripts persist their result files
+RESULTS_DIR = os.getenv('TEST_RESULTS_DIR', '/app')
+
+PERCENTILES = [50, 90, 95, 99, 99.9]
+
+ID_SEGMENT = re.compile(r'^(demo_)?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+ID_PARENTS = {'orders', 'readings'}
+# Fixed routes under those parents, not IDs
+ID_PARENT_ROUTES = {'generate', 'generate-batch'}
+
+
+class LatencyHistogram:
+    """HDR-style histogram with log-linear buckets.
+
+    Values are non-negative integers (microseconds or bytes). Each power of
+    two is split into linear sub-buckets so that any recorded value is
+    reported within 10^-significant_figures relative error, using constant
+    memory regardless of how many samples are recorded.
+    """
+
+    def __init__(self, significant_figures=2):
+        self.significant_figures = significant_figures
+        largest_single_unit = 2 * 10 ** significant_figures
+        self.sub_bucket_half_magnitude = math.ceil(math.log2(largest_single_unit)) - 1
+        self.sub_bucket_count = 1 << (self.sub_bucket_half_magnitude + 1)
+        self.sub_bucket_mask = self.sub_bucket_count - 1
+        self.counts = Counter()
+        self.total_count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        bucket = max(0, (value | self.sub_bucket_mask).bit_length() - (self.sub_bucket_half_magnitude + 1))
+        return bucket, value >> bucket
+
+    def _highest_equivalent(self, bucket, sub_bucket):
+        return ((sub_bucket + 1) << bucket) - 1
+
+    def record(self, value, count=1):
+        value = max(0, int(value))
+        self.counts[self._index(value)] += count
+        self.total_count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total_count += other.total_count
+        self.total += other.total
+        if other.total_count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, pct):
+        """Value at the given percentile, within the histogram's precision"""
+        if not self.total_count:
+            return 0
+        target = max(1, math.ceil(pct / 100.0 * self.total_count))
+        seen = 0
+        for bucket, sub_bucket in sorted(self.counts):
+            seen += self.counts[(bucket, sub_bucket)]
+            if seen >= target:
+                return min(self._highest_equivalent(bucket, sub_bucket), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.total_count if self.total_count else 0
+
+    def to_dict(self):
+        return {
+            'significant_figures': self.significant_figures,
+            'count': self.total_count,
+            'min': self.min or 0,
+            'max': self.max or 0,
+            'mean': self.mean(),
+            'percentiles': {str(p): self.percentile(p) for p in PERCENTILES},
+            'buckets': [[bucket, sub_bucket, count] for (bucket, sub_bucket), count in sorted(self.counts.items())]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data.get('significant_figures', 2))
+        for bucket, sub_bucket, count in data.get('buckets', []):
+            histogram.counts[(bucket, sub_bucket)] = count
+        histogram.total_count = data.get('count', 0)
+        histogram.total = int(data.get('mean', 0) * histogram.total_count)
+        histogram.min = data.get('min') if histogram.total_count else None
+        histogram.max = data.get('max') if histogram.total_count else None
+        return histogram
+
+
+def endpoint_name(method, url):
+    """Normalize a request into 'METHOD /path' with order IDs collapsed to {id}"""
+    path = url.split('://', 1)[-1]
+    path = path[path.find('/'):] if '/' in path else '/'
+    path = path.split('?', 1)[0]
+    if path.startswith('/api/'):
+        path = path[4:]
+
+    segments = path.strip('/').split('/')
+    for i, segment in enumerate(segments):
+        if ID_SEGMENT.match(segment) or (i > 0 and segments[i - 1] in ID_PARENTS and segment not in ID_PARENT_ROUTES):
+            segments[i] = '{id}'
+    return f"{method.upper()} /{'/'.join(segments)}"
+
+
+class EndpointMetrics:
+    """Per-endpoint wall-clock, TTFB and response size histograms; safe to
+    record into from several threads (one TimedSession per thread)"""
+
+    def __init__(self, track_recent=True):
+        self.endpoints = {}
+        self.track_recent = track_recent
+        self.recent = []
+        self.lock = threading.Lock()
+
+    def _endpoint(self, endpoint):
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = {
+                'wall_us': LatencyHistogram(),
+                'ttfb_us': LatencyHistogram(),
+                'size_bytes': LatencyHistogram(),
+                'statuses': Counter()
+            }
+        return self.endpoints[endpoint]
+
+    def record(self, endpoint, status, wall, ttfb, size):
+        """Record one completed call; wall and ttfb are in seconds"""
+        with self.lock:
+            entry = self._endpoint(endpoint)
+            entry['wall_us'].record(wall * 1_000_000)
+            entry['ttfb_us'].record(ttfb * 1_000_000)
+            entry['size_bytes'].record(size)
+            entry['statuses'][str(status)] += 1
+            if self.track_recent:
+                self.recent.append({
+                    'endpoint': endpoint,
+                    'status': status,
+                    'wall_ms': round(wall * 1000, 2),
+                    'ttfb_ms': round(ttfb * 1000, 2),
+                    'bytes': size
+                })
+
+    def record_error(self, endpoint, wall):
+        """Record a call that failed before a response arrived"""
+        with self.lock:
+            entry = self._endpoint(endpoint)
+            entry['wall_us'].record(wall * 1_000_000)
+            entry['statuses']['error'] += 1
+            if self.track_recent:
+                self.recent.append({'endpoint': endpoint, 'status': 'error', 'wall_ms': round(wall * 1000, 2)})
+
+    def drain_recent(self):
+        """Return and forget the calls recorded since the previous drain"""
+        with self.lock:
+            recent, self.recent = self.recent, []
+        return recent
+
+    def errors(self, endpoint):
+        statuses = self.endpoints[endpoint]['statuses']
+        return sum(count for status, count in statuses.items() if status == 'error' or int(status) >= 400)
+
+    def summary(self):
+        """Percentile summary per endpoint, latencies in milliseconds"""
+        result = {}
+        for endpoint, entry in sorted(self.endpoints.items()):
+            wall, ttfb, size = entry['wall_us'], entry['ttfb_us'], entry['size_bytes']
+            result[endpoint] = {
+                'requests': wall.total_count,
+                'errors': self.errors(endpoint),
+                'statuses': dict(entry['statuses']),
+                'wall_ms': {f"p{p}": wall.percentile(p) / 1000 for p in PERCENTILES},
+                'ttfb_ms': {f"p{p}": ttfb.percentile(p) / 1000 for p in PERCENTILES},
+                'max_ms': (wall.max or 0) / 1000,
+                'mean_bytes': size.mean()
+            }
+        return result
+
+    def to_dict(self):
+        return {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'summary': self.summary(),
+            'histograms': {
+                endpoint: {
+                    'wall_us': entry['wall_us'].to_dict(),
+                    'ttfb_us': entry['ttfb_us'].to_dict(),
+                    'size_bytes': entry['size_bytes'].to_dict()
+                }
+                for endpoint, entry in sorted(self.endpoints.items())
+            }
+        }
+
+    def save(self, filename):
+        """Write summary and raw histograms to RESULTS_DIR, returning the path"""
+        path = os.path.join(RESULTS_DIR, filename)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def print_summary(self):
+        print(f"\n{'Endpoint':<30}{'req':>6}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'ttfb95':>9}{'KB':>8}")
+        for endpoint, stats in self.summary().items():
+            wall, ttfb = stats['wall_ms'], stats['ttfb_ms']
+            print(f"{endpoint:<30}{stats['requests']:>6}{stats['errors']:>5}"
+                  f"{wall['p50']:>9.1f}{wall['p95']:>9.1f}{wall['p99']:>9.1f}{ttfb['p95']:>9.1f}"
+                  f"{stats['mean_bytes'] / 1024:>8.1f}")
+        print("(latencies in ms, size is mean response KB)")
+
+
+class TimedSession(requests.Session):
+    """requests.Session that records every call into an EndpointMetrics"""
+
+    def __init__(self, metrics):
+        super().__init__()
+        self.metrics = metrics
+
+    def request(self, method, url, **kwargs):
+        kwargs.pop('stream', None)
+        endpoint = endpoint_name(method, url)
+        start = time.perf_counter()
+        try:
+            # Streaming returns as soon as the headers arrive, which gives the TTFB
+            response = super().request(method, url, stream=True, **kwargs)
+            ttfb = time.perf_counter() - start
+            body = response.content
+        except requests.RequestException:
+            self.metrics.record_error(endpoint, time.perf_counter() - start)
+            raise
+
+        self.metrics.record(endpoint, response.status_code, time.perf_counter() - start, ttfb, len(body))
+        return response
+
+
+async def timed_request(http, metrics, method, endpoint, url, **kwargs):
+    """Time one aiohttp request into metrics, returning (status, parsed JSON)"""
+    start = time.perf_counter()
+    try:
+        async with http.request(method, url, **kwargs) as response:
+            ttfb = time.perf_counter() - start
+            body = await response.read()
+            status = response.status
+    except Exception:
+        metrics.record_error(endpoint, time.perf_counter() - start)
+        return None, None
+
+    metrics.record(endpoint, status, time.perf_counter() - start, ttfb, len(body))
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    return status, data
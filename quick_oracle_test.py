@@ -6,9 +6,15 @@ Quick Oracle Test - Single Reading Generation
 import requests
 import json
 
+from perf_metrics import EndpointMetrics, TimedSession
+
 BASE_URL = "https://divine-insight-1.preview.emergentagent.com"
 API_BASE = f"{BASE_URL}/api"
 
+# Every call is timed per endpoint
+metrics = EndpointMetrics()
+session = TimedSession(metrics)
+
 def quick_test():
     print("🔮 Quick Oracle Reading Test")
     
@@ -21,7 +27,7 @@ def quick_test():
             "custom_question": "Quick test question"
         }
         
-        response = requests.post(f"{API_BASE}/checkout", json=order_data, timeout=60)
+        response = session.post(f"{API_BASE}/checkout", json=order_data, timeout=60)
         print(f"   Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -33,7 +39,7 @@ def quick_test():
                 # Test 2: Generate reading
                 print("2. Generating reading...")
                 reading_data = {"order_id": order_id}
-                reading_response = requests.post(f"{API_BASE}/readings/generate", json=reading_data, timeout=60)
+                reading_response = session.post(f"{API_BASE}/readings/generate", json=reading_data, timeout=60)
                 print(f"   Status: {reading_response.status_code}")
                 
                 if reading_response.status_code == 200:
@@ -72,4 +78,8 @@ def quick_test():
 
 if __name__ == "__main__":
     success = quick_test()
-    print(f"\nResult: {'SUCCESS' if success else 'FAILED'}")
\ No newline at end of file
+    print(f"\nResult: {'SUCCESS' if success else 'FAILED'}")
+    
+    metrics.print_summary()
+    latency_path = metrics.save('quick_oracle_test_latency.json')
+    print(f"⏱️  Latency histograms saved to: {latency_path}")
\ No newline at end of file
@@ -0,0 +1,95 @@
+#!/usr/bin/env node
+// Generate public/sw.js: the precache manifest followed by scripts/sw-template.js.
+// Runs before every `yarn build` (prebuild); `yarn sw` runs it alone.
+//
+// Precached, each with a revision so an unchanged entry is never downloaded again:
+//   - app shell pages (revision: hash of app/ and components/)
+//   - files under public/img and public/audio, icons and the manifest (revision: file hash)
+//   - /api/content/{type} (revision: the content version, which is also its ETag)
+//
+// Next serves public/ files as they were at build time, so the worker is written
+// before `next build`. Hashed /_next/static files are cached at runtime instead.
+
+import crypto from 'crypto';
+import fs from 'fs';
+import path from 'path';
+
+const ROOT = process.cwd();
+const PUBLIC_DIR = path.join(ROOT, 'public');
+const OUTPUT = path.join(PUBLIC_DIR, 'sw.js');
+const TEMPLATE = path.join(ROOT, 'scripts', 'sw-template.js');
+
+// Pages that work offline once their content is cached; checkout and admin need the API
+const SHELL_PAGES = ['/', '/tiradas', '/meditaciones', '/legal/terminos', '/legal/privacidad'];
+const ASSET_DIRS = ['img', 'audio'];
+const ASSET_FILES = ['manifest.json', 'icon-192.svg', 'icon-512.svg'];
+// Directories whose sources render the shell pages
+const SHELL_SOURCES = ['app', 'components'];
+
+const { default: contentService, CONTENT_TYPES } = await import('../lib/contentService.js');
+
+const shortHash = (data) => crypto.createHash('sha256').update(data).digest('hex').slice(0, 16);
+
+function listFiles(dir) {
+  if (!fs.existsSync(dir)) {
+    return [];
+  }
+  return fs.readdirSync(dir, { withFileTypes: true })
+    .flatMap((entry) => {
+      const entryPath = path.join(dir, entry.name);
+      return entry.isDirectory() ? listFiles(entryPath) : [entryPath];
+    })
+    .sort();
+}
+
+function hashFiles(files) {
+  const hash = crypto.createHash('sha256');
+  for (const file of files) {
+    hash.update(path.relative(ROOT, file)).update('\0').update(fs.readFileSync(file));
+  }
+  return hash.digest('hex').slice(0, 16);
+}
+
+const manifest = [];
+
+// API routes live under app/ too but don't change the pages
+const shellRevision = hashFiles(SHELL_SOURCES.flatMap((dir) => listFiles(path.join(ROOT, dir)))
+  .filter((file) => !file.startsWith(path.join(ROOT, 'app', 'api'))));
+const meditations = contentService.loadContent('meditaciones') || [];
+for (const url of [...SHELL_PAGES, ...meditations.map((meditation) => `/meditaciones/${meditation.slug}`)]) {
+  manifest.push({ url, revision: shellRevision, page: true });
+}
+
+const assetFiles = [
+  ...ASSET_DIRS.flatMap((dir) => listFiles(path.join(PUBLIC_DIR, dir))),
+  ...ASSET_FILES.map((file) => path.join(PUBLIC_DIR, file)).filter((file) => fs.existsSync(file))
+];
+for (const file of assetFiles) {
+  const url = `/${path.relative(PUBLIC_DIR, file).split(path.sep).join('/')}`;
+  manifest.push({ url, revision: shortHash(fs.readFileSync(file)) });
+}
+
+// Meditation media referenced from content must exist, or install would fail
+const assetUrls = new Set(manifest.map(({ url }) => url));
+for (const meditation of meditations) {
+  for (const url of [meditation.image, meditation.audio_url]) {
+    if (url && url.startsWith('/') && !assetUrls.has(url)) {
+      console.warn(`⚠️  ${meditation.slug} references ${url}, which is not in public/`);
+    }
+  }
+}
+
+for (const type of CONTENT_TYPES) {
+  const payload = contentService.getContentPayload(type);
+  if (payload) {
+    manifest.push({ url: `/api/content/${type}`, revision: payload.version });
+  }
+}
+contentService.close();
+
+const template = fs.readFileSync(TEMPLATE, 'utf8');
+const source = '// Generated by scripts/generate-sw.mjs from scripts/sw-template.js; do not edit.\n\n'
+  + `const PRECACHE_MANIFEST = ${JSON.stringify(manifest, null, 2)};\n\n${template}`;
+
+fs.writeFileSync(OUTPUT, source);
+console.log(`Wrote ${path.relative(ROOT, OUTPUT)}: ${manifest.length} precached URLs (${shortHash(source)})`);
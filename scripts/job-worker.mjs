@@ -0,0 +1,46 @@
+#!/usr/bin/env node
+// Background job worker: drains the Mongo-backed job queue (reading generation,
+// PDF rendering, Telegram delivery) and deletes expired artifacts. Run one or
+// more next to the API with `yarn worker`.
+
+import fs from 'fs';
+
+if (fs.existsSync('.env')) {
+  process.loadEnvFile('.env');
+}
+
+const { startJobWorker } = await import('../lib/jobWorker.js');
+const { closePdfRenderer } = await import('../lib/pdfGenerator.js');
+const { connectToDatabase } = await import('../lib/mongodb.js');
+const { cleanupExpiredArtifacts } = await import('../lib/artifacts.js');
+
+const ARTIFACT_CLEANUP_INTERVAL_MS = Number(process.env.ARTIFACT_CLEANUP_INTERVAL_MS) || 10 * 60 * 1000;
+
+const worker = startJobWorker();
+console.log(`Job worker ${worker.workerId} started`);
+
+// Several workers may sweep at once; deleting an artifact twice is harmless
+async function cleanupArtifacts() {
+  try {
+    const removed = await cleanupExpiredArtifacts();
+    if (removed > 0) {
+      console.log(`Removed ${removed} expired artifacts`);
+    }
+  } catch (error) {
+    console.error('Artifact cleanup failed:', error.message);
+  }
+}
+const cleanupTimer = setInterval(cleanupArtifacts, ARTIFACT_CLEANUP_INTERVAL_MS);
+
+async function shutdown(signal) {
+  console.log(`${signal} received, finishing jobs in progress...`);
+  clearInterval(cleanupTimer);
+  await worker.stop();
+  await closePdfRenderer();
+  const { client } = await connectToDatabase();
+  await client.close();
+  process.exit(0);
+}
+
+process.once('SIGINT', shutdown);
+process.once('SIGTERM', shutdown);
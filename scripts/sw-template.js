@@ -0,0 +1,192 @@
+// Service worker body. scripts/generate-sw.mjs prepends PRECACHE_MANIFEST
+// ([{ url, revision, page }]) and writes the result to public/sw.js.
+//
+//   precache         app shell pages, images, audio, icons and /api/content/* payloads,
+//                    fetched at install; entries whose revision is unchanged since the
+//                    previous worker are kept instead of downloaded again
+//   shell pages and  stale-while-revalidate: answered from the precache, refreshed in
+//   /api/content/*   the background
+//   /api/orders/{id} finished orders (completed, PDF ready, no Telegram send pending)
+//                    are cached and answered without the network; others go to the network
+//   /_next/static/*  cache-first; file names are content hashed, so entries stay valid
+//                    across deploys and a cached page never loses its scripts
+//   other pages      network-first, falling back to the cached page or the home page
+//   everything else (POSTs, other API calls, other origins) goes straight to the network
+
+const PRECACHE = 'pleyazul-precache';
+const STATIC_CACHE = 'pleyazul-static';
+const READINGS_CACHE = 'pleyazul-readings';
+const PAGES_CACHE = 'pleyazul-pages';
+const CACHES = [PRECACHE, STATIC_CACHE, READINGS_CACHE, PAGES_CACHE];
+
+const REVISION_HEADER = 'X-Precache-Revision';
+const MAX_STATIC_ENTRIES = 300;
+const MAX_CACHED_READINGS = 50;
+const MAX_CACHED_PAGES = 50;
+
+const ORDER_PATH = /^\/api\/orders\/[^/]+$/;
+const SHELL_PAGES = new Set(PRECACHE_MANIFEST.filter(({ page }) => page).map(({ url }) => url));
+const ASSETS = new Set(PRECACHE_MANIFEST.filter(({ page, url }) => !page && !url.startsWith('/api/')).map(({ url }) => url));
+
+// Copy of a response with the precache revision recorded in a header
+async function withRevision(response, revision) {
+  const headers = new Headers(response.headers);
+  headers.set(REVISION_HEADER, revision);
+  return new Response(await response.blob(), { status: response.status, statusText: response.statusText, headers });
+}
+
+// Drop the oldest entries (Cache keys are in insertion order)
+async function trimCache(cacheName, maxEntries) {
+  const cache = await caches.open(cacheName);
+  const keys = await cache.keys();
+  await Promise.all(keys.slice(0, Math.max(0, keys.length - maxEntries)).map((key) => cache.delete(key)));
+}
+
+async function precache() {
+  const cache = await caches.open(PRECACHE);
+  await Promise.all(PRECACHE_MANIFEST.map(async ({ url, revision }) => {
+    const cached = await cache.match(url);
+    if (cached && cached.headers.get(REVISION_HEADER) === revision) {
+      return;
+    }
+    const response = await fetch(url, { cache: 'reload' });
+    if (!response.ok) {
+      throw new Error(`Precache of ${url} failed: HTTP ${response.status}`);
+    }
+    await cache.put(url, await withRevision(response, revision));
+  }));
+}
+
+// Remove other versions' caches and precache entries no longer in the manifest
+async function cleanUp() {
+  const names = await caches.keys();
+  await Promise.all(names.filter((name) => name.startsWith('pleyazul-') && !CACHES.includes(name))
+    .map((name) => caches.delete(name)));
+
+  const cache = await caches.open(PRECACHE);
+  const wanted = new Set(PRECACHE_MANIFEST.map(({ url }) => new URL(url, self.location.origin).href));
+  const keys = await cache.keys();
+  await Promise.all(keys.filter((request) => !wanted.has(request.url)).map((request) => cache.delete(request)));
+}
+
+// Answer from the precache and refresh the entry in the background. Content
+// payloads carry their version as the ETag (useEtag); it becomes the entry's
+// revision, so the next install doesn't download a payload already refreshed here.
+async function staleWhileRevalidate(event, request, useEtag) {
+  const cache = await caches.open(PRECACHE);
+  const cached = await cache.match(request, { ignoreSearch: request.mode === 'navigate' });
+  const refresh = fetch(request).then(async (response) => {
+    if (response.ok) {
+      const etag = useEtag && response.headers.get('ETag');
+      const revision = etag ? etag.replace(/"/g, '') : cached?.headers.get(REVISION_HEADER) || '';
+      await cache.put(cached ? new URL(request.url).pathname : request, await withRevision(response.clone(), revision));
+    }
+    return response;
+  });
+
+  if (cached) {
+    event.waitUntil(refresh.catch(() => {}));
+    return cached;
+  }
+  return refresh;
+}
+
+function isFinished({ order, reading }) {
+  return order?.status === 'completed' && !!reading?.pdf_url && reading.telegram_status !== 'queued';
+}
+
+async function orderLookup(request) {
+  const cache = await caches.open(READINGS_CACHE);
+  const cached = await cache.match(request);
+  if (cached) {
+    return cached;
+  }
+
+  const response = await fetch(request);
+  if (response.ok && isFinished(await response.clone().json())) {
+    await cache.put(request, response.clone());
+    await trimCache(READINGS_CACHE, MAX_CACHED_READINGS);
+  }
+  return response;
+}
+
+async function cacheFirst(request, cacheName, maxEntries) {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(request);
+  if (cached) {
+    return cached;
+  }
+  const response = await fetch(request);
+  if (response.ok) {
+    await cache.put(request, response.clone());
+    await trimCache(cacheName, maxEntries);
+  }
+  return response;
+}
+
+async function networkFirstPage(request) {
+  const cache = await caches.open(PAGES_CACHE);
+  try {
+    const response = await fetch(request);
+    if (response.ok) {
+      await cache.put(request, response.clone());
+      await trimCache(PAGES_CACHE, MAX_CACHED_PAGES);
+    }
+    return response;
+  } catch (error) {
+    const cached = await cache.match(request) || await caches.match('/', { cacheName: PRECACHE });
+    if (cached) {
+      return cached;
+    }
+    throw error;
+  }
+}
+
+// <audio> asks for byte ranges; answer them from the cached whole file
+async function rangeResponse(request, response) {
+  const match = /^bytes=(\d*)-(\d*)$/.exec(request.headers.get('Range') || '');
+  if (!match || response.status !== 200) {
+    return response;
+  }
+  const blob = await response.blob();
+  const start = match[1] ? Number(match[1]) : Math.max(0, blob.size - Number(match[2]));
+  const end = match[1] && match[2] ? Math.min(Number(match[2]), blob.size - 1) : blob.size - 1;
+  if (start > end) {
+    return new Response(null, { status: 416, headers: { 'Content-Range': `bytes */${blob.size}` } });
+  }
+  const headers = new Headers(response.headers);
+  headers.set('Content-Range', `bytes ${start}-${end}/${blob.size}`);
+  headers.set('Content-Length', String(end - start + 1));
+  return new Response(blob.slice(start, end + 1), { status: 206, headers });
+}
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(precache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil(cleanUp().then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', (event) => {
+  const { request } = event;
+  const url = new URL(request.url);
+  if (request.method !== 'GET' || url.origin !== self.location.origin) {
+    return;
+  }
+
+  if (url.pathname.startsWith('/api/content/') && !url.search) {
+    event.respondWith(staleWhileRevalidate(event, request, true));
+  } else if (ORDER_PATH.test(url.pathname)) {
+    event.respondWith(orderLookup(request));
+  } else if (url.pathname.startsWith('/_next/static/')) {
+    event.respondWith(cacheFirst(request, STATIC_CACHE, MAX_STATIC_ENTRIES));
+  } else if (request.mode === 'navigate') {
+    event.respondWith(SHELL_PAGES.has(url.pathname)
+      ? staleWhileRevalidate(event, request, false)
+      : networkFirstPage(request));
+  } else if (ASSETS.has(url.pathname)) {
+    event.respondWith(caches.match(url.pathname, { cacheName: PRECACHE }).then((cached) =>
+      cached ? rangeResponse(request, cached) : fetch(request)));
+  }
+});
@@ -0,0 +1,20 @@
+"""
+Local stand-ins for the PayPal, Telegram and S3 APIs
+
+Small aiohttp servers that speak enough of the real APIs for lib/paypal.js,
+lib/telegram.js and lib/s3Client.js, with configurable latency, error rates
+and rate limits, so the payment, delivery and storage paths can be tested and
+load-tested offline.
+
+    python3 -m standins --latency-ms 150 --error-rate 0.02 --telegram-chat-rate 1
+
+Point the app at them with PAYPAL_API_BASE, TELEGRAM_API_BASE and (with
+ARTIFACT_STORE=s3) ARTIFACT_S3_ENDPOINT.
+"""
+
+from standins.common import Faults, TokenBucket
+from standins.paypal import PayPalStandin
+from standins.s3 import S3Standin
+from standins.telegram import TelegramStandin
+
+__all__ = ['Faults', 'TokenBucket', 'PayPalStandin', 'S3Standin', 'TelegramStandin']
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Run the PayPal, Telegram and S3 stand-ins
+
+    python3 -m standins                                   # PayPal on :8081, Telegram on :8082, S3 on :8083
+    python3 -m standins --latency-ms 200 --jitter-ms 100  # slow upstreams
+    python3 -m standins --error-rate 0.05 --paypal-rate-limit 20
+
+and start the app with the environment it prints (PAYPAL_API_BASE,
+TELEGRAM_API_BASE, the S3 artifact store settings and placeholder credentials). Counters are served at
+GET /__stats on each port and the delivered Telegram messages at GET /__messages.
+"""
+
+import argparse
+import asyncio
+
+from aiohttp import web
+
+from standins.common import Faults
+from standins.paypal import PayPalStandin
+from standins.s3 import S3Standin
+from standins.telegram import TelegramStandin
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='PayPal and Telegram stand-in servers')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--paypal-port', type=int, default=8081)
+    parser.add_argument('--telegram-port', type=int, default=8082)
+    parser.add_argument('--s3-port', type=int, default=8083)
+    parser.add_argument('--latency-ms', type=float, default=0, help='added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='random extra latency, uniform in [0, jitter]')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with a 5xx')
+    parser.add_argument('--seed', type=int, default=None, help='seed for jitter and injected errors')
+    parser.add_argument('--token-ttl', type=int, default=32400, help='PayPal OAuth token lifetime in seconds')
+    parser.add_argument('--paypal-rate-limit', type=float, default=None, help='PayPal requests per second before 429')
+    parser.add_argument('--telegram-global-rate', type=float, default=30, help='Telegram messages per second overall')
+    parser.add_argument('--telegram-chat-rate', type=float, default=1, help='Telegram messages per second per chat')
+    return parser.parse_args()
+
+
+async def serve(args):
+    faults = dict(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    paypal = PayPalStandin(Faults(seed=args.seed, **faults), token_ttl=args.token_ttl,
+                           rate_limit=args.paypal_rate_limit)
+    telegram = TelegramStandin(Faults(seed=args.seed, **faults), global_rate=args.telegram_global_rate,
+                               chat_rate=args.telegram_chat_rate)
+
+    s3 = S3Standin(Faults(seed=args.seed, **faults))
+
+    runners = []
+    for name, standin, port in (('PayPal', paypal, args.paypal_port), ('Telegram', telegram, args.telegram_port),
+                                ('S3', s3, args.s3_port)):
+        runner = web.AppRunner(standin.app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, args.host, port).start()
+        runners.append(runner)
+        print(f"{name} stand-in listening on http://{args.host}:{port}", flush=True)
+
+    print("\nexport PAYPAL_API_BASE=http://{0}:{1} PAYPAL_CLIENT_ID=standin PAYPAL_CLIENT_SECRET=standin "
+          "TELEGRAM_API_BASE=http://{0}:{2} TELEGRAM_BOT_TOKEN=123456:standin "
+          "ARTIFACT_STORE=s3 ARTIFACT_S3_ENDPOINT=http://{0}:{3} ARTIFACT_S3_BUCKET=pleyazul "
+          "AWS_ACCESS_KEY_ID={4} AWS_SECRET_ACCESS_KEY={5}".format(
+              args.host, args.paypal_port, args.telegram_port, args.s3_port, s3.access_key, s3.secret_key), flush=True)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Fault injection shared by the stand-in servers: latency, random errors and
+token-bucket rate limits
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Consume a token; returns 0 when allowed, else seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Faults:
+    """Latency (fixed + uniform jitter, in ms) and a random error rate for every request"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+    async def delay(self):
+        latency = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    def should_fail(self):
+        return self.error_rate > 0 and self.random.random() < self.error_rate
+
+
+class Standin:
+    """Base class: an aiohttp app with request counters at GET /__stats and POST /__reset"""
+
+    def __init__(self, faults=None, **app_options):
+        self.faults = faults or Faults()
+        self.stats = Counter()
+        self.connections = set()
+        self.app = web.Application(**app_options)
+        self.app.router.add_get('/__stats', self.get_stats)
+        self.app.router.add_post('/__reset', self.reset)
+
+    def track(self, request, name):
+        self.stats[name] += 1
+        self.connections.add(request.transport.get_extra_info('peername') if request.transport else None)
+
+    def snapshot(self):
+        return {**self.stats, 'connections': len(self.connections)}
+
+    async def get_stats(self, request):
+        return web.json_response(self.snapshot())
+
+    async def reset(self, request):
+        self.stats.clear()
+        self.connections.clear()
+        return web.json_response({'ok': True})
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+PayPal REST API stand-in: OAuth client credentials and v2 checkout orders
+(create, get, capture) with the response shapes lib/paypal.js reads
+"""
+
+import base64
+import itertools
+import time
+import uuid
+
+from aiohttp import web
+
+from standins.common import Standin, TokenBucket
+
+
+def paypal_error(status, name, message, issue=None):
+    """PayPal's error envelope"""
+    body = {'name': name, 'message': message, 'debug_id': uuid.uuid4().hex[:13]}
+    if issue:
+        body['details'] = [{'issue': issue, 'description': message}]
+    return web.json_response(body, status=status)
+
+
+class PayPalStandin(Standin):
+    """Emulates /v1/oauth2/token and /v2/checkout/orders.
+
+    Tokens live for `token_ttl` seconds. Orders are approved immediately (there
+    is no buyer), so capture succeeds once and then reports ORDER_ALREADY_CAPTURED.
+    `rate_limit` (requests/second, optional) answers 429 RATE_LIMIT_REACHED.
+    """
+
+    def __init__(self, faults=None, token_ttl=32400, rate_limit=None, client_id=None, client_secret=None):
+        super().__init__(faults)
+        self.token_ttl = token_ttl
+        self.bucket = TokenBucket(rate_limit) if rate_limit else None
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.tokens = {}
+        self.orders = {}
+        self.order_numbers = itertools.count(1)
+        self.app.router.add_post('/v1/oauth2/token', self.token)
+        self.app.router.add_post('/v2/checkout/orders', self.create_order)
+        self.app.router.add_get('/v2/checkout/orders/{order_id}', self.get_order)
+        self.app.router.add_post('/v2/checkout/orders/{order_id}/capture', self.capture_order)
+
+    async def _faults(self, request, name):
+        """Apply latency, rate limit and random errors; returns an error response or None"""
+        self.track(request, name)
+        await self.faults.delay()
+        if self.bucket and self.bucket.take() > 0:
+            self.stats['rate_limited'] += 1
+            return paypal_error(429, 'RATE_LIMIT_REACHED', 'Too many requests. Blocked due to rate limiting.')
+        if self.faults.should_fail():
+            self.stats['injected_errors'] += 1
+            return paypal_error(503, 'SERVICE_UNAVAILABLE', 'Service Unavailable.')
+        return None
+
+    def revoke_tokens(self):
+        """Invalidate every issued token, as PayPal may do before expires_in"""
+        self.tokens.clear()
+
+    def _authorized(self, request):
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return False
+        expires = self.tokens.get(header[len('Bearer '):])
+        return expires is not None and expires > time.time()
+
+    async def token(self, request):
+        error = await self._faults(request, 'token_requests')
+        if error:
+            return error
+
+        header = request.headers.get('Authorization', '')
+        try:
+            client_id, _, client_secret = base64.b64decode(header.removeprefix('Basic ')).decode().partition(':')
+        except ValueError:
+            client_id = client_secret = ''
+        if not client_id or (self.client_id and (client_id, client_secret) != (self.client_id, self.client_secret)):
+            return web.json_response({'error': 'invalid_client', 'error_description': 'Client Authentication failed'},
+                                     status=401)
+
+        form = await request.post()
+        if form.get('grant_type') != 'client_credentials':
+            return web.json_response({'error': 'unsupported_grant_type'}, status=400)
+
+        token = f"A21AA{uuid.uuid4().hex}"
+        self.tokens[token] = time.time() + self.token_ttl
+        return web.json_response({
+            'scope': 'https://uri.paypal.com/services/payments/payment',
+            'access_token': token,
+            'token_type': 'Bearer',
+            'app_id': 'APP-STANDIN',
+            'expires_in': self.token_ttl,
+            'nonce': uuid.uuid4().hex
+        })
+
+    async def create_order(self, request):
+        error = await self._faults(request, 'order_requests')
+        if error:
+            return error
+        if not self._authorized(request):
+            self.stats['unauthorized'] += 1
+            return paypal_error(401, 'AUTHENTICATION_FAILURE', 'Authentication failed due to invalid authentication credentials or a missing Authorization header.')
+
+        body = await request.json()
+        if body.get('intent') not in ('CAPTURE', 'AUTHORIZE') or not body.get('purchase_units'):
+            return paypal_error(422, 'UNPROCESSABLE_ENTITY', 'The requested action could not be performed.')
+
+        order_id = f"STANDIN{next(self.order_numbers):010d}"
+        base = f"{request.scheme}://{request.host}"
+        order = {
+            'id': order_id,
+            'intent': body['intent'],
+            'status': 'APPROVED',
+            'purchase_units': body['purchase_units'],
+            'create_time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'links': [
+                {'href': f"{base}/v2/checkout/orders/{order_id}", 'rel': 'self', 'method': 'GET'},
+                {'href': f"{base}/checkoutnow?token={order_id}", 'rel': 'approve', 'method': 'GET'},
+                {'href': f"{base}/v2/checkout/orders/{order_id}/capture", 'rel': 'capture', 'method': 'POST'}
+            ]
+        }
+        self.orders[order_id] = order
+        return web.json_response({**order, 'status': 'CREATED'}, status=201)
+
+    async def get_order(self, request):
+        error = await self._faults(request, 'get_requests')
+        if error:
+            return error
+        if not self._authorized(request):
+            self.stats['unauthorized'] += 1
+            return paypal_error(401, 'AUTHENTICATION_FAILURE', 'Authentication failed.')
+
+        order = self.orders.get(request.match_info['order_id'])
+        if not order:
+            return paypal_error(404, 'RESOURCE_NOT_FOUND', 'The specified resource does not exist.')
+        return web.json_response(order)
+
+    async def capture_order(self, request):
+        error = await self._faults(request, 'capture_requests')
+        if error:
+            return error
+        if not self._authorized(request):
+            self.stats['unauthorized'] += 1
+            return paypal_error(401, 'AUTHENTICATION_FAILURE', 'Authentication failed.')
+
+        order = self.orders.get(request.match_info['order_id'])
+        if not order:
+            return paypal_error(404, 'RESOURCE_NOT_FOUND', 'The specified resource does not exist.')
+        if order['status'] == 'COMPLETED':
+            return paypal_error(422, 'UNPROCESSABLE_ENTITY', 'The requested action could not be performed.',
+                                'ORDER_ALREADY_CAPTURED')
+
+        order['status'] = 'COMPLETED'
+        unit = order['purchase_units'][0]
+        unit['payments'] = {'captures': [{
+            'id': uuid.uuid4().hex[:17].upper(),
+            'status': 'COMPLETED',
+            'amount': unit.get('amount', {}),
+            'final_capture': True,
+            'create_time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }]}
+        return web.json_response(order, status=201)
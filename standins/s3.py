@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+S3 stand-in: path-style PUT/GET/HEAD/DELETE object with Signature V4
+verification and single byte-range GETs, for lib/s3Client.js
+"""
+
+import hashlib
+import hmac
+import re
+
+from aiohttp import web
+
+from standins.common import Standin
+
+AUTHORIZATION = re.compile(
+    r'AWS4-HMAC-SHA256 Credential=(?P<key>[^/]+)/(?P<scope>[^,]+), '
+    r'SignedHeaders=(?P<headers>[^,]+), Signature=(?P<signature>[0-9a-f]{64})'
+)
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def s3_error(status, code, message):
+    """S3's XML error body"""
+    body = f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><Error><Code>{code}</Code><Message>{message}</Message></Error>"
+    return web.Response(status=status, text=body, content_type='application/xml')
+
+
+def _sign(key, data):
+    return hmac.new(key, data.encode(), hashlib.sha256).digest()
+
+
+class S3Standin(Standin):
+    """Emulates the object API of one or more buckets, in memory.
+
+    Requests must be signed with `access_key` / `secret_key`; a bad signature or
+    a PUT body that doesn't match x-amz-content-sha256 is rejected like S3 does.
+    """
+
+    def __init__(self, faults=None, access_key='standin', secret_key='standin-secret', region='us-east-1'):
+        # Documents are far larger than aiohttp's default 1 MiB body limit
+        super().__init__(faults, client_max_size=512 * 1024 * 1024)
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.objects = {}
+        self.app.router.add_route('*', '/{bucket}/{key:.+}', self.handle)
+
+    def _verify(self, request):
+        """Recompute the SigV4 signature; returns an error message or None"""
+        match = AUTHORIZATION.fullmatch(request.headers.get('Authorization', ''))
+        if not match:
+            return 'Missing or malformed Authorization header'
+        if match['key'] != self.access_key:
+            return 'The AWS Access Key Id you provided does not exist in our records.'
+
+        signed_headers = match['headers'].split(';')
+        canonical_request = '\n'.join([
+            request.method,
+            request.raw_path.split('?')[0],
+            request.query_string,
+            *[f"{name}:{request.headers.get(name, '').strip()}" for name in signed_headers],
+            '',
+            match['headers'],
+            request.headers.get('x-amz-content-sha256', '')
+        ])
+        date_stamp, region, service, _ = match['scope'].split('/')
+        string_to_sign = '\n'.join([
+            'AWS4-HMAC-SHA256',
+            request.headers.get('x-amz-date', ''),
+            match['scope'],
+            hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+        key = _sign(f"AWS4{self.secret_key}".encode(), date_stamp)
+        for part in (region, service, 'aws4_request'):
+            key = _sign(key, part)
+        expected = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, match['signature']):
+            return 'The request signature we calculated does not match the signature you provided.'
+        return None
+
+    async def handle(self, request):
+        self.track(request, f"{request.method.lower()}_requests")
+        await self.faults.delay()
+        if self.faults.should_fail():
+            self.stats['injected_errors'] += 1
+            return s3_error(503, 'SlowDown', 'Please reduce your request rate.')
+
+        problem = self._verify(request)
+        if problem:
+            self.stats['rejected'] += 1
+            return s3_error(403, 'SignatureDoesNotMatch', problem)
+
+        name = (request.match_info['bucket'], request.match_info['key'])
+
+        if request.method == 'PUT':
+            body = await request.read()
+            declared = request.headers.get('x-amz-content-sha256')
+            if declared != 'UNSIGNED-PAYLOAD' and declared != hashlib.sha256(body).hexdigest():
+                self.stats['rejected'] += 1
+                return s3_error(400, 'XAmzContentSHA256Mismatch', 'The provided x-amz-content-sha256 header does not match what was computed.')
+            etag = f"\"{hashlib.md5(body).hexdigest()}\""
+            self.objects[name] = (body, request.headers.get('Content-Type', 'binary/octet-stream'), etag)
+            self.stats['bytes_in'] += len(body)
+            return web.Response(status=200, headers={'ETag': etag})
+
+        if request.method == 'DELETE':
+            self.objects.pop(name, None)
+            return web.Response(status=204)
+
+        if request.method not in ('GET', 'HEAD'):
+            return s3_error(405, 'MethodNotAllowed', 'The specified method is not allowed against this resource.')
+
+        stored = self.objects.get(name)
+        if not stored:
+            return s3_error(404, 'NoSuchKey', 'The specified key does not exist.')
+        body, content_type, etag = stored
+        headers = {'ETag': etag, 'Accept-Ranges': 'bytes', 'Content-Type': content_type}
+
+        range_match = RANGE.match(request.headers.get('Range', ''))
+        if range_match and (range_match[1] or range_match[2]):
+            last = len(body) - 1
+            if range_match[1]:
+                start, end = int(range_match[1]), min(int(range_match[2] or last), last)
+            else:
+                start, end = max(0, len(body) - int(range_match[2])), last
+            if start > end:
+                return s3_error(416, 'InvalidRange', 'The requested range is not satisfiable')
+            headers['Content-Range'] = f"bytes {start}-{end}/{len(body)}"
+            body, status = body[start:end + 1], 206
+        else:
+            status = 200
+
+        self.stats['bytes_out'] += len(body)
+        if request.method == 'HEAD':
+            headers['Content-Length'] = str(len(body))
+            return web.Response(status=status, headers=headers)
+        return web.Response(status=status, body=body, headers=headers)
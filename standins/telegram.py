@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Telegram Bot API stand-in: sendMessage and getMe, with Telegram's global and
+per-chat flood limits answered the way the real API does (429 + retry_after)
+"""
+
+import re
+import time
+from collections import defaultdict, deque
+
+from aiohttp import web
+
+from standins.common import Standin, TokenBucket
+
+MAX_MESSAGE_LENGTH = 4096
+
+# Characters that have no formatting meaning in MarkdownV2 and must always be
+# escaped; an unescaped one makes Telegram reject the whole message
+MARKDOWN_V2_ALWAYS_ESCAPED = re.compile(r'(?<!\\)(?:\\\\)*([.!#+\-={}])')
+
+
+def telegram_error(status, description, retry_after=None):
+    """Telegram's error envelope"""
+    body = {'ok': False, 'error_code': status, 'description': description}
+    if retry_after is not None:
+        body['parameters'] = {'retry_after': retry_after}
+    return web.json_response(body, status=status)
+
+
+class TelegramStandin(Standin):
+    """Emulates /bot<token>/sendMessage and /bot<token>/getMe.
+
+    `global_rate` and `chat_rate` are messages per second (Telegram allows about
+    30/s overall and 1/s per chat); exceeding either answers 429 with
+    retry_after in whole seconds. Accepts JSON, form and query parameters, as
+    node-telegram-bot-api sends forms.
+    """
+
+    def __init__(self, faults=None, global_rate=30, chat_rate=1, chat_burst=3, token=None, keep_messages=200):
+        super().__init__(faults)
+        self.global_bucket = TokenBucket(global_rate) if global_rate else None
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.chat_buckets = {}
+        self.token = token
+        self.messages = deque(maxlen=keep_messages)
+        self.per_chat = defaultdict(int)
+        self.message_ids = defaultdict(int)
+        self.app.router.add_route('*', '/bot{token}/sendMessage', self.send_message)
+        self.app.router.add_route('*', '/bot{token}/getMe', self.get_me)
+        self.app.router.add_get('/__messages', self.get_messages)
+
+    def snapshot(self):
+        return {**super().snapshot(), 'chats': len(self.per_chat)}
+
+    async def _params(self, request):
+        params = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == 'application/json':
+                params.update(await request.json())
+            else:
+                params.update(await request.post())
+        return params
+
+    def _check_token(self, request):
+        return not self.token or request.match_info['token'] == self.token
+
+    def _rate_limited(self, chat_id):
+        """Seconds to wait before this chat can receive a message, or 0"""
+        waits = []
+        if self.global_bucket:
+            waits.append(self.global_bucket.take())
+        if self.chat_rate:
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+            waits.append(bucket.take())
+        return max(waits, default=0)
+
+    async def get_me(self, request):
+        self.track(request, 'get_me')
+        await self.faults.delay()
+        if not self._check_token(request):
+            return telegram_error(401, 'Unauthorized')
+        return web.json_response({'ok': True, 'result': {
+            'id': 1, 'is_bot': True, 'first_name': 'Pleyazul Stand-in', 'username': 'pleyazul_standin_bot'
+        }})
+
+    async def send_message(self, request):
+        self.track(request, 'send_message')
+        await self.faults.delay()
+        if not self._check_token(request):
+            return telegram_error(401, 'Unauthorized')
+
+        params = await self._params(request)
+        chat_id = str(params.get('chat_id', ''))
+        text = params.get('text', '')
+        parse_mode = params.get('parse_mode', '')
+
+        if not chat_id:
+            return telegram_error(400, 'Bad Request: chat_id is empty')
+        if not text:
+            return telegram_error(400, 'Bad Request: message text is empty')
+        if len(text) > MAX_MESSAGE_LENGTH:
+            return telegram_error(400, 'Bad Request: message is too long')
+        if parse_mode == 'MarkdownV2':
+            unescaped = MARKDOWN_V2_ALWAYS_ESCAPED.search(text)
+            if unescaped:
+                char = unescaped.group(1)
+                return telegram_error(400, "Bad Request: can't parse entities: "
+                                           f"Character '{char}' is reserved and must be escaped with the preceding '\\'")
+
+        wait = self._rate_limited(chat_id)
+        if wait > 0:
+            self.stats['rate_limited'] += 1
+            retry_after = max(1, int(wait + 0.999))
+            return telegram_error(429, f"Too Many Requests: retry after {retry_after}", retry_after)
+
+        if self.faults.should_fail():
+            self.stats['injected_errors'] += 1
+            return telegram_error(502, 'Bad Gateway')
+
+        self.stats['delivered'] += 1
+        self.per_chat[chat_id] += 1
+        self.message_ids[chat_id] += 1
+        message = {
+            'message_id': self.message_ids[chat_id],
+            'date': int(time.time()),
+            'chat': {'id': int(chat_id) if chat_id.lstrip('-').isdigit() else chat_id, 'type': 'private'},
+            'text': text
+        }
+        self.messages.append({**message, 'parse_mode': parse_mode})
+        return web.json_response({'ok': True, 'result': message})
+
+    async def get_messages(self, request):
+        return web.json_response(list(self.messages))